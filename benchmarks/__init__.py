@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+"""Benchmarks for the storage engines and web views
+
+Each module is run from the repository root, e.g.:
+    python3 -m benchmarks.reload 100000
+"""
+import json
+import time
+from datetime import datetime
+from uuid import uuid4
+
+
+def place_records(n):
+    """Yields n Place records in the format written by FileStorage.save()
+
+    Args:
+        n (int): The number of records
+    """
+    now = datetime.utcnow().isoformat()
+    city_ids = [str(uuid4()) for _ in range(100)]
+    user_ids = [str(uuid4()) for _ in range(100)]
+    for i in range(n):
+        obj_id = str(uuid4())
+        yield 'Place.' + obj_id, {
+            'id': obj_id, 'created_at': now, 'updated_at': now,
+            'city_id': city_ids[i % 100], 'user_id': user_ids[i % 100],
+            'name': 'Place {}'.format(i),
+            'description': 'A quiet place to stay near the city centre',
+            'number_rooms': i % 5, 'number_bathrooms': i % 3,
+            'max_guest': i % 8, 'price_by_night': 50 + i % 200,
+            'latitude': 37.77, 'longitude': -122.41,
+            '__class__': 'Place'
+        }
+
+
+def seed_file(path, n):
+    """Writes a FileStorage JSON file holding n Place records
+
+    Args:
+        path (str): The path of the file
+        n (int): The number of records
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(place_records(n)), f)
+
+
+def timed(func, *args):
+    """Calls func and returns the elapsed wall-clock time in seconds
+
+    Args:
+        func (callable): The function to time
+        args: The positional arguments passed to func
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def seed_storage(storage, states=50, cities=10, places=2000):
+    """Fills a storage engine with related States, Cities, Users, Amenities
+    and Places, then saves it
+
+    Args:
+        storage: The storage engine
+        states (int): The number of States
+        cities (int): The number of Cities per State
+        places (int): The number of Places
+    """
+    from models.amenity import Amenity
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+
+    users = [User(email='user{}@example.com'.format(i), password='pwd',
+                  first_name='First{}'.format(i), last_name='Last')
+             for i in range(20)]
+    city_list = []
+    for i in range(states):
+        state = State(name='State {}'.format(i))
+        storage.new(state)
+        for j in range(cities):
+            city = City(name='City {}-{}'.format(i, j), state_id=state.id)
+            city_list.append(city)
+            storage.new(city)
+    for i in range(10):
+        storage.new(Amenity(name='Amenity {}'.format(i)))
+    for user in users:
+        storage.new(user)
+    for i in range(places):
+        storage.new(Place(name='Place {}'.format(i),
+                          city_id=city_list[i % len(city_list)].id,
+                          user_id=users[i % len(users)].id,
+                          description='A quiet place', number_rooms=2,
+                          number_bathrooms=1, max_guest=4,
+                          price_by_night=50 + i % 200))
+    storage.save()
+
+
+def load_app(name):
+    """Imports one of the numbered web_flask scripts and returns its app
+
+    Args:
+        name (str): The script name without extension, e.g. '100-hbnb'
+    """
+    import importlib.util
+    import os
+    import sys
+
+    path = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                        'web_flask', name + '.py')
+    spec = importlib.util.spec_from_file_location(
+        'web_flask.' + name.replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    # Flask locates the templates folder through sys.modules
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def requests_per_second(app, url, seconds=3.0):
+    """Requests url through the Flask test client for a while
+
+    Args:
+        app (flask.Flask): The application
+        url (str): The URL to request
+        seconds (float): How long to keep requesting
+
+    Returns:
+        float: The number of requests served per second
+    """
+    client = app.test_client()
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        client.get(url).close()
+        count += 1
+    return count / (time.perf_counter() - start)
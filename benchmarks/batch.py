@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""Compares inserting Reviews one save() at a time and in one batch()
+
+Usage: python3 -m benchmarks.batch [number of reviews]
+
+Runs against the engine selected by HBNB_TYPE_STORAGE; file storage
+writes to a temporary file. Saving one Review at a time rewrites the
+whole file each time, so that way only inserts up to 2000 Reviews and
+the time for the full count is extrapolated linearly from them, which
+underestimates it. The Reviews all belong to one seeded Place and User,
+so the database accepts their foreign keys.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from benchmarks import seed_storage, timed
+from models import storage, storage_type
+from models.place import Place
+from models.review import Review
+
+UNBATCHED_LIMIT = 2000
+
+
+def insert(n, place):
+    """Creates and saves n Reviews one by one
+
+    Args:
+        n (int): The number of Reviews
+        place (Place): The Place reviewed, by its owner
+    """
+    for i in range(n):
+        Review(text='Review {}'.format(i), place_id=place.id,
+               user_id=place.user_id).save()
+
+
+def insert_batch(n, place):
+    """Creates and saves n Reviews in a single batch
+
+    Args:
+        n (int): The number of Reviews
+        place (Place): The Place reviewed, by its owner
+    """
+    with storage.batch():
+        insert(n, place)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if storage_type != 'db':
+        tmp = tempfile.mkdtemp()
+        name = 'FileStorage' if storage_type is None else 'RecordStorage'
+        setattr(storage, '_{}__file_path'.format(name),
+                os.path.join(tmp, 'file.json'))
+        storage.reload()
+    seed_storage(storage, states=1, cities=1, places=1)
+    place = next(iter(storage.all(Place).values()))
+    print('{} Reviews with {}'.format(n, type(storage).__name__))
+
+    count = min(n, UNBATCHED_LIMIT)
+    seconds = timed(insert, count, place) * n / count
+    print('one by one {:8.2f} s{}'.format(
+        seconds, ' (extrapolated from {})'.format(count)
+        if count < n else ''))
+    print('batch      {:8.2f} s'.format(timed(insert_batch, n, place)))
+    if storage_type != 'db':
+        shutil.rmtree(tmp)
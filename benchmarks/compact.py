@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""Compares the memory used per object by the regular and the compact
+(HBNB_COMPACT_MODELS=1) models
+
+Usage: python3 -m benchmarks.compact [number of objects]
+
+Each measurement runs in a child process, since the representation is
+chosen when the models are imported.
+"""
+import os
+import subprocess
+import sys
+import tracemalloc
+
+CLASSES = ('State', 'City', 'Amenity', 'User', 'Place', 'Review')
+
+
+def measure(name, n):
+    """Returns the traced bytes per object for n reloaded objects of a
+    class, in the current process
+
+    Args:
+        name (str): The class name
+        n (int): The number of objects
+    """
+    from datetime import datetime
+
+    from models.engine.file_storage import FileStorage
+
+    cls = FileStorage()._models()[name]
+    defaults = getattr(cls, '_defaults', None) or vars(cls)
+    now = datetime.utcnow().isoformat()
+    template = {'created_at': now, 'updated_at': now, '__class__': name}
+    for attr, value in defaults.items():
+        if type(value) in (str, int, float):
+            template[attr] = type(value)(1)
+    records = [dict(template, id=str(i)) for i in range(n)]
+
+    tracemalloc.start()
+    objects = [cls(**record) for record in records]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(objects)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        print(measure(sys.argv[2], int(sys.argv[3])))
+        sys.exit(0)
+
+    n = sys.argv[1] if len(sys.argv) > 1 else '100000'
+    print('{} objects per class, bytes per object'.format(n))
+    print('{:<8} {:>8} {:>8}'.format('class', 'regular', 'compact'))
+    for name in CLASSES:
+        sizes = []
+        for compact in ('0', '1'):
+            env = dict(os.environ, HBNB_COMPACT_MODELS=compact)
+            env.pop('HBNB_TYPE_STORAGE', None)
+            out = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.compact', '--child',
+                 name, n], env=env, check=True, capture_output=True,
+                text=True).stdout
+            sizes.append(float(out))
+        print('{:<8} {:8.0f} {:8.0f}'.format(name, *sizes))
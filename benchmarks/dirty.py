@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""Measures FileStorage.save() after a single object changed, with and
+without the encodings kept for the unchanged objects
+
+Usage: python3 -m benchmarks.dirty [number of records]
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks import seed_file, timed
+from models.engine.file_storage import FileStorage
+
+
+def save_one_change(storage, forget):
+    """Changes one object, then saves the storage
+
+    Args:
+        storage (FileStorage): The loaded storage
+        forget (bool): Whether to drop the kept encodings first, as
+                       save() did before dirty tracking
+    """
+    if forget:
+        FileStorage._FileStorage__fragments.clear()  # type: ignore
+    obj = next(iter(storage.all().values()))
+    obj.name = obj.name + '!'
+    storage.save()
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = os.path.join(tempfile.mkdtemp(), 'file.json')
+    seed_file(path, n)
+    FileStorage._FileStorage__file_path = path  # type: ignore
+    storage = FileStorage()
+    storage.reload()
+    storage.save()
+    print('{} records'.format(n))
+
+    for name, forget in (('full', True), ('dirty', False)):
+        seconds = min(timed(save_one_change, storage, forget)
+                      for _ in range(5))
+        print('{:<6} {:8.3f} s per save'.format(name, seconds))
+    os.remove(path)
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""Compares the JSON and pickle snapshot formats of FileStorage
+
+Usage: python3 -m benchmarks.formats [number of records]
+
+Reports the save() and reload() time and the file size of each format
+for the same set of Place objects.
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks import seed_file, timed
+from models.engine.file_storage import FileStorage
+
+
+def use(path, fmt):
+    """Points FileStorage at path and selects the snapshot format
+
+    Args:
+        path (str): The path of the snapshot
+        fmt (str): The format name, e.g. 'json' or 'pickle'
+    """
+    FileStorage._FileStorage__file_path = path  # type: ignore
+    FileStorage._FileStorage__format = fmt  # type: ignore
+    storage = FileStorage()
+    storage.all().clear()
+    return storage
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tmp = tempfile.mkdtemp()
+    source = os.path.join(tmp, 'seed.json')
+    seed_file(source, n)
+    print('{} records'.format(n))
+
+    for fmt in ('json', 'pickle'):
+        storage = use(source, 'json')
+        storage.reload()
+        path = os.path.join(tmp, 'file.' + fmt)
+        FileStorage._FileStorage__file_path = path  # type: ignore
+        FileStorage._FileStorage__format = fmt  # type: ignore
+        save = timed(storage.save)
+        storage.all().clear()
+        load = timed(storage.reload)
+        print('{:<7} save {:6.2f} s  reload {:6.2f} s  {:8.1f} MiB'.format(
+            fmt, save, load, os.path.getsize(path) / (1 << 20)))
+        os.remove(path)
+    os.remove(source)
@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+"""Shows the query plans and latencies of the view queries, with the
+model indexes and without them
+
+Usage: HBNB_TYPE_STORAGE=db [HBNB_DB_URL=sqlite:////tmp/hbnb.db] \
+       python3 -m benchmarks.indexes [number of places]
+
+Runs against the database DBStorage is configured for, and seeds it with
+that many Places and Reviews when it holds no State yet. The queries are
+those the web views and the storage API issue. On SQLite they run a
+second time after dropping the indexes the models declare, which are
+created again afterwards; MySQL needs most of them for its foreign keys,
+so only the first pass runs there.
+"""
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+from sqlalchemy import select, text
+
+from models import storage, storage_type
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+RUNS = 20
+
+
+def seed(places, states=50, cities=20, users=1000):
+    """Fills the database with related States, Cities, Users, Places and
+    one Review per Place, through bulk_insert()
+
+    Args:
+        places (int): The number of Places
+        states (int): The number of States
+        cities (int): The number of Cities per State
+        users (int): The number of Users
+    """
+    state_ids = [str(uuid4()) for _ in range(states)]
+    city_ids = [str(uuid4()) for _ in range(states * cities)]
+    user_ids = [str(uuid4()) for _ in range(users)]
+    place_ids = [str(uuid4()) for _ in range(places)]
+    storage.bulk_insert(State, ({'id': state_id, 'name': 'State {}'.format(i)}
+                                for i, state_id in enumerate(state_ids)))
+    storage.bulk_insert(City, ({'id': city_id, 'name': 'City {}'.format(i),
+                                'state_id': state_ids[i % states]}
+                               for i, city_id in enumerate(city_ids)))
+    storage.bulk_insert(User, ({'id': user_id, 'password': 'pwd',
+                                'email': 'user{}@example.com'.format(i)}
+                               for i, user_id in enumerate(user_ids)))
+    storage.bulk_insert(Place, ({'id': place_id, 'name': 'Place {}'.format(i),
+                                 'city_id': city_ids[i % len(city_ids)],
+                                 'user_id': user_ids[i % users],
+                                 'price_by_night': 50 + i % 200}
+                                for i, place_id in enumerate(place_ids)))
+    storage.bulk_insert(Review, ({'text': 'Nice', 'place_id': place_id,
+                                  'user_id': user_ids[i % users]}
+                                 for i, place_id in enumerate(place_ids)))
+
+
+def view_queries(engine):
+    """Returns the queries of the views and storage API, by name
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine of the storage
+    """
+    with engine.connect() as conn:
+        state_id = conn.execute(select(State.id).limit(1)).scalar()
+        city_id = conn.execute(select(City.id).limit(1)).scalar()
+        place_id, user_id = conn.execute(
+            select(Place.id, Place.user_id).limit(1)).one()
+    return {
+        'states by name': select(State).order_by(State.name),
+        'cities of a state': select(City).where(City.state_id == state_id)
+        .order_by(City.name),
+        'places page': select(Place).order_by(Place.name, Place.id)
+        .offset(1000).limit(25),
+        'places of a city': select(Place).where(Place.city_id == city_id)
+        .order_by(Place.name),
+        'places by price': select(Place)
+        .where(Place.price_by_night.between(100, 101)),
+        'places of a user': select(Place).where(Place.user_id == user_id),
+        'reviews of a place': select(Review)
+        .where(Review.place_id == place_id),
+    }
+
+
+def plan(conn, query):
+    """Returns the query plan of a query, one line per step
+
+    Args:
+        conn (sqlalchemy.engine.Connection): The connection
+        query (sqlalchemy.sql.Select): The query
+    """
+    sql = str(query.compile(conn, compile_kwargs={'literal_binds': True}))
+    if conn.dialect.name == 'sqlite':
+        rows = conn.execute(text('EXPLAIN QUERY PLAN ' + sql))
+        return [row.detail for row in rows]
+    rows = conn.execute(text('EXPLAIN ' + sql)).mappings()
+    return ['{} {} key={} rows={} {}'.format(
+        row['table'], row['type'], row['key'], row['rows'],
+        row['Extra'] or '') for row in rows]
+
+
+def latency(conn, query):
+    """Returns the median time in milliseconds to run a query and fetch
+    its rows
+
+    Args:
+        conn (sqlalchemy.engine.Connection): The connection
+        query (sqlalchemy.sql.Select): The query
+    """
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        conn.execute(query).fetchall()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def report(conn, queries):
+    """Prints the plan and latency of every query
+
+    Args:
+        conn (sqlalchemy.engine.Connection): The connection
+        queries (dict): Name -> query
+    """
+    for name, query in queries.items():
+        print('{:<20} {:9.3f} ms'.format(name, latency(conn, query)))
+        for step in plan(conn, query):
+            print('    ' + step)
+
+
+if __name__ == '__main__':
+    if storage_type != 'db':
+        sys.exit('Set HBNB_TYPE_STORAGE=db')
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    engine = storage._DBStorage__engine  # type: ignore
+    if not storage.count(State):
+        start = time.perf_counter()
+        seed(n)
+        print('seeded {} places in {:.1f} s'.format(
+            n, time.perf_counter() - start))
+    storage.close()
+    print('{} places on {}'.format(storage.count(Place), engine.url))
+    queries = view_queries(engine)
+
+    print('\nwith the model indexes')
+    with engine.connect() as conn:
+        report(conn, queries)
+    if engine.dialect.name != 'sqlite':
+        sys.exit()
+
+    print('\nwithout them')
+    indexes = [index for model in (State, City, Place, Review)
+               for index in model.__table__.indexes]
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(conn)
+    # New connections, as SQLite does not replan cached EXPLAIN statements
+    engine.dispose()
+    try:
+        with engine.connect() as conn:
+            report(conn, queries)
+    finally:
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(conn)
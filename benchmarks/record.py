@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""Compares fetching one object from FileStorage and from RecordStorage
+
+Usage: python3 -m benchmarks.record [number of records]
+
+FileStorage has to load the whole file before it can return an object,
+while RecordStorage maps its files and reads a single record. The peak
+traced memory leaves out the mapped pages, which live in the page cache
+shared by every process using the files.
+"""
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+import uuid
+
+from benchmarks import place_records, timed
+from models.engine.file_storage import FileStorage
+from models.engine.record_storage import RecordStorage
+from models.place import Place
+
+
+def fetch_file(path, obj_id):
+    """Loads the JSON file, then gets one Place
+
+    Args:
+        path (str): The path of the JSON file
+        obj_id (str): The id of the Place
+    """
+    FileStorage._FileStorage__file_path = path  # type: ignore
+    storage = FileStorage()
+    storage.all().clear()
+    storage.reload()
+    return storage.get(Place, obj_id)
+
+
+def fetch_record(path, obj_id):
+    """Maps the record file, then gets one Place
+
+    Args:
+        path (str): The path of the record file
+        obj_id (str): The id of the Place
+    """
+    RecordStorage._RecordStorage__file_path = path  # type: ignore
+    storage = RecordStorage()
+    storage.reload()
+    return storage.get(Place, obj_id)
+
+
+def peak_memory(func, *args):
+    """Returns the peak traced memory in MiB while func runs
+
+    Args:
+        func (callable): The function to measure
+        args: The positional arguments passed to func
+    """
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / (1 << 20)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tmp = tempfile.mkdtemp()
+    json_path = os.path.join(tmp, 'file.json')
+    record_path = os.path.join(tmp, 'records.db')
+    records = dict(place_records(n))
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f)
+    with open(record_path, 'wb') as f:
+        f.write(b'HBNBREC1' + uuid.uuid4().bytes)
+        for key, val in records.items():
+            f.write(json.dumps({'key': key, 'val': val}).encode() + b'\n')
+    # Build the index once, as the first process to open the file would
+    fetch_record(record_path, '')
+    obj_id = records.popitem()[1]['id']
+    print('{} records'.format(n))
+
+    for name, func, path in (('file', fetch_file, json_path),
+                             ('record', fetch_record, record_path)):
+        seconds = timed(func, path, obj_id)
+        FileStorage().all().clear()
+        print('{:<7} {:8.4f} s {:10.2f} MiB peak'.format(
+            name, seconds, peak_memory(func, path, obj_id)))
+        FileStorage().all().clear()
+    for name in os.listdir(tmp):
+        os.remove(os.path.join(tmp, name))
+    os.rmdir(tmp)
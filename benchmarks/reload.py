@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""Compares FileStorage.reload() with the previous json.load() path
+
+Usage: python3 -m benchmarks.reload [number of records]
+
+Reports the startup time and the peak traced memory of each way of
+loading the same file, including lazy loading (HBNB_FILE_LAZY=1).
+"""
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks import seed_file, timed
+from models.engine.file_storage import FileStorage
+from models.place import Place
+
+
+def load_whole(path):
+    """Loads the file the way reload() did before streaming
+
+    Args:
+        path (str): The path of the JSON file
+    """
+    with open(path, 'r') as f:
+        temp = json.load(f)
+        objects = {}
+        for key, val in temp.items():
+            objects[key] = Place(**val)
+    return objects
+
+
+def load_streaming(path):
+    """Loads the file through FileStorage.reload()
+
+    Args:
+        path (str): The path of the JSON file
+    """
+    storage = FileStorage()
+    storage._FileStorage__file_path = path  # type: ignore
+    storage.all().clear()
+    storage.reload()
+
+
+def load_lazy(path):
+    """Loads the file through FileStorage.reload() in lazy mode
+
+    Args:
+        path (str): The path of the JSON file
+    """
+    FileStorage._FileStorage__lazy = True  # type: ignore
+    try:
+        return load_streaming(path)
+    finally:
+        FileStorage._FileStorage__lazy = False  # type: ignore
+
+
+def peak_memory(func, path):
+    """Returns the peak traced memory in MiB while func loads path
+
+    Args:
+        func (callable): The loader
+        path (str): The path of the JSON file
+    """
+    tracemalloc.start()
+    func(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / (1 << 20)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = os.path.join(tempfile.mkdtemp(), 'file.json')
+    seed_file(path, n)
+    print('{} records, {:.1f} MiB on disk'.format(
+        n, os.path.getsize(path) / (1 << 20)))
+
+    for name, func in (('json.load', load_whole),
+                       ('streaming', load_streaming),
+                       ('lazy', load_lazy)):
+        FileStorage().all().clear()
+        seconds = timed(func, path)
+        FileStorage().all().clear()
+        print('{:<10} {:8.2f} s {:10.1f} MiB peak'.format(
+            name, seconds, peak_memory(func, path)))
+    os.remove(path)
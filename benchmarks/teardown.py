@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""Measures the cost of FileStorage.close() at Flask request teardown
+
+Usage: python3 -m benchmarks.teardown [number of places]
+
+Serves /states and /hbnb through the Flask test client with close()
+reloading the whole file after every request, as it used to, and with
+close() only reloading when the file changed.
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks import load_app, requests_per_second, seed_storage
+from models import storage
+from models.engine.file_storage import FileStorage
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    path = os.path.join(tempfile.mkdtemp(), 'file.json')
+    storage._FileStorage__file_path = path  # type: ignore
+    storage.all().clear()
+    seed_storage(storage, places=n)
+    print('{} objects, {:.1f} MiB on disk'.format(
+        len(storage.all()), os.path.getsize(path) / (1 << 20)))
+
+    close = FileStorage.close
+    for app, url in ((load_app('9-states'), '/states'),
+                     (load_app('100-hbnb'), '/hbnb')):
+        FileStorage.close = FileStorage.reload
+        before = requests_per_second(app, url)
+        FileStorage.close = close
+        after = requests_per_second(app, url)
+        print('{:<8} {:8.1f} req/s before {:8.1f} req/s after'.format(
+            url, before, after))
+    os.remove(path)
@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""Load-tests the web application of wsgi.py with 1, 2, 4... worker
+processes and reports the throughput of each worker count
+
+Usage: python3 -m benchmarks.workers [max workers] [url] [seconds]
+
+The workers are forked, as gunicorn --preload does, from a process that
+created the app with create_app() and ran preload(); they accept
+connections on the socket they share, one request at a time. Twice as
+many client processes request the url (default /hbnb) for the given
+time (default 5 seconds). The memory private to each worker is read
+from /proc where available: what preloading leaves shared is not in it.
+FileStorage is seeded in a temporary file; the other engines are used
+as HBNB_TYPE_STORAGE configures them.
+"""
+import http.client
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from benchmarks import seed_storage
+from models import storage, storage_type
+from web_flask import create_app, preload
+
+
+class QuietHandler(WSGIRequestHandler):
+    """Handles a request without logging it to stderr
+    """
+
+    def log_message(self, *args):
+        """Logs nothing
+        """
+
+
+def fork_workers(server, n):
+    """Forks processes that serve the requests of a server
+
+    Args:
+        server (wsgiref.simple_server.WSGIServer): The listening server
+        n (int): The number of processes
+
+    Returns:
+        list: Their pids
+    """
+    pids = []
+    for _ in range(n):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, lambda *args: os._exit(0))
+            server.serve_forever()
+        pids.append(pid)
+    return pids
+
+
+def client(port, url, seconds):
+    """Requests url until the time is up
+
+    Args:
+        port (int): The port of the server
+        url (str): The path to request
+        seconds (float): How long to keep requesting
+
+    Returns:
+        int: The number of responses
+    """
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        conn.request('GET', url)
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError('{} {}'.format(url, response.status))
+        conn.close()
+        count += 1
+    return count
+
+
+def private_memory(pid):
+    """Returns the memory of a process that no other process shares
+
+    Args:
+        pid (int): The process id
+
+    Returns:
+        float: The size in MiB, or None without /proc
+    """
+    try:
+        with open('/proc/{}/smaps_rollup'.format(pid)) as f:
+            kib = sum(int(line.split()[1]) for line in f
+                      if line.startswith(('Private_Clean', 'Private_Dirty')))
+    except OSError:
+        return None
+    return kib / 1024
+
+
+def load_test(server, workers, url, seconds):
+    """Serves url with a number of workers under load
+
+    Args:
+        server (wsgiref.simple_server.WSGIServer): The listening server
+        workers (int): The number of worker processes
+        url (str): The path to request
+        seconds (float): How long the clients keep requesting
+
+    Returns:
+        tuple: The requests served per second, and the mean private
+               memory of a worker in MiB, or None
+    """
+    pids = fork_workers(server, workers)
+    try:
+        with multiprocessing.Pool(workers * 2) as pool:
+            start = time.perf_counter()
+            counts = pool.starmap(client, [(server.server_port, url,
+                                            seconds)] * (workers * 2))
+            elapsed = time.perf_counter() - start
+        sizes = [private_memory(pid) for pid in pids]
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+    if None in sizes:
+        return sum(counts) / elapsed, None
+    return sum(counts) / elapsed, sum(sizes) / len(sizes)
+
+
+if __name__ == '__main__':
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    url = sys.argv[2] if len(sys.argv) > 2 else '/hbnb'
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    path = None
+    if storage_type not in ('db', 'record'):
+        path = os.path.join(tempfile.mkdtemp(), 'file.json')
+        storage._FileStorage__file_path = path  # type: ignore
+        storage.all().clear()
+        seed_storage(storage)
+    app = create_app()
+    preload(app)
+    server = make_server('127.0.0.1', 0, app, handler_class=QuietHandler)
+    print('{} on {} CPUs, {} s per run'.format(
+        url, os.cpu_count(), seconds))
+    workers = 1
+    while workers <= max_workers:
+        rate, memory = load_test(server, workers, url, seconds)
+        print('{:3} workers {:9.1f} req/s {:8.1f} req/s per worker{}'.format(
+            workers, rate, rate / workers, '' if memory is None else
+            ' {:6.1f} MiB private per worker'.format(memory)))
+        workers *= 2
+    server.server_close()
+    if path is not None:
+        os.remove(path)
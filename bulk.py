@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+"""Bulk import and export of the models of one class
+
+Usage: ./bulk.py import <class name> <file> [chunk size]
+       ./bulk.py export <class name> <file> [chunk size]
+
+Files ending in .csv are read and written as CSV with a header row of
+the attributes the class declares, any other file as newline-delimited
+JSON (one to_dict() record per line); '-'
+stands for stdin or stdout in NDJSON. Records are streamed through the
+storage engine selected by HBNB_TYPE_STORAGE, a chunk at a time, and the
+throughput is reported on stderr.
+"""
+import csv
+import json
+import sys
+import time
+
+from console import HBNBCommand
+from models import storage
+
+
+def read_records(f, csv_format, cls=None):
+    """Yields the records of an import file
+
+    CSV values are strings: empty ones are left out so the model default
+    applies, the numeric attributes the console knows are converted, and
+    the list attributes of the class, e.g. Place.amenity_ids, are decoded
+    from JSON.
+
+    Args:
+        f (file): The text file to read
+        csv_format (bool): Whether the file is CSV rather than NDJSON
+        cls (class): The class of the records
+
+    Raises:
+        ValueError: If a line or value cannot be parsed
+    """
+    if not csv_format:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+        return
+    for row in csv.DictReader(f):
+        record = {}
+        for key, value in row.items():
+            if value in ('', None):
+                continue
+            if key in HBNBCommand.types:
+                value = HBNBCommand.types[key](value)
+            elif isinstance(getattr(cls, key, None), list):
+                value = json.loads(value)
+            record[key] = value
+        yield record
+
+
+def columns(cls):
+    """Returns the CSV columns of a class: id and the dates, then the
+    attributes it declares, as table columns or class attributes
+
+    Args:
+        cls (class): The model class
+
+    Returns:
+        list: The attribute names
+    """
+    names = ['id', 'created_at', 'updated_at']
+    table = getattr(cls, '__table__', None)
+    if table is not None:
+        declared = [column.name for column in table.columns]
+    else:
+        declared = [name for name, value in vars(cls).items()
+                    if not name.startswith('_') and not callable(value)
+                    and not isinstance(value, property)]
+    return names + [name for name in declared if name not in names]
+
+
+def write_records(records, f, csv_format, fields=None):
+    """Writes records to an export file; in CSV, list values, e.g.
+    Place.amenity_ids, are written as JSON
+
+    Args:
+        records (iterable): The to_dict() records
+        f (file): The text file to write
+        csv_format (bool): Whether to write CSV rather than NDJSON
+        fields (list): The CSV columns, see columns()
+
+    Returns:
+        int: The number of records written
+
+    Raises:
+        ValueError: If a record has an attribute that is not a CSV column
+    """
+    count = 0
+    if csv_format:
+        writer = csv.DictWriter(f, fields)
+        writer.writeheader()
+        allowed = set(fields) | {'__class__'}
+    for record in records:
+        if not csv_format:
+            f.write(json.dumps(record) + '\n')
+        else:
+            extra = set(record) - allowed
+            if extra:
+                raise ValueError(
+                    "{}.{} has attributes that are not CSV columns: {}; "
+                    "export it as NDJSON".format(
+                        record.get('__class__'), record.get('id'),
+                        ', '.join(sorted(extra))))
+            writer.writerow({
+                key: json.dumps(value) if isinstance(value, list) else value
+                for key, value in record.items() if key != '__class__'})
+        count += 1
+    return count
+
+
+def bulk_import(cls, path, chunk_size=1000):
+    """Inserts the records of a file into storage
+
+    Args:
+        cls (class): The class of the records
+        path (str): The CSV or NDJSON file, or '-' for stdin
+        chunk_size (int): The number of records written at a time
+
+    Returns:
+        int: The number of records inserted
+    """
+    csv_format = path.endswith('.csv')
+    if path == '-':
+        return storage.bulk_insert(cls, read_records(sys.stdin, False),
+                                   chunk_size)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return storage.bulk_insert(cls, read_records(f, csv_format, cls),
+                                   chunk_size)
+
+
+def bulk_export(cls, path, chunk_size=1000):
+    """Writes the records of a class in storage to a file
+
+    Args:
+        cls (class): The class of the records
+        path (str): The CSV or NDJSON file, or '-' for stdout
+        chunk_size (int): The number of records read at a time
+
+    Returns:
+        int: The number of records written
+    """
+    records = storage.iter_records(cls, chunk_size)
+    if path == '-':
+        return write_records(records, sys.stdout, False)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        return write_records(records, f, path.endswith('.csv'),
+                             columns(cls))
+
+
+if __name__ == '__main__':
+    commands = {'import': bulk_import, 'export': bulk_export}
+    if len(sys.argv) not in (4, 5) or sys.argv[1] not in commands:
+        print("Usage: {} import|export <class name> <file> [chunk size]"
+              .format(sys.argv[0]), file=sys.stderr)
+        sys.exit(1)
+    if sys.argv[2] not in HBNBCommand.classes:
+        print("** class doesn't exist **", file=sys.stderr)
+        sys.exit(1)
+    try:
+        chunk_size = int(sys.argv[4]) if len(sys.argv) == 5 else 1000
+        start = time.perf_counter()
+        count = commands[sys.argv[1]](HBNBCommand.classes[sys.argv[2]],
+                                      sys.argv[3], chunk_size)
+        seconds = time.perf_counter() - start
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        storage.close()
+    print("{} {} {} rows in {:.2f} s ({:.0f} rows/s)".format(
+        sys.argv[1].capitalize() + 'ed', count, sys.argv[2], seconds,
+        count / seconds if seconds else 0), file=sys.stderr)
@@ -21,6 +21,8 @@ class HBNBCommand(cmd.Cmd):
     Attributes:
         prompt (str): The command prompt
         classes (tuple): The list of classes that can be created
+        page_size (int): The number of objects the all command reads from
+                         storage at a time
     """
 
     prompt = "(hbnb) " if sys.stdin.isatty() else ""
@@ -33,6 +35,7 @@ class HBNBCommand(cmd.Cmd):
         "Amenity": Amenity,
         "Review": Review,
     }
+    page_size = 1000
     dot_cmds = ["all", "count", "show", "destroy", "update"]
     types = {
         "number_rooms": int,
@@ -181,11 +184,11 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        cname_objects = storage.all(self.classes[c_name])
-        try:
-            print(cname_objects[c_name + "." + c_id])
-        except KeyError:
+        obj = storage.get(self.classes[c_name], c_id)
+        if obj is None:
             print("** no instance found **")
+        else:
+            print(obj)
 
     def help_show(self):
         """Help information for the show command"""
@@ -212,13 +215,11 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        key = c_name + "." + c_id
-
-        try:
-            del storage.all()[key]
-            storage.save()
-        except KeyError:
+        obj = storage.get(self.classes[c_name], c_id)
+        if obj is None:
             print("** no instance found **")
+            return
+        storage.delete(obj)
 
     def help_destroy(self):
         """Help information for the destroy command"""
@@ -230,28 +231,36 @@ class HBNBCommand(cmd.Cmd):
 
         Usage: all <class name> OR <class name>.all() OR all
         """
-        output = []
         if not arg:
-            for value in storage.all().values():
-                if storage_type == "db":
-                    del value.__dict__["_sa_instance_state"]
-                output.append(value)
-
+            objects = storage.all().values()
         elif arg not in self.classes:
             print("** class doesn't exist **")
             return
         else:
-            for key, value in storage.all().items():
-                if storage_type == "db":
-                    del value.__dict__["_sa_instance_state"]
-                if arg == key.split(".")[0]:
-                    output.append(value)
+            objects = self._pages(self.classes[arg])
 
         print("[", end="")
-        for obj in output:
-            print(obj, end=", " if obj != output[-1] else "")
+        for i, value in enumerate(objects):
+            if storage_type == "db":
+                del value.__dict__["_sa_instance_state"]
+            print(", " if i else "", value, sep="", end="")
         print("]")
 
+    def _pages(self, cls):
+        """Yields the objects of a class, read from storage a page of
+        page_size objects at a time
+
+        Args:
+            cls (class): The class of the objects
+        """
+        offset = 0
+        while True:
+            page = storage.all(cls, offset=offset, limit=self.page_size)
+            yield from page.values()
+            if len(page) < self.page_size:
+                return
+            offset += self.page_size
+
     def help_all(self):
         """Help information for the all command"""
         print("Shows all objects, or all of a class")
@@ -260,9 +269,8 @@ class HBNBCommand(cmd.Cmd):
     def do_count(self, args):
         """Count current number of class instances"""
         count = 0
-        for k in storage.all():
-            if args == k.split(".")[0]:
-                count += 1
+        if args in self.classes:
+            count = storage.count(self.classes[args])
         print(count)
 
     def help_count(self):
@@ -292,11 +300,9 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
 
-        # generate key from class and id
-        key = c_name + "." + c_id
-
-        # determine if key is present
-        if key not in storage.all():
+        # determine if the object is present
+        new_dict = storage.get(self.classes[c_name], c_id)
+        if new_dict is None:
             print("** no instance found **")
             return
 
@@ -320,7 +326,7 @@ class HBNBCommand(cmd.Cmd):
             if not att_name and args[0] != " ":
                 att_name = args[0]
             # check for quoted val arg
-            if args[2] and args[2][0] != '"':
+            if args[2] and args[2][0] == '"':
                 att_val = args[2][1:args[2].find('"', 1)]
 
             # if att_val was not quoted arg
@@ -329,9 +335,6 @@ class HBNBCommand(cmd.Cmd):
 
             args = [att_name, att_val]
 
-        # retrieve dictionary of current objects
-        new_dict = storage.all()[key]
-
         # iterate through attr names and values
         for i, att_name in enumerate(args):
             # block only runs on even iterations
@@ -347,8 +350,8 @@ class HBNBCommand(cmd.Cmd):
                 if att_name in self.types:
                     att_val = self.types[att_name](att_val)
 
-                # update dictionary with name, value pair
-                new_dict.__dict__.update({att_name: att_val})
+                # set the attribute so storage indexes follow the change
+                setattr(new_dict, att_name, att_val)
 
         new_dict.save()  # save updates to file
 
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""Converts a FileStorage snapshot between the JSON and binary formats
+
+Usage: ./convert_storage.py <source> <destination> <json|pickle>
+
+The source format is detected from the file itself. Records are streamed
+from one file to the other without instantiating any model.
+"""
+import sys
+
+from models.engine.serializers import detect, get_serializer
+
+
+def convert(source, destination, name):
+    """Writes the records of source to destination in the named format
+
+    Args:
+        source (str): The path of the snapshot to read
+        destination (str): The path of the snapshot to write
+        name (str): The format to write, e.g. 'json' or 'pickle'
+
+    Returns:
+        int: The number of records converted
+    """
+    serializer = get_serializer(name)
+    count = 0
+
+    def records(f):
+        """Yields the prepared records of the source file"""
+        nonlocal count
+        for key, record in detect(f).load(f):
+            count += 1
+            yield key, serializer.prepare(record)
+
+    with open(source, 'rb') as f, open(destination, 'wb') as out:
+        serializer.dump(records(f), out)
+    return count
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4:
+        print("Usage: {} <source> <destination> <json|pickle>"
+              .format(sys.argv[0]))
+        sys.exit(1)
+    try:
+        print("{} records converted".format(convert(*sys.argv[1:])))
+    except (OSError, ValueError) as e:
+        print(e)
+        sys.exit(1)
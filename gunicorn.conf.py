@@ -0,0 +1,16 @@
+#!/usr/bin/python3
+"""The gunicorn settings of the web application
+
+Usage: gunicorn wsgi:app
+
+WEB_CONCURRENCY sets the number of worker processes (default 2 per CPU
+plus one) and PORT the port to listen on (5000).
+"""
+import multiprocessing
+import os
+
+bind = '0.0.0.0:' + os.getenv('PORT', '5000')
+workers = int(os.getenv('WEB_CONCURRENCY',
+                        str(multiprocessing.cpu_count() * 2 + 1)))
+# Loads wsgi.py, and with it the storage, before forking the workers
+preload_app = True
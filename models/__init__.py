@@ -1,5 +1,6 @@
 #!/usr/bin/python3
-"""Instantiates a storage object, choosing between DBStorage and FileStorage
+"""Instantiates a storage object, choosing between DBStorage, RecordStorage
+and FileStorage
 """
 import os
 
@@ -8,6 +9,9 @@ storage_type = os.getenv('HBNB_TYPE_STORAGE')
 if storage_type == 'db':
     from .engine.db_storage import DBStorage
     storage = DBStorage()
+elif storage_type == 'record':
+    from .engine.record_storage import RecordStorage
+    storage = RecordStorage()
 else:
     from .engine.file_storage import FileStorage
     storage = FileStorage()
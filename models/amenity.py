@@ -17,7 +17,7 @@ class Amenity(BaseModel, Base):
     if storage_type == 'db':
         __tablename__ = "amenities"
         __table_args__ = {'mysql_default_charset': 'latin1'}
-        name = Column(String(128), nullable=False)
+        name = Column(String(128), nullable=False, index=True)
         place_amenities = relationship("Place", secondary="place_amenity",
                                        back_populates="amenities")
 
@@ -2,6 +2,7 @@
 """The BaseModel module
 """
 from datetime import datetime
+import os
 import models
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.orm import declarative_base
@@ -12,8 +13,13 @@ if models.storage_type == 'db':
 else:
     Base = object
 
+if models.storage_type != 'db' and os.getenv('HBNB_COMPACT_MODELS') == '1':
+    from .compact import CompactModel as ModelType
+else:
+    ModelType = type
+
 
-class BaseModel:
+class BaseModel(metaclass=ModelType):
     """Defines the common attributes/methods for other classes
     """
     if models.storage_type == 'db':
@@ -35,11 +41,23 @@ class BaseModel:
                 self.created_at = self.updated_at = datetime.utcnow()
 
             for key, value in kwargs.items():
-                if key in ["created_at", "updated_at"]:
+                if key in ["created_at", "updated_at"] and \
+                        isinstance(value, str):
                     value = datetime.fromisoformat(value)
                 if key != "__class__":
                     setattr(self, key, value)
 
+    if models.storage_type != 'db':
+        def __setattr__(self, name, value):
+            """Sets an attribute, letting the storage re-index the object
+            when a foreign key such as state_id changes, and flagging the
+            object as changed
+            """
+            if name.endswith('_id'):
+                models.storage.update_index(self, name, value)
+            models.storage.mark_dirty(self)
+            super().__setattr__(name, value)
+
     def __str__(self):
         """Returns a string representation of the instance
         """
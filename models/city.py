@@ -3,7 +3,7 @@
 """
 from .base_model import BaseModel, Base
 from models import storage_type
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 
@@ -17,7 +17,9 @@ class City(BaseModel, Base):
     """
     if storage_type == 'db':
         __tablename__ = "cities"
-        __table_args__ = {'mysql_default_charset': 'latin1'}
+        # The cities of a state are listed by name
+        __table_args__ = (Index('ix_cities_state_id_name', 'state_id', 'name'),
+                          {'mysql_default_charset': 'latin1'})
         name = Column(String(128), nullable=False)
         state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
         places = relationship("Place", backref="cities", cascade="all, delete")
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""Compact, __slots__-based models for file mode
+
+With HBNB_COMPACT_MODELS=1 (and any storage type but 'db'), BaseModel and
+the model classes are created by CompactModel. The default values a class
+body declares, e.g. name = "" in State, become slots, so instances carry
+no per-instance dictionary. Attributes a class does not declare, like the
+extra parameters of the console's create command, go to a dictionary that
+is only allocated for the instances that have some.
+
+__dict__ is rebuilt from the slots and the extra attributes when read, so
+__str__(), to_dict() and the storage engines see the same dictionary as
+before; changing that dictionary does not change the instance.
+"""
+
+
+class CompactModel(type):
+    """Metaclass that stores the declared attributes of models in slots
+
+    Attributes:
+        _defaults (dict): Attribute name -> default value, inherited
+        _fields (tuple): The slot attributes, in declaration order
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        """Creates a model class, moving its default values out of the
+        class body and declaring slots in their place
+
+        Args:
+            name (str): The class name
+            bases (tuple): The base classes
+            namespace (dict): The class body
+        """
+        defaults = {}
+        for key, value in list(namespace.items()):
+            if key.startswith('__') or callable(value) or \
+                    isinstance(value, (property, staticmethod, classmethod)):
+                continue
+            defaults[key] = namespace.pop(key)
+
+        fields = tuple(defaults)
+        if not any(isinstance(base, CompactModel) for base in bases):
+            fields = ('id', 'created_at', 'updated_at') + fields
+            defaults['_extra'] = None
+            namespace['__slots__'] = fields + ('_extra',)
+            namespace['__dict__'] = property(_attributes)
+            namespace['__getattr__'] = _getattr
+            namespace['__setattr__'] = _setattr(
+                namespace.get('__setattr__', object.__setattr__))
+            namespace['__delattr__'] = _delattr
+        else:
+            namespace['__slots__'] = fields
+
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls._defaults = dict(getattr(cls, '_defaults', {}), **defaults)
+        cls._fields = getattr(cls, '_fields', ()) + fields
+        return cls
+
+
+def _attributes(self):
+    """Returns the attributes set on an instance, as __dict__ would
+    """
+    attrs = {}
+    for name in type(self)._fields:
+        try:
+            attrs[name] = object.__getattribute__(self, name)
+        except AttributeError:
+            pass
+    if self._extra:
+        attrs.update(self._extra)
+    return attrs
+
+
+def _getattr(self, name):
+    """Looks up the attributes that are not in a slot: the extra
+    attributes first, then the class defaults
+
+    Args:
+        name (str): The attribute name
+    """
+    if name != '_extra':
+        extra = self._extra
+        if extra and name in extra:
+            return extra[name]
+    try:
+        return type(self)._defaults[name]
+    except KeyError:
+        raise AttributeError("'{}' object has no attribute '{}'"
+                             .format(type(self).__name__, name)) from None
+
+
+def _setattr(setattr_):
+    """Wraps the __setattr__ of the root model so attributes without a
+    slot are kept in the extra attributes
+
+    Args:
+        setattr_ (callable): The __setattr__ declared by the class body
+    """
+    def __setattr__(self, name, value):
+        """Sets a slot, or an extra attribute if there is no slot for it
+        """
+        try:
+            setattr_(self, name, value)
+        except AttributeError:
+            if hasattr(type(self), name):
+                raise
+            if self._extra is None:
+                object.__setattr__(self, '_extra', {})
+            self._extra[name] = value
+    return __setattr__
+
+
+def _delattr(self, name):
+    """Deletes a slot, or an extra attribute if there is no slot for it
+
+    Args:
+        name (str): The attribute name
+    """
+    try:
+        object.__delattr__(self, name)
+    except AttributeError:
+        if not self._extra or name not in self._extra:
+            raise
+        del self._extra[name]
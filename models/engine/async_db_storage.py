@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+"""The AsyncDBStorage module
+"""
+import asyncio
+
+from sqlalchemy import event, inspect, make_url
+from sqlalchemy.ext.asyncio import (AsyncSession, async_scoped_session,
+                                    async_sessionmaker, create_async_engine)
+from sqlalchemy.pool import StaticPool
+
+from ..amenity import Amenity
+from ..base_model import Base
+from ..city import City
+from ..place import Place
+from ..review import Review
+from ..state import State
+from ..user import User
+from .db_storage import (DBStorage, all_queries, count_query, database_url,
+                         engine_options, find_query, keys_query)
+
+# The asyncio drivers replacing the blocking ones of DBStorage
+ASYNC_DRIVERS = {'mysql': 'mysql+aiomysql', 'sqlite': 'sqlite+aiosqlite'}
+
+
+class AsyncDBStorage:
+    """Defines the AsyncDBStorage class, an asyncio version of DBStorage
+    built on SQLAlchemy's asyncio extension
+
+    It uses the database and pool settings of DBStorage, through the
+    asyncio driver of the same database (aiomysql or aiosqlite). Every
+    asyncio task gets its own session, which close() ends.
+
+    Relationships are not loaded lazily under asyncio: a page that walks
+    state.cities must ask all() to load them, e.g.
+    await storage.all(State, load=('cities',)).
+
+    Attributes:
+        __engine (sqlalchemy.ext.asyncio.AsyncEngine): The working engine
+        __session (sqlalchemy.ext.asyncio.async_scoped_session): The
+                                                                 sessions
+        __models (tuple): The model classes, in the order all() reads them
+    """
+    __engine = None
+    __session = None
+    __models = (State, City, User, Place, Review, Amenity)
+
+    def __init__(self):
+        """Initializes an instance of the AsyncDBStorage class
+        """
+        url = make_url(database_url().strip())
+        self.__engine = create_async_engine(
+            url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]),
+            **engine_options(url))
+        if url.get_backend_name() == 'sqlite':
+            event.listen(self.__engine.sync_engine, 'connect',
+                         DBStorage._sqlite_connect)
+
+    async def all(self, cls=None, load=(), columns=(), offset=0,
+                  limit=None, order_by=None):
+        """Returns a dictionary of models currently in storage; without a
+        class, the query of each class runs at the same time, as in
+        DBStorage.all()
+
+        Args:
+            cls (class): The class to filter for
+            load (tuple): Names of relationships of cls to preload, e.g.
+                          ('cities',) for State
+            columns (tuple): Names of the columns to select, e.g.
+                             ('name',); every column if empty
+            offset (int): The number of objects of cls to skip
+            limit (int): The maximum number of objects of cls to return;
+                         all of them if None
+            order_by (str): The attribute the objects of cls are sorted
+                            by before paging, then their id; by id if None
+
+        Raises:
+            ValueError: If a page is asked for without a class
+        """
+        queries = all_queries(self.__models, cls, load, columns, offset,
+                              limit, order_by)
+        session = self.__session()  # type: ignore
+        if len(queries) > 1 and \
+                not isinstance(self.__engine.pool, StaticPool) and \
+                not (session.new or session.dirty or session.deleted):
+            objs = await self._read_concurrently(session, queries)
+        else:
+            objs = [obj for query in queries
+                    for obj in await session.scalars(query)]
+
+        return {'{}.{}'.format(type(obj).__name__, obj.id): obj
+                for obj in objs}
+
+    async def find(self, cls, where=None, ranges=None, having=None,
+                   order_by=None, after=None, limit=None):
+        """Returns the objects of a class that meet every condition, in
+        order, one page at a time; see DBStorage.find()
+
+        Args:
+            cls (class): The class of the objects
+            where (dict): Attribute -> the values it may hold
+            ranges (dict): Attribute -> (lowest, highest) value it may hold
+            having (dict): Relationship -> the ids of the objects each
+                           object must all be linked to
+            order_by (str): The attribute the objects are sorted by
+            after (tuple): The sort values of the last object of the
+                           previous page
+            limit (int): The maximum number of objects
+        """
+        result = await self.__session().scalars(find_query(  # type: ignore
+            cls, where, ranges, having, order_by, after, limit))
+        return {'{}.{}'.format(cls.__name__, obj.id): obj for obj in result}
+
+    async def count(self, cls=None):
+        """Returns the number of models in storage, counted by the
+        database in a single query
+
+        Args:
+            cls (class): The class to filter for
+
+        Returns:
+            int: The number of objects
+        """
+        result = await self.__session().execute(  # type: ignore
+            count_query(self.__models, cls))
+        return sum(result.one())
+
+    async def keys(self, cls=None):
+        """Returns the keys of the models in storage without loading them,
+        in one UNION ALL query
+
+        Args:
+            cls (class): The class to filter for
+
+        Returns:
+            list: The '<class name>.<id>' keys
+        """
+        result = await self.__session().execute(  # type: ignore
+            keys_query(self.__models, cls))
+        return list(result.scalars())
+
+    async def _read_concurrently(self, session, queries):
+        """Runs queries at the same time, each in a session and on a pooled
+        connection of its own, then adds the objects to a session
+
+        Args:
+            session (sqlalchemy.ext.asyncio.AsyncSession): The session of
+                                                           the objects
+            queries (list): The queries
+
+        Returns:
+            list: The objects, in the order of the queries
+        """
+        async def read(query):
+            """Returns the objects of a query, detached from its session
+            """
+            async with AsyncSession(self.__engine,
+                                    expire_on_commit=False) as reader:
+                return list(await reader.scalars(query))
+
+        objs = []
+        for result in await asyncio.gather(*map(read, queries)):
+            for obj in result:
+                held = session.identity_map.get(inspect(obj).key)
+                if held is None:
+                    session.add(obj)
+                    held = obj
+                objs.append(held)
+        return objs
+
+    async def get(self, cls, id):
+        """Returns the object of a class with the given id
+
+        Args:
+            cls (class): The class of the object
+            id (str): The id of the object
+
+        Returns:
+            The object, or None if it is not in the database
+        """
+        return await self.__session().get(cls, id)  # type: ignore
+
+    async def new(self, obj):
+        """Adds a new object to the session of the current task
+
+        Args:
+            obj: The object to add
+        """
+        self.__session().add(obj)  # type: ignore
+
+    async def save(self):
+        """Commits all changes in the session of the current task
+        """
+        await self.__session().commit()  # type: ignore
+
+    async def delete(self, obj=None):
+        """Deletes an object from the session of the current task
+
+        Args:
+            obj: The object to delete
+        """
+        if obj is not None:
+            await self.__session().delete(obj)  # type: ignore
+
+    async def reload(self):
+        """Creates all tables in the database and creates the sessions
+        """
+        async with self.__engine.begin() as conn:  # type: ignore
+            await conn.run_sync(Base.metadata.create_all)  # type: ignore
+        self.__session = async_scoped_session(
+            async_sessionmaker(self.__engine, expire_on_commit=False),
+            scopefunc=asyncio.current_task)
+
+    async def close(self):
+        """Closes the session of the current task
+        """
+        await self.__session.remove()  # type: ignore
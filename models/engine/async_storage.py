@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+"""The AsyncStorage module
+"""
+import asyncio
+import concurrent.futures
+import functools
+
+
+class AsyncStorage:
+    """Gives a storage engine an asyncio interface by running its methods
+    on a worker thread, so the event loop keeps serving other requests
+    while a file is read or written
+
+    Used for FileStorage and RecordStorage, whose objects live in this
+    process. Their state is not safe to change from several threads at
+    once, so the calls run one at a time, in the order they were made;
+    most of them only touch memory and return at once, while save() and
+    reload() wait on the disk.
+
+    Attributes:
+        __storage: The wrapped storage engine
+        __executor (concurrent.futures.ThreadPoolExecutor): The worker
+    """
+
+    def __init__(self, storage):
+        """Wraps a storage engine
+
+        Args:
+            storage: The FileStorage or RecordStorage to wrap
+        """
+        self.__storage = storage
+        self.__executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='storage')
+
+    async def all(self, cls=None, **kwargs):
+        """Returns a dictionary of models currently in storage
+
+        Args:
+            cls (class): The class to filter for
+            kwargs: The other arguments of the engine's all()
+        """
+        return await self._run(self.__storage.all, cls, **kwargs)
+
+    async def find(self, cls, **kwargs):
+        """Returns one page of the objects of a class that meet conditions
+
+        Args:
+            cls (class): The class of the objects
+            kwargs: The other arguments of the engine's find()
+        """
+        return await self._run(self.__storage.find, cls, **kwargs)
+
+    async def count(self, cls=None):
+        """Returns the number of models in storage
+
+        Args:
+            cls (class): The class to filter for
+        """
+        return await self._run(self.__storage.count, cls)
+
+    async def keys(self, cls=None):
+        """Returns the keys of the models in storage
+
+        Args:
+            cls (class): The class to filter for
+        """
+        return await self._run(self.__storage.keys, cls)
+
+    async def get(self, cls, id):
+        """Returns the object of a class with the given id, or None
+
+        Args:
+            cls (class): The class of the object
+            id (str): The id of the object
+        """
+        return await self._run(self.__storage.get, cls, id)
+
+    async def related(self, cls, attr, value, order_by=None):
+        """Returns the objects of a class whose attribute has a value
+
+        Args:
+            cls (class): The class of the objects
+            attr (str): The foreign key attribute, e.g. 'state_id'
+            value (str): The id it refers to
+            order_by (str): The attribute they are sorted by, if any
+        """
+        return await self._run(self.__storage.related, cls, attr, value,
+                               order_by)
+
+    async def new(self, obj):
+        """Adds an object to storage
+
+        Args:
+            obj: The object to add
+        """
+        await self._run(self.__storage.new, obj)
+
+    async def save(self):
+        """Writes the changes to storage
+        """
+        await self._run(self.__storage.save)
+
+    async def delete(self, obj=None):
+        """Deletes an object from storage
+
+        Args:
+            obj: The object to delete
+        """
+        await self._run(self.__storage.delete, obj)
+
+    async def reload(self):
+        """Loads the objects from storage
+        """
+        await self._run(self.__storage.reload)
+
+    async def close(self):
+        """Picks up the changes other processes made to storage
+        """
+        await self._run(self.__storage.close)
+
+    async def _run(self, method, *args, **kwargs):
+        """Calls a method of the engine on the worker thread
+
+        Args:
+            method (callable): The bound method
+            args: Its positional arguments
+            kwargs: Its keyword arguments
+
+        Returns:
+            What the method returns
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.__executor, functools.partial(method, *args, **kwargs))
+
+
+def async_storage():
+    """Returns an asyncio interface to the storage engine selected by
+    HBNB_TYPE_STORAGE: AsyncDBStorage for 'db', which needs SQLAlchemy's
+    asyncio extension and an async driver, else models.storage wrapped in
+    AsyncStorage
+
+    The engine must be reloaded with await storage.reload() before use
+    in db mode.
+    """
+    import models
+
+    if models.storage_type == 'db':
+        from .async_db_storage import AsyncDBStorage
+        return AsyncDBStorage()
+    return AsyncStorage(models.storage)
@@ -1,10 +1,20 @@
 #!/usr/bin/python3
 """The DBStorage module
 """
+import concurrent.futures
+import contextlib
+import functools
+import itertools
 import os
+import random
+from datetime import datetime
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import (create_engine, event, func, inspect, literal,
+                        make_url, select, tuple_, union_all)
+from sqlalchemy.orm import (Session, load_only, scoped_session,
+                            selectinload, sessionmaker)
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.expression import UpdateBase
 
 from ..amenity import Amenity
 from ..base_model import Base
@@ -15,72 +25,526 @@ from ..state import State
 from ..user import User
 
 
+def database_url():
+    """Returns the URL of the database: HBNB_DB_URL, or else the MySQL
+    database of the HBNB_MYSQL_* variables
+
+    Returns:
+        str: The SQLAlchemy URL
+    """
+    HBNB_MYSQL_USER = os.getenv('HBNB_MYSQL_USER')
+    HBNB_MYSQL_PWD = os.getenv('HBNB_MYSQL_PWD')
+    HBNB_MYSQL_HOST = os.getenv('HBNB_MYSQL_HOST')
+    HBNB_MYSQL_DB = os.getenv('HBNB_MYSQL_DB')
+
+    return os.getenv('HBNB_DB_URL') or 'mysql+mysqldb://{}:{}@{}/{}'.format(
+        HBNB_MYSQL_USER, HBNB_MYSQL_PWD, HBNB_MYSQL_HOST, HBNB_MYSQL_DB)
+
+
+def engine_options(url):
+    """Returns the create_engine() arguments for a database, with the pool
+    configured from the environment
+
+    Args:
+        url (sqlalchemy.engine.URL): The URL of the database
+
+    Returns:
+        dict: The keyword arguments
+    """
+    options = {
+        'pool_pre_ping': os.getenv('HBNB_MYSQL_PRE_PING', '1') != '0',
+        'query_cache_size': int(os.getenv('HBNB_MYSQL_CACHE_SIZE', '500')),
+    }
+    if url.get_backend_name() == 'sqlite' and \
+            url.database in (None, '', ':memory:'):
+        # Every thread shares the one connection, or each would see an
+        # empty database of its own
+        options.update(poolclass=StaticPool,
+                       connect_args={'check_same_thread': False})
+    else:
+        options.update(
+            pool_size=int(os.getenv('HBNB_MYSQL_POOL_SIZE', '5')),
+            max_overflow=int(os.getenv('HBNB_MYSQL_MAX_OVERFLOW', '10')),
+            pool_timeout=float(os.getenv('HBNB_MYSQL_POOL_TIMEOUT', '30')),
+            pool_recycle=int(os.getenv('HBNB_MYSQL_POOL_RECYCLE', '-1')))
+    return options
+
+
+def all_queries(models, cls=None, load=(), columns=(), offset=0, limit=None,
+                order_by=None):
+    """Returns the queries of DBStorage.all(), one per class
+
+    Args:
+        models (tuple): The model classes read without a class
+        cls (class): The class to filter for
+        load (tuple): Names of relationships of cls to preload
+        columns (tuple): Names of the columns to select; every column if
+                         empty
+        offset (int): The number of objects of cls to skip
+        limit (int): The maximum number of objects of cls to return
+        order_by (str): The attribute the objects of cls are sorted by
+
+    Returns:
+        list: The sqlalchemy.sql.Select queries
+
+    Raises:
+        ValueError: If a page is asked for without a class
+    """
+    paged = offset or limit is not None or order_by is not None
+    if paged and cls is None:
+        raise ValueError("pages are only available for a class")
+    queries = []
+    for model in models if cls is None else (cls,):
+        query = select(model)
+        if columns:
+            query = query.options(load_only(
+                *(getattr(model, name) for name in columns)))
+        queries.append(query)
+    if cls is None:
+        return queries
+    query, = queries
+    if load:
+        query = query.options(
+            *(selectinload(getattr(cls, name)) for name in load))
+    if paged:
+        order = () if order_by is None else (getattr(cls, order_by),)
+        query = query.order_by(*order, cls.id).offset(offset).limit(limit)
+    return [query]
+
+
+def count_query(models, cls=None):
+    """Returns the query of DBStorage.count(): one row with the count of
+    each class
+
+    Args:
+        models (tuple): The model classes counted without a class
+        cls (class): The class to filter for
+
+    Returns:
+        sqlalchemy.sql.Select: The query
+    """
+    return select(*(select(func.count()).select_from(model).scalar_subquery()
+                    for model in (models if cls is None else (cls,))))
+
+
+def keys_query(models, cls=None):
+    """Returns the query of DBStorage.keys(): the '<class name>.<id>' key
+    of every row, built by the database in one UNION ALL of the id columns
+
+    Args:
+        models (tuple): The model classes listed without a class
+        cls (class): The class to filter for
+
+    Returns:
+        sqlalchemy.sql.CompoundSelect: The query
+    """
+    return union_all(*(
+        select((literal(model.__name__ + '.') + model.id).label('key'))
+        for model in (models if cls is None else (cls,))))
+
+
+def find_query(cls, where=None, ranges=None, having=None, order_by=None,
+               after=None, limit=None):
+    """Returns the query of DBStorage.find()
+
+    Args:
+        cls (class): The class of the objects
+        where (dict): Attribute -> the values it may hold
+        ranges (dict): Attribute -> (lowest, highest) value it may hold
+        having (dict): Relationship -> the ids of the objects each object
+                       must all be linked to
+        order_by (str): The attribute the objects are sorted by
+        after (tuple): The sort values of the last object of the previous
+                       page
+        limit (int): The maximum number of objects
+
+    Returns:
+        sqlalchemy.sql.Select: The query
+    """
+    query = select(cls)
+    for attr, values in (where or {}).items():
+        query = query.where(getattr(cls, attr).in_(list(values)))
+    for attr, (low, high) in (ranges or {}).items():
+        if low is not None:
+            query = query.where(getattr(cls, attr) >= low)
+        if high is not None:
+            query = query.where(getattr(cls, attr) <= high)
+    for rel, ids in (having or {}).items():
+        relationship = getattr(cls, rel)
+        linked = relationship.property.mapper.class_
+        for id in ids:
+            query = query.where(relationship.any(linked.id == id))
+    order = (cls.id,) if order_by is None else \
+        (getattr(cls, order_by), cls.id)
+    if after is not None:
+        query = query.where(tuple_(*order) > tuple_(*after))
+    return query.order_by(*order).limit(limit)
+
+
+class _RoutingSession(Session):
+    """A session that reads from a replica until it writes to the primary
+
+    Attributes:
+        replicas (tuple): The engines of the read replicas
+    """
+
+    def __init__(self, replicas=(), **kwargs):
+        """Creates a session bound to the primary
+
+        Args:
+            replicas (tuple): The engines of the read replicas
+            kwargs: The arguments of Session
+        """
+        super().__init__(**kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        """Returns the engine of a statement: the primary for flushes and
+        for every statement once the session wrote, a replica otherwise
+
+        Args:
+            mapper: The mapper of the statement, if any
+            clause: The statement, if any
+            kwargs: The other arguments of Session.get_bind
+        """
+        if not self.replicas or self._flushing or \
+                self.info.get('primary') or isinstance(clause, UpdateBase):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return random.choice(self.replicas)
+
+
 class DBStorage:
     """Defines the DBStorage class
 
+    HBNB_DB_URL selects the database by its SQLAlchemy URL, e.g.
+    sqlite:///hbnb.db or sqlite:// for an in-memory one; without it, the
+    MySQL database of the HBNB_MYSQL_* variables is used. SQLite databases
+    run in WAL mode, so readers do not block on the writer.
+
+    HBNB_DB_REPLICA_URLS lists, separated by commas, the URLs of read
+    replicas of that database. A session then reads from one of them
+    until it writes: from new(), delete() or a flush on, it reads from the
+    primary too, so a request sees its own writes, until close() ends it.
+
+    The connection pool is tuned with HBNB_MYSQL_POOL_SIZE (default 5),
+    HBNB_MYSQL_MAX_OVERFLOW (10), HBNB_MYSQL_POOL_TIMEOUT (30 seconds) and
+    HBNB_MYSQL_POOL_RECYCLE (seconds, -1 to keep connections). Connections
+    are pinged on checkout unless HBNB_MYSQL_PRE_PING=0, which saves a
+    round-trip per checkout when the recycle time is below the server's
+    wait_timeout. HBNB_MYSQL_CACHE_SIZE sets the number of compiled
+    statements cached (500, 0 disables the cache). pool_stats() reports
+    how the pool is used, to size it for the number of server workers.
+
+    A process forked from the one that created the storage, e.g. a worker
+    of a preloading WSGI server, opens connections of its own rather than
+    sharing the sockets of its parent's pool.
+
+    generation() tells the web views' page cache whether the objects of a
+    class changed: it counts the commits of this process, and reads the
+    number of rows of the class's table and their latest updated_at, so
+    the writes of other processes are seen too.
+
     Attributes:
         __engine (sqlalchemy.engine.Engine): The working SQLAlchemy engine
         __session (sqlalchemy.orm.session.Session): The working SQLAlchemy
                                                     session
+        __batching (bool): Whether save() is deferred to the end of a batch
+        __models (tuple): The model classes, in the order all() reads them
+        __replicas (tuple): The engines of the read replicas
+        __stats (dict): Engine -> the counts of its pool events, see
+                        pool_stats()
+        __generation (int): The number of changes committed by this
+                            process
+        __generations (dict): Class name -> the value of __generation at
+                              its last committed change
     """
     __engine = None
+    __replicas = ()
     __session = None
+    __batching = False
+    __models = (State, City, User, Place, Review, Amenity)
+    __generation = 0
 
     def __init__(self):
         """Initializes an instance of the DBStorage class
         """
-        HBNB_MYSQL_USER = os.getenv('HBNB_MYSQL_USER')
-        HBNB_MYSQL_PWD = os.getenv('HBNB_MYSQL_PWD')
-        HBNB_MYSQL_HOST = os.getenv('HBNB_MYSQL_HOST')
-        HBNB_MYSQL_DB = os.getenv('HBNB_MYSQL_DB')
-
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'
-                                      .format(HBNB_MYSQL_USER, HBNB_MYSQL_PWD,
-                                              HBNB_MYSQL_HOST, HBNB_MYSQL_DB),
-                                      pool_pre_ping=True)
+        self.__stats = {}
+        self.__generations = {}
+        self.__engine = self._create_engine(database_url())
+        self.__replicas = tuple(
+            self._create_engine(replica) for replica in
+            os.getenv('HBNB_DB_REPLICA_URLS', '').split(',') if replica)
         if os.getenv('HBNB_ENV') == 'test':
             Base.metadata.drop_all(self.__engine)  # type: ignore
+        os.register_at_fork(after_in_child=self._forked)
 
-    def all(self, cls=None):
+    def _create_engine(self, url):
+        """Creates the engine of a database, with its pool configured from
+        the environment and counted in pool_stats()
+
+        Args:
+            url (str): The SQLAlchemy URL of the database
+
+        Returns:
+            sqlalchemy.engine.Engine: The engine
+        """
+        url = make_url(url.strip())
+        options = engine_options(url)
+        pool_size = options.get('pool_size', 1)
+        limit = pool_size + options.get('max_overflow', 0)
+        engine = create_engine(url, **options)
+        stats = dict.fromkeys(('connects', 'checkouts', 'overflows',
+                               'exhausted', 'invalidated', 'peak',
+                               'checked_out'), 0)
+        stats['size'] = pool_size
+        self.__stats[engine] = stats
+        event.listen(engine, 'connect',
+                     functools.partial(self._pool_connect, stats))
+        event.listen(engine, 'checkout',
+                     functools.partial(self._pool_checkout, stats, limit))
+        event.listen(engine, 'checkin',
+                     functools.partial(self._pool_checkin, stats))
+        event.listen(engine, 'invalidate',
+                     functools.partial(self._pool_invalidate, stats))
+        if url.get_backend_name() == 'sqlite':
+            event.listen(engine, 'connect', self._sqlite_connect)
+        return engine
+
+    def all(self, cls=None, load=(), columns=(), offset=0, limit=None,
+            order_by=None):
         """Returns a dictionary of models currently in storage
 
+        The relationships named in load are fetched for all the objects
+        at once, with one more query each, instead of lazily with one
+        query per object when a template walks them. When columns are
+        given, only those (and the id) are selected; the others are read
+        if and when they are accessed. A page of objects is selected with
+        ORDER BY, LIMIT and OFFSET, and the dictionary keeps its order.
+
+        Without a class, the query of each class runs at the same time on
+        a pooled connection of its own, and the objects then join the
+        current session; unless the session holds changes the other
+        connections cannot see, or the database is an in-memory SQLite
+        one, whose single connection runs them one after the other.
+
         Args:
             cls (class): The class to filter for
+            load (tuple): Names of relationships of cls to preload, e.g.
+                          ('cities',) for State
+            columns (tuple): Names of the columns to select, e.g.
+                             ('name',); every column if empty
+            offset (int): The number of objects of cls to skip
+            limit (int): The maximum number of objects of cls to return;
+                         all of them if None
+            order_by (str): The attribute the objects of cls are sorted
+                            by before paging, then their id; by id if None
+
+        Raises:
+            ValueError: If a page is asked for without a class
         """
-        if cls is None:
-            objs = self.__session.query(State).all()  # type: ignore
-            objs.extend(self.__session.query(City).all())  # type: ignore
-            objs.extend(self.__session.query(User).all())  # type: ignore
-            objs.extend(self.__session.query(Place).all())  # type: ignore
-            objs.extend(self.__session.query(Review).all())  # type: ignore
-            objs.extend(self.__session.query(Amenity).all())  # type: ignore
+        queries = all_queries(self.__models, cls, load, columns, offset,
+                              limit, order_by)
+        session = self.__session()  # type: ignore
+        if len(queries) > 1 and not self.__batching and \
+                not isinstance(self.__engine.pool, StaticPool) and \
+                not (session.new or session.dirty or session.deleted or
+                     session.info.get('primary')):
+            objs = self._read_concurrently(session, queries)
         else:
-            objs = self.__session.query(cls).all()  # type: ignore
+            objs = [obj for query in queries
+                    for obj in session.scalars(query)]
 
         return {'{}.{}'.format(type(obj).__name__, obj.id): obj
                 for obj in objs}
 
+    def find(self, cls, where=None, ranges=None, having=None,
+             order_by=None, after=None, limit=None):
+        """Returns the objects of a class that meet every condition, in
+        order, one page at a time
+
+        The conditions become one query, which the indexes on the foreign
+        keys, place_amenity.amenity_id and the sorted attributes serve; the
+        page starts after the cursor with a row value comparison rather
+        than an offset, so later pages cost no more than the first.
+
+        Args:
+            cls (class): The class of the objects
+            where (dict): Attribute -> the values it may hold, e.g.
+                          {'city_id': ['<id>', ...]}
+            ranges (dict): Attribute -> (lowest, highest) value it may
+                           hold, None for no bound, e.g.
+                           {'price_by_night': (50, 100)}
+            having (dict): Relationship -> the ids of the objects each
+                           object must all be linked to, e.g.
+                           {'amenities': ['<id>', ...]}
+            order_by (str): The attribute the objects are sorted by, then
+                            their id; by id if None
+            after (tuple): The (order_by value, id), or (id,) without
+                           order_by, of the last object of the previous
+                           page; from the first object if None
+            limit (int): The maximum number of objects; all if None
+
+        Returns:
+            dict: The matching objects by key, in order
+        """
+        query = find_query(cls, where, ranges, having, order_by, after,
+                           limit)
+        return {'{}.{}'.format(cls.__name__, obj.id): obj
+                for obj in self.__session.scalars(query)}  # type: ignore
+
+    def keys(self, cls=None):
+        """Returns the keys of the models in storage without loading them
+
+        Only the ids are selected, for every class at once in a single
+        UNION ALL query, and the keys are built by the database.
+
+        Args:
+            cls (class): The class to filter for
+
+        Returns:
+            list: The '<class name>.<id>' keys
+        """
+        return list(self.__session.execute(  # type: ignore
+            keys_query(self.__models, cls)).scalars())
+
+    def count(self, cls=None):
+        """Returns the number of models in storage, counted by the
+        database in a single query
+
+        Args:
+            cls (class): The class to filter for
+
+        Returns:
+            int: The number of objects
+        """
+        counts = self.__session.execute(  # type: ignore
+            count_query(self.__models, cls)).one()
+        return sum(counts)
+
+    def get(self, cls, id):
+        """Returns the object of a class with the given id
+
+        Args:
+            cls (class): The class of the object
+            id (str): The id of the object
+
+        Returns:
+            The object, or None if it is not in the database
+        """
+        return self.__session.get(cls, id)  # type: ignore
+
     def new(self, obj):
         """Adds a new object to the current database session
 
         Args:
             obj: The object to add
         """
-        self.__session.add(obj)  # type: ignore
+        session = self.__session()  # type: ignore
+        session.info['primary'] = True
+        session.add(obj)
 
     def save(self):
-        """Commits all changes in the current database session
+        """Commits all changes in the current database session, skipping
+        the commit when the session holds no change. Does nothing within a
+        batch.
+        """
+        if self.__batching:
+            return
+        session = self.__session
+        if session.new or session.deleted or \
+                session.info.get('flushed') or \
+                any(session.is_modified(obj) for obj in session.dirty):
+            session.commit()  # type: ignore
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defers committing until the end of the block, then commits once.
+        If the block raises, the session is rolled back.
+
+        A batch opened within another one is part of the outer batch.
+        """
+        if self.__batching:
+            yield self
+            return
+        self.__batching = True
+        try:
+            yield self
+        except BaseException:
+            self.__batching = False
+            self.__session.rollback()  # type: ignore
+            raise
+        self.__batching = False
+        self.save()
+
+    def bulk_insert(self, cls, records, chunk_size=1000):
+        """Inserts a row per record with Core executemany inserts outside
+        of the session, committing one chunk at a time
+
+        Args:
+            cls (class): The class of the rows
+            records (iterable): The attribute dictionaries, as to_dict()
+                                returns them or with missing attributes
+            chunk_size (int): The number of rows inserted per commit
+
+        Returns:
+            int: The number of rows inserted
+        """
+        table = cls.__table__
+        count = 0
+        records = iter(records)
+        self.__session().info['primary'] = True  # type: ignore
+        while True:
+            rows = []
+            for record in itertools.islice(records, chunk_size):
+                # The model fills in the id and timestamps and parses them
+                obj = cls(**record)
+                row = {}
+                for column in table.columns:
+                    value = getattr(obj, column.key, None)
+                    if value is None and column.default is not None and \
+                            column.default.is_scalar:
+                        value = column.default.arg
+                    row[column.key] = value
+                rows.append(row)
+            if not rows:
+                return count
+            with self.__engine.begin() as conn:  # type: ignore
+                conn.execute(table.insert(), rows)
+            self._touch(cls.__name__)
+            count += len(rows)
+
+    def iter_records(self, cls, chunk_size=1000):
+        """Yields the record of every row of a class, as to_dict() returns
+        it, streaming the rows without loading them into the session
+
+        Args:
+            cls (class): The class of the rows
+            chunk_size (int): The number of rows fetched at a time
         """
-        self.__session.commit()  # type: ignore
+        with self._reader().connect() as conn:
+            result = conn.execution_options(
+                stream_results=True, yield_per=chunk_size).execute(
+                    select(cls.__table__))
+            for row in result.mappings():
+                record = {key: value.isoformat()
+                          if isinstance(value, datetime) else value
+                          for key, value in row.items()}
+                record['__class__'] = cls.__name__
+                yield record
 
     def delete(self, obj=None):
-        """Deletes an object from the current database session
+        """Deletes an object from the current database session and
+        commits, as the file engines save on delete. Within a batch, the
+        commit waits for the end of the block.
 
         Args:
             obj: The object to delete
         """
         if obj is not None:
-            self.__session.delete(obj)  # type: ignore
+            session = self.__session()  # type: ignore
+            session.info['primary'] = True
+            session.delete(obj)
+            self.save()
 
     def reload(self):
         """Creates all tables in the database and creates the current
@@ -88,10 +552,232 @@ class DBStorage:
         """
         Base.metadata.create_all(self.__engine)  # type: ignore
         session_factory = sessionmaker(bind=self.__engine,
+                                       class_=_RoutingSession,
+                                       replicas=self.__replicas,
                                        expire_on_commit=False)
+        event.listen(session_factory, 'after_flush', self._flushed)
+        event.listen(session_factory, 'after_transaction_end', self._ended)
+        event.listen(session_factory, 'after_commit', self._committed)
         self.__session = scoped_session(session_factory)
 
     def close(self):
         """Closes the current database session
         """
         self.__session.remove()  # type: ignore
+
+    def generation(self, cls=None):
+        """Returns a value that changes whenever a change to the objects
+        of a class is committed, by this process or another one
+
+        Rows added or deleted change the count of the table, rows saved
+        its latest updated_at, and the commits of this process the number
+        of them it made, even within the second of the last one.
+
+        Args:
+            cls (class): The class; every class if None
+
+        Returns:
+            tuple: The generation of the class, or of each class
+        """
+        if cls is None:
+            return tuple(self.generation(model) for model in self.__models)
+        count, updated_at = self.__session().execute(  # type: ignore
+            select(func.count(cls.id), func.max(cls.updated_at))).one()
+        return self.__generations.get(cls.__name__, 0), count, updated_at
+
+    def pool_stats(self, replica=None):
+        """Returns how the connection pool of the primary database, or of
+        a replica, has been used since the storage was created
+
+        A steady count of overflows means pool_size is too small for the
+        concurrent requests; exhausted checkouts, after which any further
+        checkout waited for a checkin, mean max_overflow is too.
+
+        Args:
+            replica (int): The position of the replica in
+                           HBNB_DB_REPLICA_URLS, or None for the primary
+
+        Returns:
+            dict: The pool size and its connections checked out and in
+                  overflow now, then the connections opened, checkouts,
+                  checkouts past pool_size, checkouts that left the pool
+                  exhausted, connections invalidated, e.g. by a failed
+                  pre-ping, and the most connections checked out at once
+        """
+        engine = self.__engine if replica is None else \
+            self.__replicas[replica]
+        stats = dict(self.__stats[engine])
+        stats['overflow'] = max(0, stats['checked_out'] - stats['size'])
+        return stats
+
+    def _forked(self):
+        """Drops, in a forked child, the session and pooled connections
+        inherited from the parent without closing them, as the parent
+        still uses them
+        """
+        if self.__session is not None:
+            self.__session.registry.clear()
+        for engine in (self.__engine,) + self.__replicas:
+            engine.dispose(close=False)  # type: ignore
+
+    def _read_concurrently(self, session, queries):
+        """Runs queries at the same time, each in a session and on a pooled
+        connection of its own, then adds the objects to a session
+
+        An object the session already holds is kept instead of the one
+        read, as a query in the session would.
+
+        Args:
+            session (sqlalchemy.orm.Session): The session of the objects
+            queries (list): The queries
+
+        Returns:
+            list: The objects, in the order of the queries
+        """
+        bind = self._reader()
+
+        def read(query):
+            """Returns the objects of a query, detached from its session
+            """
+            with Session(bind=bind, expire_on_commit=False) as reader:
+                return list(reader.scalars(query))
+
+        with concurrent.futures.ThreadPoolExecutor(len(queries)) as pool:
+            results = list(pool.map(read, queries))
+        objs = []
+        for obj in itertools.chain.from_iterable(results):
+            held = session.identity_map.get(inspect(obj).key)
+            if held is None:
+                session.add(obj)
+                held = obj
+            objs.append(held)
+        return objs
+
+    def _reader(self):
+        """Returns the engine to read from outside of the session: a
+        replica, unless the session wrote to the primary
+
+        Returns:
+            sqlalchemy.engine.Engine: The engine
+        """
+        session = self.__session()  # type: ignore
+        if not self.__replicas or session.info.get('primary'):
+            return self.__engine
+        return random.choice(self.__replicas)
+
+    def _committed(self, session):
+        """Moves the generations of the classes a commit changed forward
+
+        Args:
+            session (sqlalchemy.orm.Session): The committed session
+        """
+        for name in session.info.pop('changed', ()):
+            self._touch(name)
+
+    def _touch(self, name):
+        """Moves the generation of a class forward
+
+        Args:
+            name (str): The class name
+        """
+        self.__generation += 1
+        self.__generations[name] = self.__generation
+
+    @staticmethod
+    def _pool_connect(stats, dbapi_connection, connection_record):
+        """Counts the connections a pool opens
+
+        Args:
+            stats (dict): The counts of the pool
+            dbapi_connection: The DBAPI connection
+            connection_record: The pool's record of the connection
+        """
+        stats['connects'] += 1
+
+    @staticmethod
+    def _pool_checkout(stats, limit, dbapi_connection, connection_record,
+                       connection_proxy):
+        """Counts a checkout, noting whether it went past pool_size or took
+        the last connection the pool may open
+
+        Args:
+            stats (dict): The counts of the pool
+            limit (int): The most connections the pool may open
+            dbapi_connection: The DBAPI connection
+            connection_record: The pool's record of the connection
+            connection_proxy: The connection handed out
+        """
+        stats['checked_out'] += 1
+        stats['checkouts'] += 1
+        stats['peak'] = max(stats['peak'], stats['checked_out'])
+        if stats['checked_out'] > stats['size']:
+            stats['overflows'] += 1
+        if stats['checked_out'] >= limit:
+            stats['exhausted'] += 1
+
+    @staticmethod
+    def _pool_checkin(stats, dbapi_connection, connection_record):
+        """Counts a connection returned to a pool
+
+        Args:
+            stats (dict): The counts of the pool
+            dbapi_connection: The DBAPI connection
+            connection_record: The pool's record of the connection
+        """
+        stats['checked_out'] -= 1
+
+    @staticmethod
+    def _pool_invalidate(stats, dbapi_connection, connection_record,
+                         exception):
+        """Counts the connections discarded as invalid
+
+        Args:
+            stats (dict): The counts of the pool
+            dbapi_connection: The DBAPI connection
+            connection_record: The pool's record of the connection
+            exception: The error that invalidated it, if any
+        """
+        stats['invalidated'] += 1
+
+    @staticmethod
+    def _sqlite_connect(dbapi_connection, connection_record):
+        """Sets up a new SQLite connection: the write-ahead log lets readers
+        run alongside the writer, with a sync at checkpoints rather than
+        at every commit, and foreign keys are enforced as in MySQL
+
+        Args:
+            dbapi_connection (sqlite3.Connection): The DBAPI connection
+            connection_record: The pool's record of the connection
+        """
+        cursor = dbapi_connection.cursor()
+        for pragma in ('journal_mode=WAL', 'synchronous=NORMAL',
+                       'foreign_keys=ON'):
+            cursor.execute('PRAGMA ' + pragma)
+        cursor.close()
+
+    @staticmethod
+    def _flushed(session, flush_context):
+        """Records that the transaction holds flushed changes, e.g. those
+        autoflushed by a query, which no longer show in session.new
+
+        Args:
+            session (sqlalchemy.orm.Session): The flushed session
+            flush_context: The flush context
+        """
+        session.info['flushed'] = True
+        session.info['primary'] = True
+        session.info.setdefault('changed', set()).update(
+            type(obj).__name__ for obj in itertools.chain(
+                session.new, session.dirty, session.deleted))
+
+    @staticmethod
+    def _ended(session, transaction):
+        """Forgets the flushed changes once the transaction ends
+
+        Args:
+            session (sqlalchemy.orm.Session): The session
+            transaction (sqlalchemy.orm.SessionTransaction): The transaction
+        """
+        if transaction.parent is None:
+            session.info.pop('flushed', None)
+            session.info.pop('changed', None)
@@ -1,32 +1,205 @@
 #!/usr/bin/python3
 """The FileStorage module
 """
+import contextlib
+import fcntl
+import itertools
 import json
+import os
+import sys
+import threading
+import uuid
+from datetime import datetime
+
+from .serializers import detect, get_serializer
 
 
 class FileStorage:
     """Serializes instances to a JSON file and deserializes from a JSON file
     to instances
 
+    When journaling is enabled (HBNB_FILE_JOURNAL=1), save() only appends the
+    objects added or deleted since the last save to a write-ahead log next to
+    the JSON file. reload() replays that log on top of the JSON snapshot, and
+    once the log grows past HBNB_FILE_JOURNAL_LIMIT entries it is compacted
+    into a new snapshot by a background thread. Log appends, rotations and
+    snapshot replacements hold a lock file shared with the other processes
+    using the same files, and the running compaction holds a lock on the
+    rotated log, so a rotated log is only folded back by another process
+    once the compaction that left it is gone.
+
+    When lazy loading is enabled (HBNB_FILE_LAZY=1), reload() keeps the
+    records as raw dictionaries and only instantiates the models that are
+    reached through all(), get() or related().
+
+    HBNB_FILE_FORMAT selects the snapshot format written by save(): 'json'
+    (the default) or the binary 'pickle'. reload() reads either.
+
+    When the format encodes records one at a time, save() keeps the
+    encoding of every object it writes and reuses it until the object is
+    flagged as changed: BaseModel flags itself whenever an attribute is
+    set, and new() flags the object it is given. Values changed in place,
+    e.g. a list appended to, are only picked up once the object is passed
+    to new(), which BaseModel.save() does.
+
+    Within a batch() block, save() does nothing until the block ends; an
+    exception in the block puts the objects back as they were before it.
+
+    close(), which the web apps call after every request, only reloads when
+    the files changed since this process last read or wrote them, and only
+    replays the new entries when just the log grew.
+
+    generation() tells the web views' page cache whether the objects of a
+    class changed: through new() or delete(), or as close() read them
+    from the files another process wrote. The orders all() and related()
+    sort objects in are kept until the generation of their class moves.
+
     Attributes:
         __file_path (str): The path to the JSON file
         __objects (dict): A dictionary to store instantiated objects
+        __journal (bool): Whether save() appends to the log instead of
+                          rewriting the whole file
+        __journal_limit (int): The number of log entries that triggers a
+                               compaction
+        __journal_size (int): The number of entries in the current log
+        __pending (dict): The keys changed since the last save, mapped to
+                          the object to write or None for a deletion
+        __lock (threading.Lock): Serializes log appends, log rotation and
+                                 snapshot replacements within the process
+        __compactor (threading.Thread): The running compaction, if any
+        __classes (dict): Class name -> {key: object} index of __objects
+        __foreign_keys (tuple): The attributes indexed in __relations
+        __relations (dict): (class name, attribute, id) -> {key: object}
+                            reverse index of the foreign key attributes
+        __indexed (dict): The objects dictionary the indexes were built from
+        __indexed_len (int): The size of __indexed when last synced
+        __lazy (bool): Whether reload() defers instantiating models
+        __raw (dict): The records loaded but not instantiated yet, by key
+        __models (dict): Class name -> model class
+        __seen (tuple): The (inode, size, mtime) of the JSON file when last
+                        read or written
+        __log_inode (int): The inode of the log when last read or written
+        __log_offset (int): The number of log bytes already applied
+        __format (str): The name of the snapshot format written
+        __fragments (dict): Key -> (object, encoding) of the objects that
+                            did not change since save() encoded them
+        __undo (dict): While in a batch, key -> (previous object or raw
+                       record, its attributes) for every key the batch
+                       changed; None outside of a batch
+        __generation (int): The number of changes seen by this process
+        __generations (dict): Class name, or None for every class -> the
+                              value of __generation at its last change
+        __orders (dict): (class name, attribute, foreign key bucket or
+                         None) -> (generation, sorted keys) of the orders
+                         computed by _ordered()
     """
     __file_path = 'file.json'
     __objects = {}
+    __journal = os.getenv('HBNB_FILE_JOURNAL') == '1'
+    __journal_limit = int(os.getenv('HBNB_FILE_JOURNAL_LIMIT', '10000'))
+    __journal_size = 0
+    __pending = {}
+    __lock = threading.Lock()
+    __compactor = None
+    __classes = {}
+    __foreign_keys = ('state_id', 'city_id', 'place_id', 'user_id')
+    __relations = {}
+    __indexed = None
+    __indexed_len = 0
+    __lazy = os.getenv('HBNB_FILE_LAZY') == '1'
+    __raw = {}
+    __models = {}
+    __seen = None
+    __log_inode = None
+    __log_offset = 0
+    __format = os.getenv('HBNB_FILE_FORMAT', 'json')
+    __fragments = {}
+    __undo = None
+    __generation = 0
+    __generations = {}
+    __orders = {}
 
-    def all(self, cls=None):
+    def all(self, cls=None, load=(), columns=(), offset=0, limit=None,
+            order_by=None):
         """Returns a dictionary of models currently in storage
 
+        A page is cut from the class index, and only the raw records on
+        that page are instantiated; the dictionary keeps its order.
+
+        Args:
+            cls (class): The class to filter for
+            load (tuple): Unused, related objects are looked up through
+                          the indexes
+            columns (tuple): Unused, the objects are whole in memory
+            offset (int): The number of objects of cls to skip
+            limit (int): The maximum number of objects of cls to return;
+                         all of them if None
+            order_by (str): The attribute the objects of cls are sorted
+                            by before paging, then their id; by id if None
+
+        Raises:
+            ValueError: If a page is asked for without a class
+        """
+        self._sync_indexes()
+        paged = offset or limit is not None or order_by is not None
+        if paged and cls is None:
+            raise ValueError("pages are only available for a class")
+        if cls is None:
+            self._hydrate_all(self.__raw)
+            return self.__objects
+        entries = self.__classes.get(cls.__name__, {})
+        if not paged:
+            self._hydrate_all(entries)
+            return dict(entries)
+        keys = self._ordered(cls, entries, order_by)
+        keys = keys[offset:None if limit is None else offset + limit]
+        return {key: self._hydrate(key) if type(entries[key]) is dict
+                else entries[key] for key in keys}
+
+    def count(self, cls=None):
+        """Returns the number of models in storage, from the indexes
+
+        Args:
+            cls (class): The class to filter for
+
+        Returns:
+            int: The number of objects
+        """
+        self._sync_indexes()
+        if cls is not None:
+            return len(self.__classes.get(cls.__name__, {}))
+        return len(self.__raw) + len(self.__objects)
+
+    def keys(self, cls=None):
+        """Returns the keys of the models in storage, without
+        instantiating the raw records of lazy loading
+
         Args:
             cls (class): The class to filter for
+
+        Returns:
+            list: The '<class name>.<id>' keys
         """
+        self._sync_indexes()
         if cls is not None:
-            return {
-                key: val for key, val in self.__objects.items()
-                if val.__class__ == cls
-            }
-        return self.__objects
+            return list(self.__classes.get(cls.__name__, {}))
+        return list(self.__raw) + list(self.__objects)
+
+    def get(self, cls, id):
+        """Returns the object of a class with the given id
+
+        Args:
+            cls (class): The class of the object
+            id (str): The id of the object
+
+        Returns:
+            The object, or None if it is not in storage
+        """
+        self._sync_indexes()
+        key = cls.__name__ + '.' + id
+        if key in self.__raw:
+            return self._hydrate(key)
+        return self.__objects.get(key)
 
     def new(self, obj):
         """Adds a new object to the storage dictionary
@@ -34,41 +207,52 @@ class FileStorage:
         Args:
             obj: The object to add to storage
         """
-        self.all().update({obj.to_dict()['__class__'] + '.' + obj.id: obj})
+        key = obj.__class__.__name__ + '.' + obj.id
+        self._sync_indexes()
+        self._remember(key)
+        self._load(key, obj)
+        self.__fragments.pop(key, None)
+        self.__pending[key] = obj
+        self._touch(obj.__class__.__name__)
 
     def save(self):
-        """Saves storage dictionary to file
+        """Saves storage dictionary to file, or appends the pending changes
+        to the log when journaling is enabled. Does nothing within a batch.
         """
-        temp = {}
-        with open(self.__file_path, 'w', encoding='utf-8') as f:
-            temp.update(self.__objects)
-            for key, val in temp.items():
-                temp[key] = val.to_dict()
-            json.dump(temp, f)
+        if self.__undo is not None:
+            return
+        if self.__journal:
+            self._append_log()
+        else:
+            if self._compacting():
+                self.__compactor.join()
+            with self._locked():
+                os.replace(self._write_snapshot(self._entries(), cache=True),
+                           self.__file_path)
+                self._remove_logs()
+                self._saw_snapshot()
+        self.__pending.clear()
 
     def reload(self):
-        """Loads file into storage dictionary
-        """
-        from ..amenity import Amenity
-        from ..base_model import BaseModel
-        from ..city import City
-        from ..place import Place
-        from ..review import Review
-        from ..state import State
-        from ..user import User
-
-        classes = {
-            'BaseModel': BaseModel, 'User': User, 'Place': Place,
-            'State': State, 'City': City, 'Amenity': Amenity,
-            'Review': Review
-        }
-        try:
-            with open(self.__file_path, 'r') as f:
-                temp = json.load(f)
-                for key, val in temp.items():
-                    self.all()[key] = classes[val['__class__']](**val)
-        except (FileNotFoundError, ValueError):
-            pass
+        """Loads file into storage dictionary one record at a time, then
+        replays the log
+        """
+        self._read_files()
+        if not os.path.exists(self._log_path() + '.old') or \
+                self._compacting():
+            return
+        with self._locked():
+            if not self._compaction_died():
+                return
+            # A previous compaction never finished; fold both logs into a
+            # fresh snapshot before a new rotation can overwrite them
+            self._read_files()
+            os.replace(self._write_snapshot(self._entries()),
+                       self.__file_path)
+            self._remove_logs()
+            self._saw_snapshot()
+            self._saw_log(None, 0)
+            FileStorage.__journal_size = 0
 
     def delete(self, obj=None):
         """Delete obj from __objects if present
@@ -79,12 +263,818 @@ class FileStorage:
         if obj is None:
             return
         key = "{}.{}".format(obj.__class__.__name__, obj.id)
-        objects = self.all()
-        if key in objects:
-            del objects[key]
+        self._sync_indexes()
+        if key in self.__objects:
+            self._remember(key)
+            self._unload(key)
+            self.__pending[key] = None
+            self._touch(obj.__class__.__name__)
             self.save()
 
     def close(self):
-        """Deserialize JSON file to objects
+        """Deserialize JSON file to objects if it changed on disk or
+        __objects was changed from outside the storage, applying only the
+        new log entries when just the log grew
+        """
+        objects = self.__objects
+        if self.__indexed is not objects or \
+                self.__indexed_len != len(objects) or \
+                self._stat(self.__file_path) != self.__seen or (
+                    os.path.exists(self._log_path() + '.old') and
+                    not self._compacting()):
+            self.reload()
+            return
+        log = self._stat(self._log_path())
+        if log is None:
+            if self.__log_offset:
+                self.reload()
+        elif log[0] != self.__log_inode or log[1] < self.__log_offset:
+            self.reload()
+        elif log[1] > self.__log_offset:
+            self._replay(self._log_path(), self.__log_offset)
+
+    def find(self, cls, where=None, ranges=None, having=None,
+             order_by=None, after=None, limit=None):
+        """Returns the objects of a class that meet every condition, in
+        order, one page at a time
+
+        When a condition lists the values of an indexed foreign key, e.g.
+        city_id, the candidates come from those buckets of the index;
+        otherwise they are taken in the order kept for the class. Only the
+        raw records that pass the conditions on their attributes are
+        instantiated.
+
+        Args:
+            cls (class): The class of the objects
+            where (dict): Attribute -> the values it may hold, e.g.
+                          {'city_id': ['<id>', ...]}
+            ranges (dict): Attribute -> (lowest, highest) value it may
+                           hold, None for no bound, e.g.
+                           {'price_by_night': (50, 100)}
+            having (dict): Relationship -> the ids of the objects each
+                           object must all be linked to, e.g.
+                           {'amenities': ['<id>', ...]}
+            order_by (str): The attribute the objects are sorted by, then
+                            their id; by id if None
+            after (tuple): The (order_by value, id), or (id,) without
+                           order_by, of the last object of the previous
+                           page; from the first object if None
+            limit (int): The maximum number of objects; all if None
+
+        Returns:
+            dict: The matching objects by key, in order
+        """
+        self._sync_indexes()
+        name = cls.__name__
+        where = {attr: set(values) for attr, values in (where or {}).items()}
+        indexed = [attr for attr in where if attr in self.__foreign_keys]
+        if indexed:
+            entries = {}
+            for value in where[indexed[0]]:
+                entries.update(
+                    self.__relations.get((name, indexed[0], value), {}))
+            keys = self._order(cls, entries, order_by)
+        else:
+            entries = self.__classes.get(name, {})
+            keys = self._ordered(cls, entries, order_by)
+        if after is not None:
+            sort_key = self._sort_key(cls, entries, order_by)
+            last = name + '.' + after[-1]
+            if order_by is not None:
+                last = (after[0] is not None, after[0], last)
+            keys = itertools.dropwhile(lambda key: sort_key(key) <= last,
+                                       keys)
+
+        found = {}
+        for key in keys:
+            if limit is not None and len(found) >= limit:
+                break
+            entry = entries[key]
+            if not self._meets(cls, entry, where, ranges or {}):
+                continue
+            if type(entry) is dict:
+                entry = self._hydrate(key)
+            if any(not set(ids) <= {obj.id for obj in getattr(entry, rel)}
+                   for rel, ids in (having or {}).items()):
+                continue
+            found[key] = entry
+        return found
+
+    def generation(self, cls=None):
+        """Returns a number that grows whenever objects of a class are
+        added, replaced or deleted in this process's view of storage
+
+        Args:
+            cls (class): The class; any class if None
+
+        Returns:
+            int: The generation of the class
+        """
+        self._sync_indexes()
+        if cls is None:
+            return self.__generation
+        return max(self.__generations.get(cls.__name__, 0),
+                   self.__generations.get(None, 0))
+
+    def related(self, cls, attr, value, order_by=None):
+        """Returns the objects of a class whose foreign key attribute holds
+        the given value, e.g. related(City, 'state_id', state.id)
+
+        Args:
+            cls (class): The class of the objects to return
+            attr (str): The foreign key attribute, one of __foreign_keys
+            value (str): The id the attribute must hold
+            order_by (str): The attribute the objects are sorted by, then
+                            their id; unsorted if None
+
+        Returns:
+            list: The matching objects
+        """
+        self._sync_indexes()
+        key = (cls.__name__, attr, value)
+        self._hydrate_all(self.__relations.get(key, {}))
+        bucket = self.__relations.get(key, {})
+        if order_by is None:
+            return list(bucket.values())
+        return [bucket[k] for k in self._ordered(cls, bucket, order_by, key)]
+
+    def update_index(self, obj, attr, value):
+        """Moves a stored object to the right foreign key bucket before its
+        attribute is set to a new value
+
+        Args:
+            obj: The object being changed
+            attr (str): The attribute being set
+            value: The new value of the attribute
+        """
+        if attr not in self.__foreign_keys or 'id' not in obj.__dict__:
+            return
+        self._sync_indexes()
+        name = obj.__class__.__name__
+        key = name + '.' + obj.id
+        if self.__classes.get(name, {}).get(key) is not obj:
+            return
+        old = obj.__dict__.get(attr)
+        if old is not None:
+            self.__relations.get((name, attr, old), {}).pop(key, None)
+        self.__relations.setdefault((name, attr, value), {})[key] = obj
+        self._touch(name)
+
+    def mark_dirty(self, obj):
+        """Drops the encoding save() kept for an object, after one of its
+        attributes was set
+
+        Args:
+            obj: The object being changed
+        """
+        if not self.__fragments and self.__undo is None:
+            return
+        obj_id = getattr(obj, 'id', None)
+        if obj_id is None:
+            return
+        key = obj.__class__.__name__ + '.' + obj_id
+        self.__fragments.pop(key, None)
+        if self.__undo is not None and self.__objects.get(key) is obj:
+            self._remember(key)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defers saving until the end of the block, then saves once. If
+        the block raises, the stored objects, their attributes and the
+        unsaved changes go back to their state before the block.
+
+        A batch opened within another one is part of the outer batch.
+        """
+        if self.__undo is not None:
+            yield self
+            return
+        self._sync_indexes()
+        pending = dict(self.__pending)
+        FileStorage.__undo = {}
+        try:
+            yield self
+        except BaseException:
+            undo = self.__undo
+            FileStorage.__undo = None
+            self._rollback(undo)
+            self.__pending.clear()
+            self.__pending.update(pending)
+            raise
+        FileStorage.__undo = None
+        self.save()
+
+    def bulk_insert(self, cls, records, chunk_size=1000):
+        """Adds an object of a class for each record, then saves once
+
+        Args:
+            cls (class): The class of the objects
+            records (iterable): The attribute dictionaries, as to_dict()
+                                returns them or with missing attributes
+            chunk_size (int): Unused, the file is written once
+
+        Returns:
+            int: The number of objects added
+        """
+        count = 0
+        with self.batch():
+            for record in records:
+                self.new(cls(**record))
+                count += 1
+        return count
+
+    def iter_records(self, cls, chunk_size=1000):
+        """Yields the record of every object of a class, as to_dict()
+        returns it, without instantiating the raw records of lazy loading
+
+        Args:
+            cls (class): The class of the objects
+            chunk_size (int): Unused, the objects are in memory
+        """
+        self._sync_indexes()
+        for val in list(self.__classes.get(cls.__name__, {}).values()):
+            if type(val) is not dict:
+                yield val.to_dict()
+                continue
+            record = dict(val)
+            # Binary snapshots keep the dates as datetime objects
+            for name in ('created_at', 'updated_at'):
+                if isinstance(record.get(name), datetime):
+                    record[name] = record[name].isoformat()
+            yield record
+
+    def _remember(self, key):
+        """Records what is stored under a key before a batch first changes
+        it
+
+        Args:
+            key (str): The storage key
+        """
+        if self.__undo is None or key in self.__undo:
+            return
+        old = self.__objects.get(key)
+        if old is None:
+            old = self.__raw.get(key)
+        if old is None or type(old) is dict:
+            self.__undo[key] = (old, None)
+        else:
+            self.__undo[key] = (old, old.__dict__.copy())
+
+    def _rollback(self, undo):
+        """Puts back what was stored under the keys a batch changed
+
+        Args:
+            undo (dict): Key -> (previous object or raw record, its
+                         attributes)
+        """
+        self._sync_indexes()
+        for key, (old, attrs) in undo.items():
+            self._touch(key.partition('.')[0])
+            if attrs is not None:
+                # Unindexed under the values the batch set, as deleting an
+                # attribute does not go through update_index()
+                self._unlink(key, old)
+                for name in set(old.__dict__) - set(attrs):
+                    delattr(old, name)
+                for name, value in attrs.items():
+                    if old.__dict__.get(name, self) is not value:
+                        setattr(old, name, value)
+            if old is None:
+                self._unload(key)
+            elif type(old) is dict:
+                self._unload(key)
+                self.__raw[key] = old
+                self._link(key, old)
+            else:
+                self._load(key, old)
+
+    def _models(self):
+        """Returns the class name -> model class mapping used to instantiate
+        records
+        """
+        if not self.__models:
+            from ..amenity import Amenity
+            from ..base_model import BaseModel
+            from ..city import City
+            from ..place import Place
+            from ..review import Review
+            from ..state import State
+            from ..user import User
+
+            self.__models.update({
+                'BaseModel': BaseModel, 'User': User, 'Place': Place,
+                'State': State, 'City': City, 'Amenity': Amenity,
+                'Review': Review
+            })
+        return self.__models
+
+    def _restore(self, key, val):
+        """Stores a record read from disk, as a raw dictionary in lazy mode
+        or as a model instance otherwise
+
+        Args:
+            key (str): The storage key
+            val (dict): The record
+        """
+        if not self.__lazy:
+            self._load(key, self._models()[val['__class__']](**val))
+            return
+        self._unload(key)
+        # Records are decoded one at a time, so each would otherwise hold
+        # its own copy of every attribute name
+        val = {sys.intern(name): value for name, value in val.items()}
+        self.__raw[key] = val
+        self._link(key, val)
+
+    def _hydrate(self, key):
+        """Instantiates the raw record stored under a key
+
+        Args:
+            key (str): The storage key
+
+        Returns:
+            The model instance
+        """
+        val = self.__raw[key]
+        obj = self._models()[val['__class__']](**val)
+        self._load(key, obj)
+        return obj
+
+    def _hydrate_all(self, entries):
+        """Instantiates the raw records among the values of a dictionary
+
+        Args:
+            entries (dict): Storage keys mapped to objects or raw records
+        """
+        if not self.__raw:
+            return
+        for key in [key for key, val in entries.items()
+                    if type(val) is dict]:
+            self._hydrate(key)
+
+    def _ordered(self, cls, entries, order_by, bucket=None):
+        """Returns the keys of objects of a class sorted as _order() does,
+        sorting them again only after the class changed
+
+        Args:
+            cls (class): The class of the entries
+            entries (dict): Key -> object or raw record, all the objects of
+                            the class or those of one foreign key bucket
+            order_by (str): The attribute name, or None to sort by key
+            bucket (tuple): The (class name, attribute, id) of the foreign
+                            key bucket of the entries, None for the class
+
+        Returns:
+            list: The sorted keys
+        """
+        generation = self.generation(cls)
+        cache_key = (cls.__name__, order_by, bucket)
+        cached = self.__orders.get(cache_key)
+        if cached is None or cached[0] != generation:
+            cached = (generation, self._order(cls, entries, order_by))
+            self.__orders[cache_key] = cached
+        return cached[1]
+
+    @staticmethod
+    def _order(cls, entries, order_by):
+        """Sorts the keys of objects and raw records of a class by an
+        attribute, then by key, with missing values first as in SQL
+
+        Args:
+            cls (class): The class of the entries
+            entries (dict): Key -> object or raw record
+            order_by (str): The attribute name, or None to sort by key
+
+        Returns:
+            list: The sorted keys
+        """
+        if order_by is None:
+            return sorted(entries)
+        return sorted(entries,
+                      key=FileStorage._sort_key(cls, entries, order_by))
+
+    @staticmethod
+    def _sort_key(cls, entries, order_by):
+        """Returns the function _order() sorts keys with
+
+        Args:
+            cls (class): The class of the entries
+            entries (dict): Key -> object or raw record
+            order_by (str): The attribute name, or None to sort by key
+
+        Returns:
+            callable: Key -> the value it sorts by
+        """
+        if order_by is None:
+            return lambda key: key
+
+        def sort_key(key):
+            val = FileStorage._value(cls, entries[key], order_by)
+            if isinstance(val, datetime):
+                val = val.isoformat()
+            return val is not None, val, key
+        return sort_key
+
+    @staticmethod
+    def _meets(cls, entry, where, ranges):
+        """Returns whether an object or raw record meets the conditions
+        of find() on its attributes
+
+        Args:
+            cls (class): The class of the entry
+            entry: The object or raw record
+            where (dict): Attribute -> the set of values it may hold
+            ranges (dict): Attribute -> (lowest, highest) value it may hold
+        """
+        for attr, values in where.items():
+            if FileStorage._value(cls, entry, attr) not in values:
+                return False
+        for attr, (low, high) in ranges.items():
+            val = FileStorage._value(cls, entry, attr)
+            if val is None or low is not None and val < low or \
+                    high is not None and val > high:
+                return False
+        return True
+
+    @staticmethod
+    def _value(cls, entry, attr):
+        """Returns an attribute of an object or raw record, or the class
+        default if it was never set
+
+        Args:
+            cls (class): The class of the entry
+            entry: The object or raw record
+            attr (str): The attribute name
+        """
+        if type(entry) is dict:
+            return entry.get(attr, getattr(cls, attr, None))
+        return getattr(entry, attr, getattr(cls, attr, None))
+
+    def _entries(self):
+        """Returns every stored key mapped to its object or raw record
+        """
+        entries = dict(self.__raw)
+        entries.update(self.__objects)
+        return entries
+
+    def _sync_indexes(self):
+        """Rebuilds the class and foreign key indexes if __objects was
+        replaced or resized behind the storage's back
+        """
+        objects = self.__objects
+        if self.__indexed is objects and self.__indexed_len == len(objects):
+            return
+        self.__classes.clear()
+        self.__relations.clear()
+        self.__fragments.clear()
+        self._touch()
+        FileStorage.__indexed = objects
+        for entries in (self.__raw, objects):
+            for key, entry in entries.items():
+                self._link(key, entry)
+        FileStorage.__indexed_len = len(objects)
+
+    def _link(self, key, obj):
+        """Adds an object or raw record to the class and foreign key indexes
+
+        Args:
+            key (str): The storage key
+            obj: The object or raw record
+        """
+        name = key.split('.', 1)[0]
+        self.__classes.setdefault(name, {})[key] = obj
+        attrs = obj if type(obj) is dict else obj.__dict__
+        for attr in self.__foreign_keys:
+            value = attrs.get(attr)
+            if value is not None:
+                self.__relations.setdefault((name, attr, value), {})[key] = obj
+
+    def _unlink(self, key, obj):
+        """Removes an object or raw record from the class and foreign key
+        indexes
+
+        Args:
+            key (str): The storage key
+            obj: The object or raw record
+        """
+        name = key.split('.', 1)[0]
+        self.__classes.get(name, {}).pop(key, None)
+        attrs = obj if type(obj) is dict else obj.__dict__
+        for attr in self.__foreign_keys:
+            value = attrs.get(attr)
+            if value is not None:
+                self.__relations.get((name, attr, value), {}).pop(key, None)
+
+    def _load(self, key, obj):
+        """Stores an object under its key in __objects and the indexes
+
+        Args:
+            key (str): The storage key
+            obj: The object
+        """
+        old = self.__objects.get(key)
+        if old is None:
+            old = self.__raw.pop(key, None)
+        if old is not None:
+            self._unlink(key, old)
+        self.__objects[key] = obj
+        self._link(key, obj)
+        FileStorage.__indexed_len = len(self.__objects)
+
+    def _unload(self, key):
+        """Removes a key from __objects, __raw and the indexes
+
+        Args:
+            key (str): The storage key
+        """
+        old = self.__objects.pop(key, None)
+        if old is None:
+            old = self.__raw.pop(key, None)
+        if old is not None:
+            self._unlink(key, old)
+        self.__fragments.pop(key, None)
+        FileStorage.__indexed_len = len(self.__objects)
+
+    def _touch(self, name=None):
+        """Moves the generation of a class forward
+
+        Args:
+            name (str): The class name; every class if None
+        """
+        FileStorage.__generation += 1
+        self.__generations[name] = self.__generation
+        if name is None:
+            self.__orders.clear()
+
+    @staticmethod
+    def _stat(path):
+        """Returns the (inode, size, mtime) of a file, or None if it does
+        not exist
+
+        Args:
+            path (str): The path of the file
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _saw_snapshot(self):
+        """Records the current state of the JSON file as up to date
+        """
+        FileStorage.__seen = self._stat(self.__file_path)
+
+    def _saw_log(self, inode, offset):
+        """Records how much of the log has been applied
+
+        Args:
+            inode (int): The inode of the log, None if there is none
+            offset (int): The number of bytes applied
+        """
+        FileStorage.__log_inode = inode
+        FileStorage.__log_offset = offset
+
+    def _read_files(self):
+        """Loads the snapshot, then replays the rotated log and the log
+        """
+        self._sync_indexes()
+        self._touch()
+        self._saw_snapshot()
+        try:
+            with open(self.__file_path, 'rb') as f:
+                for key, val in detect(f).load(f):
+                    self._restore(key, val)
+        except (FileNotFoundError, ValueError):
+            pass
+
+        FileStorage.__journal_size = 0
+        self._replay(self._log_path() + '.old')
+        self._saw_log(None, 0)
+        self._replay(self._log_path())
+
+    def _replay(self, path, offset=0):
+        """Applies the log entries of a file from the given byte offset
+
+        Args:
+            path (str): The path of the log file
+            offset (int): The offset of the first entry to apply
+        """
+        current = path == self._log_path()
+        log = self._stat(path)
+        for key, val, end in self._read_log(path, offset):
+            self._touch(key.partition('.')[0])
+            if val is None:
+                self._unload(key)
+            else:
+                self._restore(key, val)
+            offset = end
+            if current:
+                FileStorage.__journal_size += 1
+        if current and log is not None:
+            self._saw_log(log[0], offset)
+
+    def _log_path(self):
+        """Returns the path of the write-ahead log
+        """
+        return self.__file_path + '.log'
+
+    def _append_log(self):
+        """Appends one log entry per pending change, compacting the log
+        into a snapshot once it grows past the limit
+        """
+        if not self.__pending:
+            return
+        lines = []
+        for key, obj in self.__pending.items():
+            val = obj.to_dict() if obj is not None else None
+            lines.append(json.dumps({'key': key, 'val': val}) + '\n')
+        data = ''.join(lines).encode('utf-8')
+
+        with self._locked():
+            with open(self._log_path(), 'ab') as f:
+                start = f.tell()
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                inode = os.fstat(f.fileno()).st_ino
+            FileStorage.__journal_size += len(lines)
+            # Only skip our own entries if nobody else appended before them
+            if start == self.__log_offset and \
+                    inode == (self.__log_inode or inode):
+                self._saw_log(inode, start + len(data))
+
+        if self.__journal_size >= self.__journal_limit:
+            self._compact()
+
+    @staticmethod
+    def _read_log(path, offset=0):
+        """Yields the (key, value, end offset) of the entries recorded in a
+        log file. A torn final line left by a crash ends the replay.
+
+        Args:
+            path (str): The path of the log file
+            offset (int): The byte offset to start reading from
+        """
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        return
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        return
+                    offset += len(line)
+                    yield entry['key'], entry['val'], offset
+        except FileNotFoundError:
+            return
+
+    def _compacting(self):
+        """Returns True while a background compaction is running
+        """
+        return self.__compactor is not None and self.__compactor.is_alive()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Holds the thread lock and the lock file shared with the other
+        processes using the JSON file
+        """
+        with self.__lock, open(self.__file_path + '.lock', 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _compaction_died(self):
+        """Returns True if a rotated log is left that no compaction, in
+        this process or another, is still working on; the caller holds
+        _locked()
+        """
+        if self._compacting():
+            return False
+        try:
+            with open(self._log_path() + '.old', 'rb') as f:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (FileNotFoundError, BlockingIOError):
+            return False
+        return True
+
+    def _compact(self):
+        """Rotates the log and writes a snapshot of the current objects in a
+        background thread. Changes made meanwhile go to the new log.
+
+        Entries other processes appended to the log are applied first, so
+        the snapshot covers the whole rotated log. The thread holds a lock
+        on the rotated log until it is removed.
+
+        Returns:
+            threading.Thread: The compaction thread, or None if one is
+                              already running or the files changed under
+                              this process
+        """
+        with self._locked():
+            if self._compacting() or \
+                    os.path.exists(self._log_path() + '.old') or \
+                    self._stat(self.__file_path) != self.__seen:
+                return None
+            log = self._stat(self._log_path())
+            if log is None or log[0] != (self.__log_inode or log[0]):
+                return None
+            if log[1] > self.__log_offset:
+                self._replay(self._log_path(), self.__log_offset)
+            os.replace(self._log_path(), self._log_path() + '.old')
+            held = open(self._log_path() + '.old', 'rb')
+            fcntl.flock(held, fcntl.LOCK_EX)
+            self._saw_log(None, 0)
+            objects = self._entries()
+            FileStorage.__journal_size = 0
+            thread = threading.Thread(target=self._finish_compaction,
+                                      args=(objects, held), daemon=True)
+            FileStorage.__compactor = thread
+        thread.start()
+        return thread
+
+    def _finish_compaction(self, objects, held):
+        """Writes the snapshot, then drops the rotated log it replaces
+
+        Args:
+            objects (dict): The objects or raw records as they were at
+                            rotation time
+            held (file): The rotated log, locked until it is removed
+        """
+        with held:
+            tmp_path = self._write_snapshot(objects, sync=True)
+            with self._locked():
+                os.replace(tmp_path, self.__file_path)
+                self._saw_snapshot()
+                try:
+                    os.remove(self._log_path() + '.old')
+                except FileNotFoundError:
+                    pass
+
+    def _write_snapshot(self, objects, sync=False, cache=False):
+        """Writes the given objects to a new temporary snapshot file, which
+        the caller moves over the snapshot while holding _locked()
+
+        Args:
+            objects (dict): The objects or raw records to serialize
+            sync (bool): Whether to fsync the file before returning
+            cache (bool): Whether to keep the encoding of the objects for
+                          the next save
+
+        Returns:
+            str: The path of the temporary file
+        """
+        serializer = get_serializer(self.__format)
+        tmp_path = '{}.{}.tmp'.format(self.__file_path, uuid.uuid4().hex)
+        with open(tmp_path, 'wb') as f:
+            if serializer.fragments:
+                serializer.dump_fragments(
+                    (self._fragment(serializer, key, val, cache)
+                     for key, val in objects.items()), f)
+            else:
+                serializer.dump(((key, self._record(serializer, val))
+                                 for key, val in objects.items()), f)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        return tmp_path
+
+    def _remove_logs(self):
+        """Removes the log files once a snapshot covers their entries
+        """
+        for path in (self._log_path(), self._log_path() + '.old'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _record(serializer, val):
+        """Returns the record a serializer writes for an object or raw record
+
+        Args:
+            serializer: The serializer
+            val: The object or raw record
+        """
+        if type(val) is dict:
+            return serializer.prepare(val)
+        return serializer.record(val)
+
+    def _fragment(self, serializer, key, val, cache):
+        """Returns the encoded record of an object, reusing the encoding
+        kept by a previous save while the object is unchanged
+
+        Args:
+            serializer: The serializer, which encodes records one at a time
+            key (str): The storage key
+            val: The object or raw record
+            cache (bool): Whether to keep the encoding of an object
         """
-        self.reload()
+        entry = self.__fragments.get(key)
+        if entry is not None and entry[0] is val:
+            return entry[1]
+        fragment = serializer.fragment(key, self._record(serializer, val))
+        # Raw records are not kept: lazy loading is meant to save memory
+        if cache and type(val) is not dict:
+            self.__fragments[key] = (val, fragment)
+        return fragment
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""Incremental parsing of the JSON object written by FileStorage.save()
+
+json.load() reads the whole file into one string and builds the whole
+dictionary before returning, so the raw text, the parsed tree and the
+instantiated models are all alive at once. iter_items() reads the file in
+chunks and yields one (key, value) pair at a time instead.
+"""
+import json
+from json.decoder import WHITESPACE
+
+
+def iter_items(f, chunk_size=1 << 16):
+    """Yields the (key, value) pairs of the top-level JSON object in a file
+
+    Args:
+        f (file): A text file opened for reading
+        chunk_size (int): The number of characters read at a time
+
+    Raises:
+        ValueError: If the file does not hold a JSON object
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+
+    def more():
+        """Appends the next chunk to the buffer, dropping consumed text
+
+        Returns:
+            bool: False at the end of the file
+        """
+        nonlocal buf, pos
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def peek():
+        """Skips whitespace and returns the next character, or '' at the
+        end of the file
+        """
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or not more():
+                return buf[pos:pos + 1]
+
+    def value():
+        """Decodes the JSON value starting at the current position
+        """
+        nonlocal pos
+        while True:
+            try:
+                val, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if more():
+                    continue
+                raise
+            # A number cut off by the chunk boundary still decodes
+            if end == len(buf) and more():
+                continue
+            pos = end
+            return val
+
+    def expect(char):
+        """Consumes the given structural character
+
+        Args:
+            char (str): The character expected next
+        """
+        nonlocal pos
+        if peek() != char:
+            raise ValueError("Expecting '{}' at offset {}".format(char, pos))
+        pos += 1
+
+    expect('{')
+    if peek() == '}':
+        return
+    while True:
+        if peek() != '"':
+            raise ValueError("Expecting property name at offset {}"
+                             .format(pos))
+        key = value()
+        expect(':')
+        peek()
+        yield key, value()
+        if peek() == '}':
+            return
+        expect(',')
@@ -0,0 +1,746 @@
+#!/usr/bin/python3
+"""The RecordStorage module
+"""
+import bisect
+import contextlib
+import fcntl
+import itertools
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+
+# The record file starts with its magic and a generation id, followed by
+# one JSON line per saved or deleted object, in the FileStorage log format
+_DATA_MAGIC = b'HBNBREC1'
+_DATA_HEADER = len(_DATA_MAGIC) + 16
+# The index starts with its magic, the generation of the record file it
+# describes and the length of that file it covers, followed by fixed-size
+# entries sorted by key
+_INDEX_MAGIC = b'HBNBIDX1'
+_INDEX_HEADER = struct.Struct('>8s16sQ')
+_KEY_SIZE = 64
+_ENTRY = struct.Struct('>{}sQI'.format(_KEY_SIZE))
+
+
+class RecordStorage:
+    """Stores instances in an append-only record file that is memory-mapped,
+    with a sorted on-disk key -> offset index, so a single object is read
+    without loading the rest of the store
+
+    Selected with HBNB_TYPE_STORAGE=record. Processes sharing the files only
+    keep the pages they touch in memory, and those pages come from the
+    shared page cache. save() appends the pending changes to the record
+    file; records past the end covered by the index are found by scanning
+    that tail. Once the tail holds more than HBNB_RECORD_COMPACT_LIMIT
+    records, the live records are copied to a new file with a new index.
+
+    generation() tells the web views' page cache whether the objects of a
+    class changed: through new() or delete(), or as close() scanned the
+    records another process appended. The orders all() sorts keys in by
+    an attribute are kept until the generation of their class moves.
+
+    Attributes:
+        __file_path (str): The path to the record file (HBNB_RECORD_PATH);
+                           the index is kept next to it with a .idx suffix
+        __compact_limit (int): The number of tail records that triggers a
+                               compaction
+        __pending (dict): The keys changed since the last save, mapped to
+                          the object to write or None for a deletion
+        __lock (threading.Lock): Serializes the threads of this process;
+                                 processes lock the .lock file
+        __data (mmap.mmap): The mapped record file
+        __index (mmap.mmap): The mapped index
+        __inode (int): The inode of the mapped record file
+        __end (int): The number of record file bytes already scanned
+        __tail (dict): Key -> (offset, length), or None for a deletion, of
+                       the records appended after the index was built
+        __appended (int): The number of records appended after the index
+                          was built
+        __models (dict): Class name -> model class
+        __batching (bool): Whether save() is deferred to the end of a batch
+        __generation (int): The number of changes seen by this process
+        __generations (dict): Class name, or None for every class -> the
+                              value of __generation at its last change
+        __orders (dict): (class name, attribute) -> (generation, sorted
+                         keys) of the orders all() computed
+    """
+    __file_path = os.getenv('HBNB_RECORD_PATH', 'records.db')
+    __compact_limit = int(os.getenv('HBNB_RECORD_COMPACT_LIMIT', '1000'))
+    __pending = {}
+    __lock = threading.Lock()
+    __data = None
+    __index = None
+    __inode = None
+    __end = 0
+    __tail = {}
+    __appended = 0
+    __models = {}
+    __batching = False
+    __generation = 0
+    __generations = {}
+    __orders = {}
+
+    def all(self, cls=None, load=(), columns=(), offset=0, limit=None,
+            order_by=None):
+        """Returns a dictionary of models currently in storage, reading
+        only the records of the given class
+
+        A page in key order is cut from the index before any record is
+        read; ordering by an attribute reads every record of the class
+        the first time, then only those on the page until the class
+        changes. The dictionary keeps its order.
+
+        Args:
+            cls (class): The class to filter for
+            load (tuple): Unused, the relationship properties read the
+                          related records when accessed
+            columns (tuple): Unused, records are read whole
+            offset (int): The number of objects of cls to skip
+            limit (int): The maximum number of objects of cls to return;
+                         all of them if None
+            order_by (str): The attribute the objects of cls are sorted
+                            by before paging, then their id; by id if None
+
+        Raises:
+            ValueError: If a page is asked for without a class
+        """
+        paged = offset or limit is not None or order_by is not None
+        if paged and cls is None:
+            raise ValueError("pages are only available for a class")
+        entries = self._entries('' if cls is None else cls.__name__ + '.')
+        if order_by is not None:
+            keys = self._ordered(cls, entries, order_by)[0]
+        else:
+            keys = sorted(entries) if paged else list(entries)
+        if paged:
+            keys = keys[offset:None if limit is None else offset + limit]
+        return {key: self._get(entries[key]) for key in keys}
+
+    def find(self, cls, where=None, ranges=None, having=None,
+             order_by=None, after=None, limit=None):
+        """Returns the objects of a class that meet every condition, in
+        order, one page at a time
+
+        The page starts after the cursor with a search of the sorted keys,
+        and records are read from there until the page is full. Ordering
+        by an attribute reads every record of the class the first time,
+        as all() does.
+
+        Args:
+            cls (class): The class of the objects
+            where (dict): Attribute -> the values it may hold, e.g.
+                          {'city_id': ['<id>', ...]}
+            ranges (dict): Attribute -> (lowest, highest) value it may
+                           hold, None for no bound, e.g.
+                           {'price_by_night': (50, 100)}
+            having (dict): Relationship -> the ids of the objects each
+                           object must all be linked to, e.g.
+                           {'amenities': ['<id>', ...]}
+            order_by (str): The attribute the objects are sorted by, then
+                            their id; by id if None
+            after (tuple): The (order_by value, id), or (id,) without
+                           order_by, of the last object of the previous
+                           page; from the first object if None
+            limit (int): The maximum number of objects; all if None
+
+        Returns:
+            dict: The matching objects by key, in order
+        """
+        prefix = cls.__name__ + '.'
+        entries = self._entries(prefix)
+        if order_by is None:
+            keys = sorted_keys = sorted(entries)
+            last = None if after is None else prefix + after[-1]
+        else:
+            keys, sorted_keys = self._ordered(cls, entries, order_by)
+            last = None if after is None else \
+                (after[0] is not None, after[0], prefix + after[-1])
+        start = 0 if last is None else bisect.bisect_right(sorted_keys, last)
+        where = {attr: set(values) for attr, values in (where or {}).items()}
+
+        found = {}
+        for key in itertools.islice(keys, start, None):
+            if limit is not None and len(found) >= limit:
+                break
+            obj = self._get(entries[key])
+            if self._meets(obj, where, ranges or {}) and all(
+                    set(ids) <= {linked.id for linked in getattr(obj, rel)}
+                    for rel, ids in (having or {}).items()):
+                found[key] = obj
+        return found
+
+    def count(self, cls=None):
+        """Returns the number of models in storage, from the index
+        without reading the records
+
+        Args:
+            cls (class): The class to filter for
+
+        Returns:
+            int: The number of objects
+        """
+        return len(self.keys(cls))
+
+    def keys(self, cls=None):
+        """Returns the keys of the models in storage, from the index
+        without reading the records
+
+        Args:
+            cls (class): The class to filter for
+
+        Returns:
+            list: The '<class name>.<id>' keys
+        """
+        prefix = '' if cls is None else cls.__name__ + '.'
+        keys = [key for key, _ in self._locate(prefix)
+                if key not in self.__pending]
+        keys.extend(key for key, obj in self.__pending.items()
+                    if obj is not None and key.startswith(prefix))
+        return keys
+
+    def get(self, cls, id):
+        """Returns the object of a class with the given id
+
+        Args:
+            cls (class): The class of the object
+            id (str): The id of the object
+
+        Returns:
+            The object, or None if it is not in storage
+        """
+        key = cls.__name__ + '.' + id
+        if key in self.__pending:
+            return self.__pending[key]
+        loc = self._find(key)
+        return None if loc is None else self._read(loc)
+
+    def new(self, obj):
+        """Adds a new object to the objects to save
+
+        Args:
+            obj: The object to add to storage
+
+        Raises:
+            ValueError: If the key does not fit in an index entry
+        """
+        key = obj.__class__.__name__ + '.' + obj.id
+        if len(key.encode('utf-8')) > _KEY_SIZE:
+            raise ValueError("Key longer than {} bytes: {}"
+                             .format(_KEY_SIZE, key))
+        self.__pending[key] = obj
+        self._touch(obj.__class__.__name__)
+
+    def save(self):
+        """Appends the pending changes to the record file. Does nothing
+        within a batch.
+        """
+        if not self.__pending or self.__batching:
+            return
+        data = b''.join(
+            json.dumps({'key': key,
+                        'val': obj.to_dict() if obj is not None else None}
+                       ).encode('utf-8') + b'\n'
+            for key, obj in self.__pending.items())
+
+        with self._locked():
+            if not self._refresh():
+                self._open()
+            with open(self.__file_path, 'r+b') as f:
+                # Drop a torn record left by a crash before appending
+                f.truncate(self.__end)
+                f.seek(self.__end)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._refresh()
+            self.__pending.clear()
+            if self.__appended > self.__compact_limit:
+                self._compact()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defers saving until the end of the block, then appends all the
+        changes at once. If the block raises, the changes made in it are
+        dropped.
+
+        A batch opened within another one is part of the outer batch.
+        """
+        if self.__batching:
+            yield self
+            return
+        pending = dict(self.__pending)
+        RecordStorage.__batching = True
+        try:
+            yield self
+        except BaseException:
+            self.__pending.clear()
+            self.__pending.update(pending)
+            self._touch()
+            raise
+        finally:
+            RecordStorage.__batching = False
+        self.save()
+
+    def bulk_insert(self, cls, records, chunk_size=1000):
+        """Adds an object of a class for each record, appending them to
+        the record file one chunk at a time
+
+        Args:
+            cls (class): The class of the objects
+            records (iterable): The attribute dictionaries, as to_dict()
+                                returns them or with missing attributes
+            chunk_size (int): The number of records appended at once
+
+        Returns:
+            int: The number of objects added
+        """
+        count = 0
+        records = iter(records)
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                return count
+            with self.batch():
+                for record in chunk:
+                    self.new(cls(**record))
+            count += len(chunk)
+
+    def iter_records(self, cls, chunk_size=1000):
+        """Yields the record of every saved object of a class straight
+        from the record file, without instantiating them
+
+        Args:
+            cls (class): The class of the objects
+            chunk_size (int): Unused, records are read one at a time
+        """
+        for key, (offset, length) in self._locate(cls.__name__ + '.'):
+            yield json.loads(self.__data[offset:offset + length])['val']
+
+    def reload(self):
+        """Maps the record file and its index, creating or rebuilding them
+        as needed
+        """
+        with self._locked():
+            self._open()
+
+    def delete(self, obj=None):
+        """Deletes obj from storage if present
+
+        Args:
+            obj: The object to delete
+        """
+        if obj is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        if self.get(obj.__class__, obj.id) is not None:
+            self.__pending[key] = None
+            self._touch(obj.__class__.__name__)
+            self.save()
+
+    def close(self):
+        """Picks up the records appended by other processes, remapping the
+        files if they were compacted or removed
+        """
+        with self.__lock:
+            fresh = self._refresh()
+        if not fresh:
+            self.reload()
+
+    def generation(self, cls=None):
+        """Returns a number that grows whenever objects of a class are
+        added, replaced or deleted in this process's view of storage
+
+        Args:
+            cls (class): The class; any class if None
+
+        Returns:
+            int: The generation of the class
+        """
+        if cls is None:
+            return self.__generation
+        return max(self.__generations.get(cls.__name__, 0),
+                   self.__generations.get(None, 0))
+
+    def related(self, cls, attr, value, order_by=None):
+        """Returns the objects of a class whose foreign key attribute holds
+        the given value, e.g. related(City, 'state_id', state.id)
+
+        Only the records of cls are read, but all of them are.
+
+        Args:
+            cls (class): The class of the objects to return
+            attr (str): The foreign key attribute
+            value (str): The id the attribute must hold
+            order_by (str): The attribute the objects are sorted by, then
+                            their id; unsorted if None
+
+        Returns:
+            list: The matching objects
+        """
+        return [obj for obj in self.all(cls, order_by=order_by).values()
+                if getattr(obj, attr, None) == value]
+
+    def update_index(self, obj, attr, value):
+        """Does nothing; records are only indexed by key
+
+        Args:
+            obj: The object being changed
+            attr (str): The attribute being set
+            value: The new value of the attribute
+        """
+
+    def mark_dirty(self, obj):
+        """Does nothing; save() only writes the objects passed to new()
+
+        Args:
+            obj: The object being changed
+        """
+
+    def _models(self):
+        """Returns the class name -> model class mapping used to instantiate
+        records
+        """
+        if not self.__models:
+            from ..amenity import Amenity
+            from ..base_model import BaseModel
+            from ..city import City
+            from ..place import Place
+            from ..review import Review
+            from ..state import State
+            from ..user import User
+
+            self.__models.update({
+                'BaseModel': BaseModel, 'User': User, 'Place': Place,
+                'State': State, 'City': City, 'Amenity': Amenity,
+                'Review': Review
+            })
+        return self.__models
+
+    def _ordered(self, cls, entries, order_by):
+        """Returns the keys of the objects of a class sorted by an
+        attribute, then by key, with missing values first as in SQL,
+        reading the records again only after the class changed
+
+        Args:
+            cls (class): The class of the entries
+            entries (dict): Key -> (offset, length) of a saved record, or
+                            pending object
+            order_by (str): The attribute name
+
+        Returns:
+            tuple: The sorted keys, and the (value is not None, value, key)
+                   they are sorted by
+        """
+        generation = self.generation(cls)
+        cached = self.__orders.get((cls.__name__, order_by))
+        if cached is not None and cached[0] == generation:
+            return cached[1:]
+        sort_keys = []
+        for key, val in entries.items():
+            val = getattr(self._get(val), order_by, None)
+            sort_keys.append((val is not None, val, key))
+        sort_keys.sort()
+        keys = [sort_key[2] for sort_key in sort_keys]
+        self.__orders[(cls.__name__, order_by)] = (generation, keys,
+                                                   sort_keys)
+        return keys, sort_keys
+
+    def _entries(self, prefix):
+        """Returns the keys of the stored objects starting with a prefix
+
+        Args:
+            prefix (str): The key prefix, e.g. 'State.'; '' for every key
+
+        Returns:
+            dict: Key -> (offset, length) of a saved record, or pending
+                  object
+        """
+        entries = {key: loc for key, loc in self._locate(prefix)
+                   if key not in self.__pending}
+        for key, obj in self.__pending.items():
+            if obj is not None and key.startswith(prefix):
+                entries[key] = obj
+        return entries
+
+    @staticmethod
+    def _meets(obj, where, ranges):
+        """Returns whether an object meets the conditions of find() on
+        its attributes
+
+        Args:
+            obj: The object
+            where (dict): Attribute -> the set of values it may hold
+            ranges (dict): Attribute -> (lowest, highest) value it may hold
+        """
+        for attr, values in where.items():
+            if getattr(obj, attr, None) not in values:
+                return False
+        for attr, (low, high) in ranges.items():
+            val = getattr(obj, attr, None)
+            if val is None or low is not None and val < low or \
+                    high is not None and val > high:
+                return False
+        return True
+
+    def _touch(self, name=None):
+        """Moves the generation of a class forward
+
+        Args:
+            name (str): The class name; every class if None
+        """
+        RecordStorage.__generation += 1
+        self.__generations[name] = self.__generation
+        if name is None:
+            self.__orders.clear()
+
+    def _index_path(self):
+        """Returns the path of the index
+        """
+        return self.__file_path + '.idx'
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Holds the thread lock and the lock file shared with the other
+        processes using the record file
+        """
+        with self.__lock, open(self.__file_path + '.lock', 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _open(self):
+        """Maps the record file and its index; the caller holds _locked()
+
+        Raises:
+            ValueError: If the file is not a record file
+        """
+        with open(self.__file_path, 'ab') as f:
+            if f.tell() == 0:
+                f.write(_DATA_MAGIC + uuid.uuid4().bytes)
+        with open(self.__file_path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            inode = os.fstat(f.fileno()).st_ino
+        if data[:len(_DATA_MAGIC)] != _DATA_MAGIC:
+            raise ValueError("Not a record file: {}"
+                             .format(self.__file_path))
+        generation = data[len(_DATA_MAGIC):_DATA_HEADER]
+
+        index = self._map_index(generation, len(data))
+        if index is None:
+            # The index is missing, or the record file was replaced
+            # without it; rebuild it from the records
+            RecordStorage.__data = data
+            RecordStorage.__tail = {}
+            RecordStorage.__end = _DATA_HEADER
+            self._scan()
+            entries = sorted((key.encode('utf-8'),) + loc
+                             for key, loc in self.__tail.items()
+                             if loc is not None)
+            self._write_index(entries, generation, self.__end)
+            index = self._map_index(generation, len(data))
+
+        RecordStorage.__data = data
+        RecordStorage.__index = index
+        RecordStorage.__inode = inode
+        RecordStorage.__tail = {}
+        RecordStorage.__appended = 0
+        RecordStorage.__end = _INDEX_HEADER.unpack_from(index)[2]
+        self._touch()
+        self._scan()
+
+    def _map_index(self, generation, size):
+        """Returns the mapped index if it describes the record file
+
+        Args:
+            generation (bytes): The generation of the record file
+            size (int): The size of the record file
+
+        Returns:
+            mmap.mmap: The index, or None if it is missing or stale
+        """
+        try:
+            with open(self._index_path(), 'rb') as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        if len(index) < _INDEX_HEADER.size:
+            return None
+        magic, gen, end = _INDEX_HEADER.unpack_from(index)
+        if magic != _INDEX_MAGIC or gen != generation or end > size:
+            return None
+        return index
+
+    def _write_index(self, entries, generation, end):
+        """Atomically replaces the index
+
+        Args:
+            entries (list): The sorted (key, offset, length) of the records
+            generation (bytes): The generation of the record file
+            end (int): The length of the record file the entries cover
+        """
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, generation, end))
+            for key, offset, length in entries:
+                f.write(_ENTRY.pack(key, offset, length))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._index_path())
+
+    def _refresh(self):
+        """Remaps the record file if it grew and scans the new records
+
+        Returns:
+            bool: False if the record file was replaced or removed, in
+                  which case it must be opened again
+        """
+        if self.__data is None:
+            return False
+        try:
+            with open(self.__file_path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if st.st_ino != self.__inode:
+                    return False
+                if st.st_size > len(self.__data):
+                    RecordStorage.__data = mmap.mmap(
+                        f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return False
+        self._scan()
+        return True
+
+    def _scan(self):
+        """Adds the complete records past __end to __tail. A torn or
+        unreadable record ends the scan.
+        """
+        data = self.__data
+        pos = self.__end
+        while True:
+            end = data.find(b'\n', pos)
+            if end < 0:
+                break
+            try:
+                entry = json.loads(data[pos:end])
+                key = entry['key']
+            except (ValueError, KeyError, TypeError):
+                break
+            self._touch(key.partition('.')[0])
+            if entry['val'] is None:
+                self.__tail[key] = None
+            else:
+                self.__tail[key] = (pos, end + 1 - pos)
+            RecordStorage.__appended += 1
+            pos = end + 1
+        RecordStorage.__end = pos
+
+    def _entry(self, i):
+        """Returns the (key, offset, length) of an index entry
+
+        Args:
+            i (int): The position of the entry
+        """
+        key, offset, length = _ENTRY.unpack_from(
+            self.__index, _INDEX_HEADER.size + i * _ENTRY.size)
+        return key.rstrip(b'\0'), offset, length
+
+    def _bisect(self, key):
+        """Returns the position of the first index entry not below key
+
+        Args:
+            key (bytes): The key to look for
+        """
+        lo = 0
+        hi = (len(self.__index) - _INDEX_HEADER.size) // _ENTRY.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, key):
+        """Returns the (offset, length) of the record stored under a key
+
+        Args:
+            key (str): The storage key
+
+        Returns:
+            tuple: The location, or None if the key is not in storage
+        """
+        if self.__index is None:
+            self.reload()
+        if key in self.__tail:
+            return self.__tail[key]
+        target = key.encode('utf-8')
+        i = self._bisect(target)
+        if i < (len(self.__index) - _INDEX_HEADER.size) // _ENTRY.size:
+            found, offset, length = self._entry(i)
+            if found == target:
+                return offset, length
+        return None
+
+    def _locate(self, prefix):
+        """Yields the key and (offset, length) of the stored records whose
+        key starts with prefix
+
+        Args:
+            prefix (str): The key prefix, e.g. 'State.', or '' for all
+        """
+        if self.__index is None:
+            self.reload()
+        tail = dict(self.__tail)
+        target = prefix.encode('utf-8')
+        count = (len(self.__index) - _INDEX_HEADER.size) // _ENTRY.size
+        for i in range(self._bisect(target), count):
+            key, offset, length = self._entry(i)
+            if not key.startswith(target):
+                break
+            key = key.decode('utf-8')
+            if key not in tail:
+                yield key, (offset, length)
+        for key, loc in tail.items():
+            if loc is not None and key.startswith(prefix):
+                yield key, loc
+
+    def _get(self, entry):
+        """Returns a pending object as is, or reads the record at a location
+
+        Args:
+            entry: The object, or the (offset, length) of its record
+        """
+        return self._read(entry) if type(entry) is tuple else entry
+
+    def _read(self, loc):
+        """Instantiates the record at a location of the record file
+
+        Args:
+            loc (tuple): The (offset, length) of the record
+        """
+        offset, length = loc
+        val = json.loads(self.__data[offset:offset + length])['val']
+        return self._models()[val['__class__']](**val)
+
+    def _compact(self):
+        """Copies the live records to a new record file with a new index;
+        the caller holds _locked()
+        """
+        generation = uuid.uuid4().bytes
+        entries = []
+        tmp_path = self.__file_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_DATA_MAGIC + generation)
+            for key, (offset, length) in sorted(self._locate('')):
+                entries.append((key.encode('utf-8'), f.tell(), length))
+                f.write(self.__data[offset:offset + length])
+            end = f.tell()
+            f.flush()
+            os.fsync(f.fileno())
+        entries.sort()
+        self._write_index(entries, generation, end)
+        # A crash between the two renames leaves an index of another
+        # generation, which _open() rebuilds
+        os.replace(tmp_path, self.__file_path)
+        self._open()
@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+"""Snapshot formats for FileStorage
+
+A serializer turns (key, record) pairs into a snapshot file and back.
+Records are the dictionaries returned by to_dict() in JSON, while binary
+formats keep created_at and updated_at as datetime objects so neither
+isoformat() nor fromisoformat() run on save and reload.
+
+Binary snapshots start with an 8-byte magic header, so a file can always be
+read back whatever HBNB_FILE_FORMAT selects for writing.
+"""
+import io
+import json
+import pickle
+from datetime import datetime
+
+from .json_stream import iter_items
+
+
+class JSONSerializer:
+    """Reads and writes the JSON object format of file.json
+
+    Attributes:
+        name (str): The format name used by HBNB_FILE_FORMAT
+        magic (bytes): The file header, empty for JSON
+        fragments (bool): Whether each record is encoded on its own, so
+                          FileStorage can reuse the encoding of the
+                          objects that did not change
+    """
+    name = 'json'
+    magic = b''
+    fragments = True
+
+    @staticmethod
+    def record(obj):
+        """Returns the record stored for an object
+
+        Args:
+            obj: The model instance
+        """
+        return obj.to_dict()
+
+    @staticmethod
+    def prepare(record):
+        """Returns a raw record read from any format, ready to be written;
+        datetimes left by a binary format are encoded by dump()
+
+        Args:
+            record (dict): The raw record
+        """
+        return record
+
+    @staticmethod
+    def fragment(key, record):
+        """Returns the encoded "key": record member of the JSON object
+
+        Args:
+            key (str): The storage key
+            record (dict): The record
+        """
+        return (json.dumps(key) + ': ' +
+                json.dumps(record, default=_isoformat)).encode('utf-8')
+
+    @staticmethod
+    def dump_fragments(fragments, f):
+        """Writes the JSON object made of encoded members to a binary file
+
+        Args:
+            fragments (iterable): The members returned by fragment()
+            f (file): The file opened for binary writing
+        """
+        f.write(b'{')
+        separator = b''
+        for fragment in fragments:
+            f.write(separator)
+            f.write(fragment)
+            separator = b', '
+        f.write(b'}')
+
+    @classmethod
+    def dump(cls, records, f):
+        """Writes records to a binary file
+
+        Args:
+            records (iterable): The (key, record) pairs
+            f (file): The file opened for binary writing
+        """
+        cls.dump_fragments((cls.fragment(key, record)
+                            for key, record in records), f)
+
+    @staticmethod
+    def load(f):
+        """Yields the (key, record) pairs of a binary file, one at a time
+
+        Args:
+            f (file): The file opened for binary reading
+        """
+        yield from iter_items(io.TextIOWrapper(f, encoding='utf-8'))
+
+
+class PickleSerializer:
+    """Reads and writes snapshots as pickle protocol 5 frames of records
+
+    Records are pickled in batches so the attribute names shared by the
+    records of a batch are stored once, while reload() still only holds one
+    batch of raw records at a time.
+
+    Attributes:
+        name (str): The format name used by HBNB_FILE_FORMAT
+        magic (bytes): The file header
+        fragments (bool): False, records are encoded in batches
+        batch_size (int): The number of records pickled together
+    """
+    name = 'pickle'
+    magic = b'HBNBPKL5'
+    fragments = False
+    batch_size = 1000
+
+    @staticmethod
+    def record(obj):
+        """Returns the record stored for an object, keeping datetimes
+
+        Args:
+            obj: The model instance
+        """
+        record = obj.__dict__.copy()
+        record.pop('_sa_instance_state', None)
+        record['__class__'] = obj.__class__.__name__
+        return record
+
+    @staticmethod
+    def prepare(record):
+        """Returns a raw record read from any format, ready to be written,
+        with ISO format timestamps turned back into datetimes
+
+        Args:
+            record (dict): The raw record
+        """
+        for key in ('created_at', 'updated_at'):
+            if isinstance(record.get(key), str):
+                record = dict(record)
+                record[key] = datetime.fromisoformat(record[key])
+        return record
+
+    @classmethod
+    def dump(cls, records, f):
+        """Writes records to a binary file
+
+        Args:
+            records (iterable): The (key, record) pairs
+            f (file): The file opened for binary writing
+        """
+        f.write(cls.magic)
+        batch = []
+        for item in records:
+            batch.append(item)
+            if len(batch) == cls.batch_size:
+                pickle.dump(batch, f, protocol=5)
+                batch = []
+        if batch:
+            pickle.dump(batch, f, protocol=5)
+
+    @classmethod
+    def load(cls, f):
+        """Yields the (key, record) pairs of a binary file, one batch in
+        memory at a time
+
+        Args:
+            f (file): The file opened for binary reading, past the header
+        """
+        while True:
+            try:
+                batch = _RecordUnpickler(f).load()
+            except EOFError:
+                return
+            except pickle.UnpicklingError as e:
+                raise ValueError(str(e)) from e
+            yield from batch
+
+
+class _RecordUnpickler(pickle.Unpickler):
+    """Unpickler that only rebuilds the types a record can hold, so a
+    snapshot cannot run arbitrary code when it is loaded
+    """
+
+    def find_class(self, module, name):
+        """Allows datetime objects only
+        """
+        if (module, name) == ('datetime', 'datetime'):
+            return datetime
+        raise pickle.UnpicklingError(
+            "{}.{} is not allowed in a snapshot".format(module, name))
+
+
+def _isoformat(value):
+    """Encodes the datetimes of records read from a binary snapshot
+
+    Args:
+        value: The value json cannot encode
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+serializers = {cls.name: cls for cls in (JSONSerializer, PickleSerializer)}
+
+
+def get_serializer(name):
+    """Returns the serializer registered under a format name
+
+    Args:
+        name (str): The format name, e.g. 'json' or 'pickle'
+
+    Raises:
+        ValueError: If no serializer has that name
+    """
+    try:
+        return serializers[name]
+    except KeyError:
+        raise ValueError("Unknown storage format: {}".format(name)) from None
+
+
+def detect(f):
+    """Returns the serializer of a file opened for binary reading, leaving
+    the file positioned after its header
+
+    Args:
+        f (file): The file opened for binary reading
+    """
+    head = f.read(8)
+    for serializer in serializers.values():
+        if serializer.magic and head == serializer.magic:
+            return serializer
+    f.seek(0)
+    return JSONSerializer
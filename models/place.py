@@ -3,7 +3,8 @@
 """
 from .base_model import BaseModel, Base
 from models import storage_type
-from sqlalchemy import Column, String, ForeignKey, Integer, Float, Table
+from sqlalchemy import (Column, Float, ForeignKey, Index, Integer, String,
+                        Table)
 from sqlalchemy.orm import relationship
 
 if storage_type == 'db':
@@ -13,7 +14,8 @@ if storage_type == 'db':
                                  primary_key=True, nullable=False),
                           Column('amenity_id', String(60),
                                  ForeignKey('amenities.id'),
-                                 primary_key=True, nullable=False),
+                                 primary_key=True, nullable=False,
+                                 index=True),
                           mysql_charset='latin1')
 
 
@@ -38,19 +40,23 @@ class Place(BaseModel, Base):
     """
     if storage_type == 'db':
         __tablename__ = "places"
-        __table_args__ = {'mysql_default_charset': 'latin1'}
+        # Places are listed by name, on their own or within a city, and
+        # filtered by price
+        __table_args__ = (Index('ix_places_city_id_name', 'city_id', 'name'),
+                          {'mysql_default_charset': 'latin1'})
         city_id = Column(String(60), ForeignKey('cities.id'),
                          nullable=False)
         user_id = Column(String(60), ForeignKey('users.id'),
-                         nullable=False)
+                         nullable=False, index=True)
 
-        name = Column(String(128), nullable=False)
+        name = Column(String(128), nullable=False, index=True)
         description = Column(String(1024), nullable=True)
         number_rooms = Column(Integer, nullable=False, default=0)
         number_bathrooms = Column(Integer, nullable=False, default=0)
 
         max_guest = Column(Integer, nullable=False, default=0)
-        price_by_night = Column(Integer, nullable=False, default=0)
+        price_by_night = Column(Integer, nullable=False, default=0,
+                                index=True)
         latitude = Column(Float, nullable=True)
         longitude = Column(Float, nullable=True)
 
@@ -80,11 +86,16 @@ class Place(BaseModel, Base):
             from .review import Review
             from models import storage
 
-            review_list = []
-            for value in storage.all(Review).values():
-                if value.place_id == self.id:
-                    review_list.append(value)
-            return review_list
+            return storage.related(Review, 'place_id', self.id)
+
+        @property
+        def user(self):
+            """Gets the User who owns the current place.
+            """
+            from .user import User
+            from models import storage
+
+            return storage.get(User, self.user_id)
 
         @property
         def amenities(self):
@@ -94,9 +105,10 @@ class Place(BaseModel, Base):
             from models import storage
 
             amenity_list = []
-            for value in storage.all(Amenity).values():
-                if value.id in self.amenity_ids:
-                    amenity_list.append(value)
+            for amenity_id in self.amenity_ids:
+                amenity = storage.get(Amenity, amenity_id)
+                if amenity is not None:
+                    amenity_list.append(amenity)
             return amenity_list
 
         @amenities.setter
@@ -106,4 +118,5 @@ class Place(BaseModel, Base):
             from .amenity import Amenity
 
             if type(obj) is Amenity:
-                self.amenity_ids.append(obj.id)
+                # Assign a new list so the change flags the place as dirty
+                self.amenity_ids = self.amenity_ids + [obj.id]
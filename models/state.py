@@ -14,26 +14,25 @@ class State(BaseModel, Base):
 
     Attributes:
         name (str): The state name
+        cities (list): The City objects of the state, by name
     """
     if storage_type == 'db':
         __tablename__ = "states"
         __table_args__ = {'mysql_default_charset': 'latin1'}
-        name = Column(String(128), nullable=False)
-        cities = relationship("City", backref="state", cascade="all, delete")
+        name = Column(String(128), nullable=False, index=True)
+        cities = relationship("City", backref="state", cascade="all, delete",
+                              order_by="City.name")
 
     else:
         name = ""
 
         @property
         def cities(self):
-            """Gets the list of cities associated with the current state.
+            """Gets the list of cities associated with the current state,
+            sorted by name.
             """
             from .city import City
-            from .engine.file_storage import FileStorage
-
-            storage = FileStorage()
-            city_list = []
-            for value in storage.all(City).values():
-                if value.state_id == self.id:
-                    city_list.append(value)
-            return city_list
+            from models import storage
+
+            return storage.related(City, 'state_id', self.id,
+                                   order_by='name')
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""Tests the bulk import and export
+"""
+import csv
+import json
+import os
+import unittest
+
+from bulk import bulk_export, bulk_import
+from models import storage, storage_type
+from models.amenity import Amenity
+from models.place import Place
+from models.state import State
+
+
+@unittest.skipIf(
+    storage_type == 'db', "Only FileStorage tests are currently implemented"
+)
+class TestBulk(unittest.TestCase):
+    """Test the bulk_import and bulk_export functions
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Sets up the class
+        """
+        storage._FileStorage__file_path = "test.json"  # type: ignore
+
+    def setUp(self):
+        """Sets up each test
+        """
+        storage.all().clear()
+
+    def tearDown(self):
+        """Removes the files written by the tests
+        """
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock", "bulk.csv", "bulk.ndjson"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_import_ndjson(self):
+        """Test importing NDJSON records
+        """
+        with open("bulk.ndjson", "w", encoding="utf-8") as f:
+            for i in range(3):
+                f.write(json.dumps({"name": "State{}".format(i)}) + "\n")
+            f.write("\n")
+        self.assertEqual(bulk_import(State, "bulk.ndjson", 2), 3)
+        names = sorted(s.name for s in storage.all(State).values())
+        self.assertEqual(names, ["State0", "State1", "State2"])
+        storage.all().clear()
+        storage.reload()
+        self.assertEqual(storage.count(State), 3)
+
+    def test_import_csv(self):
+        """Test importing CSV rows, with numbers and empty values
+        """
+        with open("bulk.csv", "w", encoding="utf-8") as f:
+            f.write("id,name,number_rooms,latitude,description\n")
+            f.write("1,Loft,3,1.5,\n")
+        self.assertEqual(bulk_import(Place, "bulk.csv"), 1)
+        place = storage.get(Place, "1")
+        self.assertEqual(place.number_rooms, 3)
+        self.assertEqual(place.latitude, 1.5)
+        self.assertNotIn("description", place.__dict__)
+
+    def test_import_error(self):
+        """Test that a bad line stops the import with ValueError
+        """
+        with open("bulk.ndjson", "w", encoding="utf-8") as f:
+            f.write("{not json}\n")
+        with self.assertRaises(ValueError):
+            bulk_import(State, "bulk.ndjson")
+
+    def test_export(self):
+        """Test exporting to NDJSON and CSV
+        """
+        states = [State(name="Ohio"), State(name="Utah")]
+        for state in states:
+            storage.new(state)
+        storage.new(Place(name="Loft"))
+
+        self.assertEqual(bulk_export(State, "bulk.ndjson"), 2)
+        with open("bulk.ndjson", "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records, [s.to_dict() for s in states])
+
+        self.assertEqual(bulk_export(State, "bulk.csv"), 2)
+        with open("bulk.csv", "r", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["name"] for row in rows], ["Ohio", "Utah"])
+        self.assertNotIn("__class__", rows[0])
+
+    def test_export_csv_columns(self):
+        """Test that the CSV columns are those the class declares, whatever
+        the first record holds, and that others stop the export
+        """
+        first = State()
+        storage.new(first)
+        storage.new(State(name="California"))
+        self.assertEqual(bulk_export(State, "bulk.csv"), 2)
+        with open("bulk.csv", "r", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0]),
+                         ["id", "created_at", "updated_at", "name"])
+        self.assertEqual([row["name"] for row in rows], ["", "California"])
+
+        first.motto = "Eureka"
+        with self.assertRaises(ValueError):
+            bulk_export(State, "bulk.csv")
+
+    def test_csv_list_round_trip(self):
+        """Test that list attributes go through CSV as JSON
+        """
+        amenity = Amenity(name="Wifi")
+        place = Place(name="Loft")
+        storage.new(amenity)
+        storage.new(place)
+        place.amenities = amenity
+        self.assertEqual(bulk_export(Place, "bulk.csv"), 1)
+
+        storage.all().clear()
+        storage.new(amenity)
+        self.assertEqual(bulk_import(Place, "bulk.csv"), 1)
+        loaded = storage.get(Place, place.id)
+        self.assertEqual(loaded.amenity_ids, [amenity.id])
+        self.assertEqual(loaded.amenities, [amenity])
+        loaded.amenities = Amenity()
+        self.assertEqual(len(loaded.amenity_ids), 2)
@@ -29,8 +29,10 @@ class TestConsole(unittest.TestCase):
         """
         self.cns = HBNBCommand()
         storage.all().clear()
-        if os.path.exists("test.json"):
-            os.remove("test.json")
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
 
     @unittest.skipUnless(sys.stdin.isatty(), "interactive mode only")
     def test_prompt(self):
@@ -254,6 +256,16 @@ class TestConsole(unittest.TestCase):
             self.cns.onecmd("destroy BaseModel " + f.getvalue().strip())
             self.assertNotIn(key, storage.all())
 
+    def test_destroy_saves_once(self):
+        """Test that destroy writes the storage once
+        """
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.cns.onecmd("create BaseModel")
+        with patch.object(type(storage), 'save', autospec=True,
+                          side_effect=type(storage).save) as save:
+            self.cns.onecmd("destroy BaseModel " + f.getvalue().strip())
+        self.assertEqual(save.call_count, 1)
+
     def test_all(self):
         """Test the all command
         """
@@ -296,6 +308,39 @@ class TestConsole(unittest.TestCase):
             self.assertIn("User", f.getvalue())
             self.assertIn("Place", f.getvalue())
 
+    def test_all_pages(self):
+        """Test that the all command reads a class a page at a time
+        """
+        with patch('sys.stdout', new=StringIO()) as f:
+            for _ in range(3):
+                self.cns.onecmd("create State")
+        ids = sorted(f.getvalue().split())
+
+        with patch.object(HBNBCommand, 'page_size', 2), \
+                patch('sys.stdout', new=StringIO()) as f:
+            self.cns.onecmd("all State")
+        output = f.getvalue()
+        self.assertEqual(output, "[{}]\n".format(", ".join(
+            str(storage.all()["State." + id]) for id in ids)))
+
+    def test_count(self):
+        """Test the count command
+        """
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.cns.onecmd("count State")
+            self.assertEqual("0\n", f.getvalue())
+
+        with patch('sys.stdout', new=StringIO()):
+            self.cns.onecmd("create State")
+            self.cns.onecmd("create State")
+            self.cns.onecmd("create City")
+
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.cns.onecmd("count State")
+            self.cns.onecmd("City.count()")
+            self.cns.onecmd("count MyModel")
+            self.assertEqual("2\n1\n0\n", f.getvalue())
+
     def test_update(self):
         """Test the update command
         """
@@ -342,3 +387,20 @@ class TestConsole(unittest.TestCase):
         with patch('sys.stdout', new=StringIO()) as f:
             self.cns.onecmd("show BaseModel " + object_id)
             self.assertIn("Holberton", f.getvalue())
+
+    def test_update_foreign_key(self):
+        """Test that updating a foreign key is seen by relationships
+        """
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.cns.onecmd("create State")
+            state_id = f.getvalue().strip()
+        with patch('sys.stdout', new=StringIO()) as f:
+            self.cns.onecmd("create City")
+            city_id = f.getvalue().strip()
+
+        state = storage.all()["State." + state_id]
+        self.assertEqual(state.cities, [])
+        with patch('sys.stdout', new=StringIO()):
+            self.cns.onecmd('update City {} state_id "{}"'.format(
+                city_id, state_id))
+        self.assertEqual([city.id for city in state.cities], [city_id])
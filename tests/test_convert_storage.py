@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""Tests the snapshot converter
+"""
+import json
+import os
+import unittest
+
+from convert_storage import convert
+from models.state import State
+
+
+class TestConvert(unittest.TestCase):
+    """Test the convert function
+    """
+    def tearDown(self):
+        """Removes the converted files
+        """
+        for path in ("convert.json", "convert.bin", "convert2.json"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_round_trip(self):
+        """Test converting JSON to pickle and back
+        """
+        state = State(name="Oregon")
+        data = {"State." + state.id: state.to_dict()}
+        with open("convert.json", "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+        self.assertEqual(convert("convert.json", "convert.bin", "pickle"), 1)
+        with open("convert.bin", "rb") as f:
+            self.assertEqual(f.read(8), b"HBNBPKL5")
+        self.assertEqual(convert("convert.bin", "convert2.json", "json"), 1)
+        with open("convert2.json", "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), data)
+
+    def test_unknown_format(self):
+        """Test that an unknown format is rejected
+        """
+        with open("convert.json", "w", encoding="utf-8") as f:
+            f.write("{}")
+        with self.assertRaises(ValueError):
+            convert("convert.json", "convert.bin", "xml")
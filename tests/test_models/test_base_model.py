@@ -22,8 +22,10 @@ class TestBaseModel(unittest.TestCase):
         """Sets up each test
         """
         storage._FileStorage__objects = {}  # type: ignore
-        if os.path.exists("test.json"):
-            os.remove("test.json")
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_init(self):
         """Tests the __init__ method
@@ -66,8 +68,9 @@ class TestBaseModel(unittest.TestCase):
         b1.save()
         self.assertNotEqual(b1.created_at, b1.updated_at)
 
-        with open(storage._FileStorage__file_path, "r") as f:  # type: ignore
-            self.assertIn("BaseModel." + b1.id, f.read())
+        storage.all().clear()
+        storage.reload()
+        self.assertIn("BaseModel." + b1.id, storage.all())
 
     def test_to_dict(self):
         """Tests the to_dict method
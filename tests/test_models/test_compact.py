@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+This module tests the compact model representation
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+import pycodestyle
+
+from models.compact import CompactModel
+
+
+class Root(metaclass=CompactModel):
+    """A root model, like BaseModel in compact mode"""
+
+    def __setattr__(self, name, value):
+        """Counts the attributes set through the declared hook"""
+        Root.calls.append(name)
+        super().__setattr__(name, value)
+
+
+Root.calls = []
+
+
+class Thing(Root):
+    """A model declaring defaults, like State in compact mode"""
+    name = ""
+    tags = []
+
+    @property
+    def label(self):
+        """A property is not turned into a slot"""
+        return "<{}>".format(self.name)
+
+
+class CompactModelTest(unittest.TestCase):
+    """Test the CompactModel metaclass"""
+
+    def test_slots(self):
+        """Declared defaults become slots and instances have no dict"""
+        self.assertEqual(Root.__slots__,
+                         ('id', 'created_at', 'updated_at', '_extra'))
+        self.assertEqual(Thing.__slots__, ('name', 'tags'))
+        self.assertEqual(Thing._fields, ('id', 'created_at', 'updated_at',
+                                         'name', 'tags'))
+        with self.assertRaises(AttributeError):
+            object.__getattribute__(Thing(), '__weakref__')
+
+    def test_defaults(self):
+        """Unset slots fall back to the class defaults"""
+        thing = Thing()
+        self.assertEqual(thing.name, "")
+        self.assertIs(thing.tags, Thing._defaults['tags'])
+        self.assertEqual(thing.label, "<>")
+        with self.assertRaises(AttributeError):
+            thing.missing
+
+    def test_dict(self):
+        """__dict__ holds the attributes that were set, extras included"""
+        thing = Thing()
+        thing.id = "1"
+        thing.name = "Box"
+        thing.color = "red"
+        self.assertEqual(thing.__dict__,
+                         {'id': "1", 'name': "Box", 'color': "red"})
+        self.assertEqual(thing.color, "red")
+        self.assertEqual(Thing().__dict__, {})
+        self.assertIsNone(Thing()._extra)
+
+    def test_delattr(self):
+        """Slots and extra attributes can be deleted"""
+        thing = Thing()
+        thing.name = "Box"
+        thing.color = "red"
+        del thing.name
+        del thing.color
+        self.assertEqual(thing.__dict__, {})
+        with self.assertRaises(AttributeError):
+            del thing.color
+
+    def test_setattr_hook(self):
+        """The __setattr__ of the class body still runs"""
+        Root.calls.clear()
+        thing = Thing()
+        thing.name = "Box"
+        thing.color = "red"
+        self.assertEqual(Root.calls, ['name', 'color'])
+
+    def test_read_only_property(self):
+        """Assigning a property without setter still fails"""
+        with self.assertRaises(AttributeError):
+            Thing().label = "x"
+
+    def test_models(self):
+        """The models keep their str() and to_dict() in compact mode"""
+        script = (
+            "from models.state import State\n"
+            "s = State(name='Ohio', extra=1)\n"
+            "assert not hasattr(State, '__weakref__')\n"
+            "assert s.to_dict()['name'] == 'Ohio'\n"
+            "assert s.to_dict()['extra'] == 1\n"
+            "assert str(s) == '[State] ({}) {}'.format(s.id, s.__dict__)\n"
+            "assert State(**s.to_dict()).__dict__ == s.__dict__\n"
+        )
+        env = dict(os.environ, HBNB_COMPACT_MODELS='1')
+        env.pop('HBNB_TYPE_STORAGE', None)
+        result = subprocess.run([sys.executable, '-c', script], env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_pycodestyle(self):
+        """Check PEP 8 style"""
+        style = pycodestyle.StyleGuide(quiet=True)
+        result = style.check_files(['models/compact.py'])
+        self.assertEqual(result.total_errors, 0, "Found code style errors.")
@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+""" Module for testing the asyncio storage interfaces"""
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+import pycodestyle
+
+from models.city import City
+from models.engine.async_storage import AsyncStorage
+from models.engine.file_storage import FileStorage
+from models.state import State
+
+
+class TestAsyncStorage(unittest.TestCase):
+    """ Class to test AsyncStorage over FileStorage """
+
+    @classmethod
+    def setUpClass(cls):
+        """Sets up the class
+        """
+        FileStorage._FileStorage__file_path = "test.json"  # type: ignore
+
+    def setUp(self):
+        """ Set up for each test """
+        self.fstore = FileStorage()
+        self.fstore.all().clear()
+        FileStorage._FileStorage__pending.clear()  # type: ignore
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+        self.astore = AsyncStorage(self.fstore)
+
+    def tearDown(self):
+        """ Remove the storage file """
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_interface(self):
+        """ The engine's methods are awaited and return its results """
+        state = State(name="Ohio")
+        city = City(name="Akron", state_id=state.id)
+
+        async def run():
+            await self.astore.new(state)
+            await self.astore.new(city)
+            await self.astore.save()
+            await self.astore.reload()
+            return (await self.astore.count(State),
+                    await self.astore.keys(City),
+                    (await self.astore.get(State, state.id)).name,
+                    [c.name for c in await self.astore.related(
+                        City, 'state_id', state.id)],
+                    list(await self.astore.all(State, limit=1)))
+
+        self.assertEqual(asyncio.run(run()), (
+            1, ['City.' + city.id], "Ohio", ["Akron"],
+            ['State.' + state.id]))
+
+        async def delete():
+            await self.astore.delete(city)
+            await self.astore.save()
+            return await self.astore.count()
+
+        self.assertEqual(asyncio.run(delete()), 1)
+
+    def test_off_loop(self):
+        """ Calls run on the worker thread while the loop keeps going """
+        threads = set()
+
+        def save():
+            threads.add(threading.current_thread().name)
+
+        self.fstore.save = save
+
+        async def run():
+            ticks = []
+
+            async def tick():
+                for _ in range(3):
+                    ticks.append(1)
+                    await asyncio.sleep(0)
+
+            await asyncio.gather(self.astore.save(), tick())
+            return ticks
+
+        self.assertEqual(len(asyncio.run(run())), 3)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads.pop().startswith('storage'))
+
+    @unittest.skipUnless(importlib.util.find_spec('greenlet') and
+                         importlib.util.find_spec('aiosqlite'),
+                         "needs SQLAlchemy's asyncio extension and aiosqlite")
+    def test_async_db_storage(self):
+        """ AsyncDBStorage reads and writes a SQLite database """
+        script = (
+            "import asyncio\n"
+            "from models.engine.async_storage import async_storage\n"
+            "from models.state import State\n"
+            "async def run():\n"
+            "    storage = async_storage()\n"
+            "    await storage.reload()\n"
+            "    state = State(name='Utah')\n"
+            "    await storage.new(state)\n"
+            "    await storage.save()\n"
+            "    await storage.close()\n"
+            "    states = await storage.all(State, load=('cities',))\n"
+            "    print(await storage.count(State), await storage.keys(),\n"
+            "          [s.cities for s in states.values()],\n"
+            "          (await storage.get(State, state.id)).name)\n"
+            "asyncio.run(run())\n"
+        )
+        env = dict(os.environ, HBNB_TYPE_STORAGE='db', HBNB_ENV='dev',
+                   HBNB_DB_URL='sqlite:///test.db')
+        try:
+            result = subprocess.run([sys.executable, '-c', script], env=env,
+                                    capture_output=True, text=True)
+        finally:
+            for path in ('test.db', 'test.db-wal', 'test.db-shm'):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertRegex(result.stdout, r"^1 \['State\..*'\] \[\[\]\] Utah")
+
+    def test_pycodestyle(self):
+        """Check PEP 8 style"""
+        style = pycodestyle.StyleGuide(quiet=True)
+        result = style.check_files(['models/engine/async_storage.py',
+                                    'models/engine/async_db_storage.py'])
+        self.assertEqual(result.total_errors, 0, "Found code style errors.")
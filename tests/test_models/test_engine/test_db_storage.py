@@ -2,10 +2,13 @@
 """Module for testing the DBStorage class
 """
 import os
+import subprocess
+import sys
 import unittest
+from unittest import mock
 from uuid import uuid4
 
-import MySQLdb
+from sqlalchemy import create_engine, event
 
 from models.amenity import Amenity
 from models.city import City
@@ -15,6 +18,11 @@ from models.review import Review
 from models.state import State
 from models.user import User
 
+try:
+    import MySQLdb
+except ImportError:
+    MySQLdb = None
+
 db_condition = (os.getenv('HBNB_ENV') == 'test'
                 and os.getenv('HBNB_TYPE_STORAGE') == 'db')
 
@@ -266,8 +274,8 @@ class TestDBStorage(unittest.TestCase):
             "delete(None) should not change database row counts"
         )
 
-    def test_delete_removes_object_after_save(self):
-        """Test that delete(obj) removes object from DB after save()."""
+    def test_delete_removes_object(self):
+        """Test that delete(obj) commits the removal from the DB."""
         token = uuid4().hex[:8]
         user = User(
             email=f"delete.{token}@example.com",
@@ -285,14 +293,534 @@ class TestDBStorage(unittest.TestCase):
 
         self.storage.delete(user)
 
-        self.assertIsNotNone(
+        self.assertIsNone(
             self._get_row_by_id("users", user.id),
-            "User should still exist in database until save() commits delete"
+            "User should be removed from database after delete()"
         )
 
-        self.storage.save()
+    def test_keys(self):
+        """Test that keys() lists every class in a single query."""
+        objects = self._build_related_objects("Keys")
+        self._persist_objects(objects.values())
+        queries = []
+        engine = self.storage._DBStorage__engine
+
+        def count(conn, cursor, statement, parameters, context, many):
+            queries.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            keys = self.storage.keys()
+            self.assertEqual(len(queries), 1)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        for cls, obj in objects.items():
+            self.assertIn("{}.{}".format(cls.__name__, obj.id), keys)
+        self.assertEqual(sorted(self.storage.keys(State)),
+                         sorted(self.storage.all(State)))
+
+    def test_all_columns(self):
+        """Test that all() only selects the columns asked for."""
+        state = self._build_related_objects("Columns")[State]
+        self._persist_objects([state])
+        self.storage._DBStorage__session().expunge_all()
+        obj = self.storage.all(State, columns=('name',))[
+            'State.' + state.id]
+        self.assertEqual(obj.name, state.name)
+        self.assertNotIn('created_at', obj.__dict__)
+        self.assertEqual(obj.created_at, state.created_at)
+
+    def test_count_and_pages(self):
+        """Test that count() and pages of all() match the tables."""
+        token = uuid4().hex[:8]
+        self.assertEqual(self.storage.count(State),
+                         self._get_table_row_count("states"))
+        self.assertEqual(self.storage.count(),
+                         sum(self._count_tables().values()))
+
+        initial_count = self.storage.count(State)
+        states = [State(name="Page{}{}".format(token, name))
+                  for name in ("b", "c", "a")]
+        self._persist_objects(states)
+        self.assertEqual(self.storage.count(State), initial_count + 3)
+        by_name = list(self.storage.all(State, order_by='name').values())
+        names = [state.name for state in by_name
+                 if state.name.startswith("Page" + token)]
+        self.assertEqual(names, ["Page{}{}".format(token, name)
+                                 for name in ("a", "b", "c")])
+        page = self.storage.all(State, order_by='name', offset=1, limit=2)
+        self.assertEqual(list(page.values()), by_name[1:3])
+        self.assertEqual(list(self.storage.all(State, limit=2)),
+                         sorted(self.storage.keys(State))[:2])
+        with self.assertRaises(ValueError):
+            self.storage.all(limit=1)
+
+    def test_save_skips_clean_session(self):
+        """Test that save() only commits when the session holds changes."""
+        commits = []
+        session = self.storage._DBStorage__session()
+
+        def count(session):
+            commits.append(session)
+
+        event.listen(session, 'after_commit', count)
+        try:
+            self.storage.save()
+            self.assertEqual(commits, [])
+
+            state = State(name="Dirty")
+            self.storage.new(state)
+            self.storage.all(State)  # autoflushes the new state
+            self.storage.save()
+            self.assertEqual(len(commits), 1)
+            self.assertIsNotNone(self._get_row_by_id("states", state.id))
+
+            state.name = "Dirty"
+            self.storage.save()
+            self.assertEqual(len(commits), 1)
+        finally:
+            event.remove(session, 'after_commit', count)
+
+    def test_batch(self):
+        """Test that batch() commits once, or rolls back on error."""
+        commits = []
+        session = self.storage._DBStorage__session()
+
+        def count(session):
+            commits.append(session)
+
+        event.listen(session, 'after_commit', count)
+        try:
+            with self.storage.batch():
+                states = [State(name="Batch") for _ in range(3)]
+                for state in states:
+                    self.storage.new(state)
+                    self.storage.save()
+            self.assertEqual(len(commits), 1)
+            for state in states:
+                self.assertIsNotNone(self._get_row_by_id("states", state.id))
+
+            state = State(name="Rolled back")
+            with self.assertRaises(KeyError):
+                with self.storage.batch():
+                    self.storage.new(state)
+                    self.storage.save()
+                    raise KeyError
+            self.assertEqual(len(commits), 1)
+            self.assertIsNone(self._get_row_by_id("states", state.id))
+        finally:
+            event.remove(session, 'after_commit', count)
+
+    def test_bulk_insert_and_export(self):
+        """Test that bulk_insert() inserts rows that iter_records() reads."""
+        initial_count = self._get_table_row_count("states")
+        token = uuid4().hex[:8]
+        records = ({"name": "Bulk{}{}".format(token, i)} for i in range(5))
+        self.assertEqual(self.storage.bulk_insert(State, records, 2), 5)
+        self.assertEqual(self._get_table_row_count("states"),
+                         initial_count + 5)
+
+        exported = [record for record in self.storage.iter_records(State)
+                    if record["name"].startswith("Bulk" + token)]
+        self.assertEqual(len(exported), 5)
+        self.assertEqual(exported[0]["__class__"], "State")
+        self.assertIsInstance(exported[0]["created_at"], str)
+
+
+class TestDBStoragePool(unittest.TestCase):
+    """Test the pool settings and statistics, on SQLite"""
+
+    def setUp(self):
+        """Creates a storage whose engine is on a SQLite file"""
+        self.kwargs = {}
+
+        def engine(url, **kwargs):
+            self.kwargs = kwargs
+            return create_engine(url, **kwargs)
+
+        env = {'HBNB_DB_URL': 'sqlite:///test.db',
+               'HBNB_MYSQL_POOL_SIZE': '1', 'HBNB_MYSQL_MAX_OVERFLOW': '1',
+               'HBNB_MYSQL_PRE_PING': '0', 'HBNB_ENV': 'dev'}
+        with mock.patch.object(db_storage, 'create_engine', engine), \
+                mock.patch.dict(os.environ, env):
+            self.storage = db_storage.DBStorage()
+        self.engine = self.storage._DBStorage__engine
+
+    def tearDown(self):
+        """Closes the pool and removes the database"""
+        self.engine.dispose()
+        if os.path.exists('test.db'):
+            os.remove('test.db')
+
+    def test_settings(self):
+        """Test that the pool is configured from the environment."""
+        self.assertEqual(self.kwargs['pool_size'], 1)
+        self.assertEqual(self.kwargs['max_overflow'], 1)
+        self.assertEqual(self.kwargs['pool_timeout'], 30)
+        self.assertEqual(self.kwargs['pool_recycle'], -1)
+        self.assertFalse(self.kwargs['pool_pre_ping'])
+        self.assertEqual(self.kwargs['query_cache_size'], 500)
+
+    def test_pool_stats(self):
+        """Test that checkouts past the pool size are counted."""
+        first = self.engine.connect()
+        second = self.engine.connect()
+        stats = self.storage.pool_stats()
+        self.assertEqual((stats['checked_out'], stats['overflow']), (2, 1))
+        self.assertEqual((stats['checkouts'], stats['overflows'],
+                          stats['exhausted'], stats['peak']), (2, 1, 1, 2))
+
+        first.close()
+        second.invalidate()
+        second.close()
+        self.engine.connect().close()
+        stats = self.storage.pool_stats()
+        self.assertEqual((stats['size'], stats['checked_out']), (1, 0))
+        self.assertEqual((stats['connects'], stats['checkouts'],
+                          stats['invalidated']), (2, 3, 1))
+
+
+class TestDBStorageSQLite(unittest.TestCase):
+    """Test DBStorage on SQLite, in processes using the db storage type"""
+
+    def tearDown(self):
+        """Removes the databases"""
+        for name in ('test.db', 'test_replica.db'):
+            for path in (name, name + '-wal', name + '-shm'):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def run_script(self, script, url, replicas=''):
+        """Runs a script in a process whose storage is the database at url
 
-        self.assertIsNone(
-            self._get_row_by_id("users", user.id),
-            "User should be removed from database after delete() and save()"
-        )
+        Args:
+            script (str): The Python code to run
+            url (str): The SQLAlchemy URL of the database
+            replicas (str): The URLs of its read replicas
+        """
+        env = dict(os.environ, HBNB_TYPE_STORAGE='db', HBNB_DB_URL=url,
+                   HBNB_DB_REPLICA_URLS=replicas, HBNB_ENV='dev')
+        result = subprocess.run([sys.executable, '-c', script], env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout
+
+    def test_file(self):
+        """Test that a SQLite file keeps the models, in WAL mode."""
+        self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "state = State(name='Ohio')\n"
+            "state.save()\n"
+            "City(name='Akron', state_id=state.id).save()\n",
+            'sqlite:///test.db')
+        output = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from sqlalchemy import text\n"
+            "state, = storage.all(State, load=('cities',)).values()\n"
+            "print(state.name, [city.name for city in state.cities])\n"
+            "with storage._DBStorage__engine.connect() as conn:\n"
+            "    print(conn.execute(text('PRAGMA journal_mode')).scalar())\n",
+            'sqlite:///test.db')
+        self.assertEqual(output, "Ohio ['Akron']\nwal\n")
+
+    def test_delete_commits(self):
+        """Test that delete(obj) commits without a separate save()."""
+        self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "state = State(name='Ohio')\n"
+            "state.save()\n"
+            "storage.delete(state)\n"
+            "storage.close()\n",
+            'sqlite:///test.db')
+        output = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "print(storage.count(State))\n",
+            'sqlite:///test.db')
+        self.assertEqual(output, "0\n")
+
+    def test_all_preloads_relationships(self):
+        """Test that all() fetches the relationships in load in a constant
+        number of queries, however many objects there are."""
+        self.run_script(
+            "from models import storage\n"
+            "from models.amenity import Amenity\n"
+            "from models.city import City\n"
+            "from models.place import Place\n"
+            "from models.review import Review\n"
+            "from models.state import State\n"
+            "from models.user import User\n"
+            "for i in range(3):\n"
+            "    state = State(name='State{}'.format(i))\n"
+            "    city = City(name='City{}'.format(i), state_id=state.id)\n"
+            "    user = User(email='{}@example.com'.format(i), password='p',\n"
+            "                first_name='User{}'.format(i))\n"
+            "    place = Place(name='Place{}'.format(i), city_id=city.id,\n"
+            "                  user_id=user.id)\n"
+            "    review = Review(text='Good', place_id=place.id,\n"
+            "                    user_id=user.id)\n"
+            "    place.amenities.append(Amenity(name='Wifi{}'.format(i)))\n"
+            "    for obj in (state, city, user, place, review):\n"
+            "        storage.new(obj)\n"
+            "storage.save()\n",
+            'sqlite:///test.db')
+        output = self.run_script(
+            "from models import storage\n"
+            "from models.place import Place\n"
+            "from models.state import State\n"
+            "from sqlalchemy import event\n"
+            "queries = []\n"
+            "event.listen(storage._DBStorage__engine,\n"
+            "             'before_cursor_execute',\n"
+            "             lambda *args: queries.append(args[2]))\n"
+            "states = storage.all(State, load=('cities',)).values()\n"
+            "print(sum(len(state.cities) for state in states), len(queries))\n"
+            "del queries[:]\n"
+            "places = storage.all(\n"
+            "    Place, load=('user', 'reviews', 'amenities')).values()\n"
+            "print(sorted((place.user.first_name, len(place.reviews),\n"
+            "              len(place.amenities)) for place in places),\n"
+            "      len(queries))\n",
+            'sqlite:///test.db')
+        self.assertEqual(output.splitlines(), [
+            "3 2",
+            "[('User0', 1, 1), ('User1', 1, 1), ('User2', 1, 1)] 4"])
+
+    def test_indexes(self):
+        """Test that the tables get the indexes the models declare."""
+        output = self.run_script(
+            "from models import storage\n"
+            "from sqlalchemy import inspect\n"
+            "tables = inspect(storage._DBStorage__engine)\n"
+            "for table in ('cities', 'places', 'reviews', 'states'):\n"
+            "    print(sorted(tuple(index['column_names'])\n"
+            "                 for index in tables.get_indexes(table)))\n",
+            'sqlite:///test.db')
+        self.assertEqual(output.splitlines(), [
+            "[('state_id', 'name')]",
+            "[('city_id', 'name'), ('name',), ('price_by_night',), "
+            "('user_id',)]",
+            "[('place_id',), ('user_id',)]",
+            "[('name',)]",
+        ])
+
+    def test_replica(self):
+        """Test that reads go to the replica until the session writes."""
+        output = self.run_script(
+            "from datetime import datetime\n"
+            "from models import storage\n"
+            "from models.base_model import Base\n"
+            "from models.state import State\n"
+            "replica = storage._DBStorage__replicas[0]\n"
+            "Base.metadata.create_all(replica)\n"
+            "with replica.begin() as conn:\n"
+            "    conn.execute(State.__table__.insert(), {\n"
+            "        'id': '1', 'name': 'Replica',\n"
+            "        'created_at': datetime.now(),\n"
+            "        'updated_at': datetime.now()})\n"
+            "def names():\n"
+            "    return [s.name for s in storage.all(State).values()]\n"
+            "print(names(), storage.count(State))\n"
+            "storage.new(State(name='Primary'))\n"
+            "storage.save()\n"
+            "print(names(), storage.count(State))\n"
+            "storage.close()\n"
+            "print(names(), storage.pool_stats(0)['checkouts'] > 0)\n",
+            'sqlite:///test.db', 'sqlite:///test_replica.db')
+        self.assertEqual(output.splitlines(), ["['Replica'] 1",
+                                               "['Primary'] 1",
+                                               "['Replica'] True"])
+
+    def test_memory(self):
+        """Test that the threads of a process share an in-memory database."""
+        output = self.run_script(
+            "import threading\n"
+            "from models import storage\n"
+            "from models.state import State\n"
+            "State(name='Utah').save()\n"
+            "thread = threading.Thread(target=lambda: print(\n"
+            "    storage.count(State), storage.pool_stats()['size']))\n"
+            "thread.start()\n"
+            "thread.join()\n", 'sqlite://')
+        self.assertEqual(output, "1 1\n")
+
+    def test_fork(self):
+        """Test that a forked process connects anew, leaving the pooled
+        connections to its parent."""
+        output = self.run_script(
+            "import os\n"
+            "from models import storage\n"
+            "from models.state import State\n"
+            "State(name='Iowa').save()\n"
+            "storage.close()\n"
+            "pid = os.fork()\n"
+            "if pid == 0:\n"
+            "    print(storage.count(State),\n"
+            "          storage.pool_stats()['connects'], flush=True)\n"
+            "    os._exit(0)\n"
+            "os.waitpid(pid, 0)\n"
+            "print(storage.count(State), storage.pool_stats()['connects'])\n",
+            'sqlite:///test.db')
+        self.assertEqual(output, "1 2\n1 1\n")
+
+    def test_keys_and_columns(self):
+        """Test that keys() lists every class in one query, and that all()
+        selects only the columns asked for."""
+        output = self.run_script(
+            "from sqlalchemy import event\n"
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "state = State(name='Ohio')\n"
+            "storage.new(state)\n"
+            "storage.new(City(name='Akron', state_id=state.id))\n"
+            "storage.save()\n"
+            "storage.close()\n"
+            "queries = []\n"
+            "event.listen(storage._DBStorage__engine,\n"
+            "             'before_cursor_execute',\n"
+            "             lambda *args: queries.append(args[2]))\n"
+            "print(sorted(key.split('.')[0] for key in storage.keys()),\n"
+            "      len(queries))\n"
+            "obj, = storage.all(State, columns=('name',)).values()\n"
+            "print(obj.name, 'created_at' in obj.__dict__,\n"
+            "      obj.created_at == state.created_at)\n",
+            'sqlite:///test.db')
+        self.assertEqual(output.splitlines(),
+                         ["['City', 'State'] 1", "Ohio False True"])
+
+    def test_all_concurrent(self):
+        """Test that all() without a class reads the classes on several
+        connections at once into the session, unless it holds changes."""
+        output = self.run_script(
+            "import threading\n"
+            "from sqlalchemy import event\n"
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "state = State(name='Ohio')\n"
+            "storage.new(state)\n"
+            "storage.new(City(name='Akron', state_id=state.id))\n"
+            "storage.save()\n"
+            "storage.close()\n"
+            "threads = set()\n"
+            "event.listen(storage._DBStorage__engine,\n"
+            "             'before_cursor_execute',\n"
+            "             lambda *args: threads.add(threading.get_ident()))\n"
+            "held = storage.get(State, state.id)\n"
+            "threads.clear()\n"
+            "objs = storage.all()\n"
+            "session = storage._DBStorage__session()\n"
+            "print(len(objs), len(threads) > 1,\n"
+            "      all(obj in session for obj in objs.values()),\n"
+            "      objs['State.' + state.id] is held)\n"
+            "storage.new(State(name='Iowa'))\n"
+            "threads.clear()\n"
+            "print(len(storage.all()), threads == {threading.get_ident()})\n",
+            'sqlite:///test.db')
+        self.assertEqual(output.splitlines(),
+                         ["2 True True True", "3 True"])
+
+    def test_generation(self):
+        """Test that commits move the generation of the classes they
+        change, from this process or another one, and that uncommitted
+        changes do not."""
+        output = self.run_script(
+            "import sqlite3\n"
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "last = None\n"
+            "def changed():\n"
+            "    global last\n"
+            "    before, last = last, (storage.generation(State),\n"
+            "                          storage.generation(City))\n"
+            "    storage.close()\n"
+            "    return before and tuple(a != b\n"
+            "                            for a, b in zip(before, last))\n"
+            "changed()\n"
+            "state = State(name='Ohio')\n"
+            "storage.new(state)\n"
+            "storage.save()\n"
+            "print(changed())\n"
+            "state.name = 'Iowa'\n"
+            "storage.new(state)\n"
+            "storage.save()\n"
+            "print(changed())\n"
+            "storage.new(City(name='Ames', state_id=state.id))\n"
+            "storage.close()\n"
+            "print(changed())\n"
+            "storage.bulk_insert(City, [{'name': 'Akron',\n"
+            "                            'state_id': state.id}])\n"
+            "print(changed())\n"
+            "with sqlite3.connect('test.db') as db:\n"
+            "    db.execute('DELETE FROM cities')\n"
+            "print(changed())\n"
+            "print(changed())\n",
+            'sqlite:///test.db')
+        self.assertEqual(output.splitlines(), [
+            "(True, False)", "(True, False)", "(False, False)",
+            "(False, True)", "(False, True)", "(False, False)"])
+
+    def test_ordered(self):
+        """Test that states and their cities come back by name."""
+        output = self.run_script(
+            "from models import storage\n"
+            "from models.state import State\n"
+            "from models.city import City\n"
+            "for name in 'ba':\n"
+            "    state = State(name=name)\n"
+            "    storage.new(state)\n"
+            "    for city in 'zxy':\n"
+            "        storage.new(City(name=city, state_id=state.id))\n"
+            "storage.save()\n"
+            "storage.close()\n"
+            "for load in ((), ('cities',)):\n"
+            "    print([(s.name, [c.name for c in s.cities]) for s in\n"
+            "           storage.all(State, load=load,\n"
+            "                       order_by='name').values()])\n"
+            "    storage.close()\n",
+            'sqlite:///test.db')
+        self.assertEqual(output.splitlines(), [
+            "[('a', ['x', 'y', 'z']), ('b', ['x', 'y', 'z'])]"] * 2)
+
+    def test_find(self):
+        """Test that find() filters in the query and pages after a
+        cursor."""
+        output = self.run_script(
+            "from models import storage\n"
+            "from models.amenity import Amenity\n"
+            "from models.city import City\n"
+            "from models.place import Place\n"
+            "from models.state import State\n"
+            "from models.user import User\n"
+            "state = State(name='Ohio')\n"
+            "user = User(email='a@b.c', password='pwd')\n"
+            "wifi = Amenity(name='Wifi')\n"
+            "cities = [City(name=str(i), state_id=state.id)\n"
+            "          for i in range(2)]\n"
+            "for obj in [state, user, wifi] + cities:\n"
+            "    storage.new(obj)\n"
+            "places = []\n"
+            "for i, name in enumerate('fedcba'):\n"
+            "    place = Place(name=name, city_id=cities[i % 2].id,\n"
+            "                  user_id=user.id, price_by_night=i)\n"
+            "    if i % 3 == 0:\n"
+            "        place.amenities.append(wifi)\n"
+            "    places.append(place)\n"
+            "    storage.new(place)\n"
+            "storage.save()\n"
+            "def names(**kwargs):\n"
+            "    print(''.join(p.name for p in storage.find(\n"
+            "        Place, order_by='name', **kwargs).values()))\n"
+            "names()\n"
+            "names(where={'city_id': [cities[0].id]})\n"
+            "names(having={'amenities': [wifi.id]})\n"
+            "names(ranges={'price_by_night': (2, None)},\n"
+            "      after=('b', places[4].id), limit=2)\n",
+            'sqlite:///test.db')
+        self.assertEqual(output.splitlines(), ["abcdef", "bdf", "cf", "cd"])
@@ -1,12 +1,19 @@
 #!/usr/bin/python3
 """ Module for testing file storage"""
+import fcntl
 import json
 import os
 import unittest
+from unittest import mock
 
+import models
+from models import storage_type
+from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
 from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
 from models.state import State
 
 
@@ -18,13 +25,30 @@ class TestFileStorage(unittest.TestCase):
         """Sets up the class
         """
         FileStorage._FileStorage__file_path = "test.json"  # type: ignore
+        cls.modes = (FileStorage._FileStorage__journal,  # type: ignore
+                     FileStorage._FileStorage__lazy,  # type: ignore
+                     FileStorage._FileStorage__format)  # type: ignore
 
     def setUp(self):
         """ Set up for each test """
+        FileStorage._FileStorage__journal = False  # type: ignore
+        FileStorage._FileStorage__lazy = False  # type: ignore
+        FileStorage._FileStorage__format = 'json'  # type: ignore
         self.fstore = FileStorage()
         self.fstore.all().clear()
-        if os.path.exists("test.json"):
-            os.remove("test.json")
+        FileStorage._FileStorage__pending.clear()  # type: ignore
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+        self.fstore.reload()
+
+    def tearDown(self):
+        """ Put journaling, lazy loading and the format back as configured
+        """
+        (FileStorage._FileStorage__journal,  # type: ignore
+         FileStorage._FileStorage__lazy,  # type: ignore
+         FileStorage._FileStorage__format) = self.modes  # type: ignore
 
     def test_obj_list_empty(self):
         """ __objects is initially empty """
@@ -63,6 +87,150 @@ class TestFileStorage(unittest.TestCase):
         self.assertIn(new.__class__.__name__ + '.' + new.id, state_objs)
         self.assertNotIn(new2.__class__.__name__ + '.' + new2.id, state_objs)
 
+    def test_all_with_cls_after_external_change(self):
+        """ Class filtering stays correct when __objects is changed
+        directly """
+        new = State()
+        self.fstore.new(new)
+        self.fstore.all().clear()
+        self.assertEqual(self.fstore.all(State), {})
+
+        key = 'State.' + new.id
+        self.fstore.all()[key] = new
+        self.assertEqual(self.fstore.all(State), {key: new})
+
+    def test_all_with_cls_after_delete(self):
+        """ Deleted objects leave the class index """
+        new = State()
+        other = State()
+        self.fstore.new(new)
+        self.fstore.new(other)
+        self.fstore.delete(new)
+        self.assertEqual(list(self.fstore.all(State)),
+                         ['State.' + other.id])
+
+    def test_all_with_cls_returns_copy(self):
+        """ Mutating a filtered result leaves storage untouched """
+        new = State()
+        self.fstore.new(new)
+        self.fstore.all(State).clear()
+        self.assertIn('State.' + new.id, self.fstore.all(State))
+
+    def test_get(self):
+        """ get() returns the object with the class and id, or None """
+        new = State()
+        self.fstore.new(new)
+        self.assertIs(self.fstore.get(State, new.id), new)
+        self.assertIsNone(self.fstore.get(City, new.id))
+        self.assertIsNone(self.fstore.get(State, "0001"))
+
+    def _lazy_reload(self, *objs):
+        """ Saves objs, then reloads them as raw records """
+        for obj in objs:
+            self.fstore.new(obj)
+        self.fstore.save()
+        FileStorage._FileStorage__lazy = True  # type: ignore
+        self.fstore.all().clear()
+        self.fstore.reload()
+        return FileStorage._FileStorage__raw  # type: ignore
+
+    def test_lazy_reload_keeps_records(self):
+        """ Lazy reload stores records without instantiating them """
+        state = State(name="Ohio")
+        raw = self._lazy_reload(state, City())
+        self.assertEqual(len(raw), 2)
+        self.assertEqual(raw['State.' + state.id]['name'], "Ohio")
+
+    def test_lazy_get(self):
+        """ get() instantiates only the requested record """
+        state = State(name="Ohio")
+        city = City()
+        raw = self._lazy_reload(state, city)
+
+        obj = self.fstore.get(State, state.id)
+        self.assertIsInstance(obj, State)
+        self.assertEqual(obj.name, "Ohio")
+        self.assertEqual(obj.created_at, state.created_at)
+        self.assertIs(self.fstore.get(State, state.id), obj)
+        self.assertEqual(list(raw), ['City.' + city.id])
+
+    def test_lazy_all(self):
+        """ all(cls) instantiates one class, all() every record """
+        state = State()
+        city = City()
+        raw = self._lazy_reload(state, city)
+
+        self.assertEqual(list(self.fstore.all(State)), ['State.' + state.id])
+        self.assertEqual(list(raw), ['City.' + city.id])
+        self.assertIsInstance(self.fstore.all()['City.' + city.id], City)
+        self.assertEqual(len(raw), 0)
+
+    def test_lazy_related(self):
+        """ Relationships instantiate only the related records """
+        state = State()
+        city = City(state_id=state.id)
+        other = City(state_id="0001")
+        raw = self._lazy_reload(state, city, other)
+
+        related = self.fstore.related(City, 'state_id', state.id)
+        self.assertEqual([obj.id for obj in related], [city.id])
+        self.assertIsInstance(related[0], City)
+        self.assertIn('City.' + other.id, raw)
+        self.assertIn('State.' + state.id, raw)
+
+    def test_lazy_save(self):
+        """ Raw records are written back as they were read """
+        state = State(name="Utah")
+        self._lazy_reload(state)
+        self.fstore.new(City())
+        self.fstore.save()
+
+        with open('test.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data['State.' + state.id], state.to_dict())
+        self.assertEqual(len(data), 2)
+
+    def test_related(self):
+        """ Objects are found through their foreign key """
+        state = State()
+        city = City(state_id=state.id)
+        other = City(state_id="0001")
+        for obj in (state, city, other):
+            self.fstore.new(obj)
+
+        self.assertEqual(self.fstore.related(City, 'state_id', state.id),
+                         [city])
+        self.assertEqual(self.fstore.related(Review, 'state_id', state.id),
+                         [])
+
+    @unittest.skipIf(storage_type == 'db',
+                     "BaseModel reports attribute changes outside db mode")
+    def test_related_follows_setattr(self):
+        """ Changing a foreign key moves the object between buckets """
+        city = City(state_id="0001")
+        self.fstore.new(city)
+        city.state_id = "0002"
+
+        self.assertEqual(self.fstore.related(City, 'state_id', "0001"), [])
+        self.assertEqual(self.fstore.related(City, 'state_id', "0002"),
+                         [city])
+
+    def test_related_after_delete_and_reload(self):
+        """ The foreign key index follows delete() and reload() """
+        city = City(state_id="0001")
+        gone = City(state_id="0001")
+        self.fstore.new(city)
+        self.fstore.new(gone)
+        self.fstore.save()
+        self.fstore.delete(gone)
+        self.assertEqual(self.fstore.related(City, 'state_id', "0001"),
+                         [city])
+
+        self.fstore.all().clear()
+        self.fstore.reload()
+        related = self.fstore.related(City, 'state_id', "0001")
+        self.assertEqual([obj.id for obj in related], [city.id])
+
     def test_save(self):
         """ FileStorage save method """
         new = BaseModel()
@@ -91,6 +259,304 @@ class TestFileStorage(unittest.TestCase):
             self.fstore.all()[key].__class__.__name__, 'BaseModel'
         )
 
+    @unittest.skipIf(storage_type == 'db',
+                     "BaseModel reports attribute changes outside db mode")
+    def test_save_reuses_clean_objects(self):
+        """ save() only encodes the objects changed since the last save """
+        first = State(name="Ohio")
+        second = State(name="Utah")
+        self.fstore.new(first)
+        self.fstore.new(second)
+        self.fstore.save()
+        fragments = FileStorage._FileStorage__fragments  # type: ignore
+        self.assertIn('State.' + first.id, fragments)
+        self.assertIn('State.' + second.id, fragments)
+
+        second.name = "Iowa"
+        self.assertIn('State.' + first.id, fragments)
+        self.assertNotIn('State.' + second.id, fragments)
+        self.fstore.save()
+        with open('test.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data['State.' + first.id], first.to_dict())
+        self.assertEqual(data['State.' + second.id]['name'], "Iowa")
+
+    @unittest.skipIf(storage_type == 'db',
+                     "BaseModel reports attribute changes outside db mode")
+    def test_save_after_in_place_change(self):
+        """ new() flags an object whose values changed in place """
+        place = Place()
+        place.amenity_ids = []
+        self.fstore.new(place)
+        self.fstore.save()
+        place.amenity_ids.append("1")
+        self.fstore.new(place)
+        self.fstore.save()
+
+        amenity = Amenity()
+        place.amenities = amenity
+        self.fstore.save()
+        with open('test.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data['Place.' + place.id]['amenity_ids'],
+                         ["1", amenity.id])
+        self.assertEqual(Place().amenity_ids, [])
+
+    def test_batch_saves_once(self):
+        """ A batch writes the file once, when it ends """
+        with self.fstore.batch():
+            states = [State(name=str(i)) for i in range(3)]
+            for state in states:
+                self.fstore.new(state)
+                self.fstore.save()
+            with self.fstore.batch():
+                self.fstore.delete(states[0])
+            self.assertFalse(os.path.exists('test.json'))
+        with open('test.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(set(data), {'State.' + s.id for s in states[1:]})
+
+    @unittest.skipIf(storage_type == 'db',
+                     "BaseModel reports attribute changes outside db mode")
+    def test_batch_rollback(self):
+        """ An exception in a batch puts the objects back """
+        kept = State(name="Kept")
+        city = City(name="Moved", state_id=kept.id)
+        gone = State(name="Gone")
+        for obj in (kept, city, gone):
+            self.fstore.new(obj)
+        self.fstore.save()
+        unsaved = State(name="Unsaved")
+        self.fstore.new(unsaved)
+
+        # BaseModel reports attribute changes to models.storage
+        with self.assertRaises(KeyError), \
+                mock.patch.object(models, 'storage', self.fstore):
+            with self.fstore.batch():
+                kept.name = "Renamed"
+                kept.motto = "New"
+                city.state_id = gone.id
+                self.fstore.new(city)
+                self.fstore.delete(gone)
+                added = State(name="Added")
+                self.fstore.new(added)
+                self.fstore.save()
+                raise KeyError
+
+        self.assertEqual(kept.name, "Kept")
+        self.assertNotIn('motto', kept.__dict__)
+        self.assertEqual(city.state_id, kept.id)
+        self.assertEqual(self.fstore.related(City, 'state_id', kept.id),
+                         [city])
+        self.assertEqual(self.fstore.related(City, 'state_id', gone.id), [])
+        self.assertIs(self.fstore.get(State, gone.id), gone)
+        self.assertIsNone(self.fstore.get(State, added.id))
+        self.assertEqual(self.fstore._FileStorage__pending,  # type: ignore
+                         {'State.' + unsaved.id: unsaved})
+
+    @unittest.skipIf(storage_type == 'db',
+                     "BaseModel reports attribute changes outside db mode")
+    def test_batch_rollback_new_foreign_key(self):
+        """ A foreign key first set in a failed batch leaves the index """
+        state = State(name="Ohio")
+        city = City(name="Akron")
+        for obj in (state, city):
+            self.fstore.new(obj)
+        self.fstore.save()
+
+        with self.assertRaises(KeyError), \
+                mock.patch.object(models, 'storage', self.fstore):
+            with self.fstore.batch():
+                city.state_id = state.id
+                raise KeyError
+
+        self.assertNotIn('state_id', city.__dict__)
+        self.assertEqual(self.fstore.related(City, 'state_id', state.id), [])
+        self.assertIs(self.fstore.get(City, city.id), city)
+
+    def test_bulk_insert(self):
+        """ Records are added as objects and written once """
+        records = ({'name': str(i)} for i in range(3))
+        self.assertEqual(self.fstore.bulk_insert(State, records), 3)
+        with open('test.json', 'r', encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 3)
+        self.assertEqual(sorted(r['name'] for r in
+                                self.fstore.iter_records(State)),
+                         ['0', '1', '2'])
+
+    def test_iter_records_lazy(self):
+        """ Raw records are exported without instantiating them """
+        new = State(name="Lazy")
+        self.fstore.new(new)
+        self.fstore.save()
+        FileStorage._FileStorage__lazy = True  # type: ignore
+        self.fstore.all().clear()
+        self.fstore.reload()
+        self.assertEqual(list(self.fstore.iter_records(State)),
+                         [new.to_dict()])
+        self.assertEqual(FileStorage._FileStorage__objects, {})  # type: ignore
+
+    def test_keys_lazy(self):
+        """ keys() lists raw and loaded objects without instantiating """
+        state = State(name="Lazy")
+        city = City(name="Keyed", state_id=state.id)
+        self.fstore.new(state)
+        self.fstore.new(city)
+        self.fstore.save()
+        FileStorage._FileStorage__lazy = True  # type: ignore
+        self.fstore.all().clear()
+        self.fstore.reload()
+        self.fstore.get(City, city.id)
+        self.assertEqual(self.fstore.keys(State), ['State.' + state.id])
+        self.assertEqual(sorted(self.fstore.keys()),
+                         sorted(['State.' + state.id, 'City.' + city.id]))
+        objects = FileStorage._FileStorage__objects  # type: ignore
+        self.assertEqual(list(objects), ['City.' + city.id])
+
+    def test_generation(self):
+        """ Changes move the generation of their class, reads do not """
+        state = State(name="Ohio")
+        self.fstore.new(state)
+        self.fstore.save()
+        city = City(name="Akron", state_id=state.id)
+        before = (self.fstore.generation(State), self.fstore.generation(City))
+        self.fstore.new(city)
+        self.fstore.get(State, state.id)
+        self.fstore.all(State)
+        self.assertEqual(self.fstore.generation(State), before[0])
+        self.assertGreater(self.fstore.generation(City), before[1])
+
+        city = self.fstore.generation(City)
+        self.fstore.delete(state)
+        self.assertGreater(self.fstore.generation(State), before[0])
+        self.assertEqual(self.fstore.generation(City), city)
+
+        state = self.fstore.generation(State)
+        with open("test.json", "w") as f:
+            f.write("{}")
+        self.fstore.close()
+        self.assertGreater(self.fstore.generation(State), state)
+        self.assertGreater(self.fstore.generation(City), city)
+
+    @unittest.skipIf(storage_type == 'db',
+                     "BaseModel reports attribute changes outside db mode")
+    def test_ordered(self):
+        """ Name orders are kept until their class changes """
+        state = State(name="Ohio")
+        cities = [City(name=name, state_id=state.id) for name in "cab"]
+        for obj in [state] + cities:
+            self.fstore.new(obj)
+
+        def names():
+            return [c.name for c in self.fstore.related(
+                City, 'state_id', state.id, order_by='name')]
+        self.assertEqual(names(), ["a", "b", "c"])
+        order = self.fstore.all(City, order_by='name')
+        self.assertEqual([c.name for c in order.values()], ["a", "b", "c"])
+        self.assertIs(self.fstore._ordered(City, {}, 'name'),
+                      self.fstore._ordered(City, {}, 'name'))
+
+        cities[0].name = "0"
+        self.fstore.new(cities[0])
+        self.assertEqual(names(), ["0", "a", "b"])
+        self.assertEqual(list(self.fstore.all(City, order_by='name'))[0],
+                         'City.' + cities[0].id)
+        cities[1].state_id = "other"
+        self.assertEqual(names(), ["0", "b"])
+
+    def test_find(self):
+        """ find() filters through the indexes and pages after a cursor """
+        cities = [City(name=str(i)) for i in range(2)]
+        places = [Place(name=name, city_id=cities[i % 2].id,
+                        price_by_night=i)
+                  for i, name in enumerate("fedcba")]
+        for obj in cities + places:
+            self.fstore.new(obj)
+
+        def names(**kwargs):
+            return [obj.name for obj in
+                    self.fstore.find(Place, order_by='name', **kwargs)
+                    .values()]
+        self.assertEqual(names(), list("abcdef"))
+        self.assertEqual(names(where={'city_id': [cities[0].id]}),
+                         list("bdf"))
+        self.assertEqual(names(ranges={'price_by_night': (2, None)},
+                               after=("b", places[4].id), limit=2),
+                         list("cd"))
+        self.assertEqual(names(where={'city_id': [cities[1].id]},
+                               after=("c", places[3].id)), list("e"))
+        self.assertEqual(list(self.fstore.find(Place, limit=1)),
+                         [min('Place.' + obj.id for obj in places)])
+
+    def test_count_and_pages(self):
+        """ Pages are cut from the class index in key or attribute order """
+        states = [State(name=name) for name in ("b", "c", "a")]
+        for obj in states + [City(name="x")]:
+            self.fstore.new(obj)
+        self.fstore.save()
+        FileStorage._FileStorage__lazy = True  # type: ignore
+        self.fstore.all().clear()
+        self.fstore.reload()
+
+        self.assertEqual(self.fstore.count(State), 3)
+        self.assertEqual(self.fstore.count(), 4)
+        page = self.fstore.all(State, order_by='name', offset=1, limit=1)
+        self.assertEqual([obj.name for obj in page.values()], ["b"])
+        objects = FileStorage._FileStorage__objects  # type: ignore
+        self.assertEqual(list(objects), list(page))
+        self.assertEqual(list(self.fstore.all(State, limit=2)),
+                         sorted('State.' + obj.id for obj in states)[:2])
+        self.assertEqual(self.fstore.all(State, offset=3), {})
+        with self.assertRaises(ValueError):
+            self.fstore.all(limit=1)
+
+    def test_reload_pickle(self):
+        """ Binary snapshots are written and read back """
+        FileStorage._FileStorage__format = 'pickle'  # type: ignore
+        new = State(name="Maine")
+        self.fstore.new(new)
+        self.fstore.save()
+        with open('test.json', 'rb') as f:
+            self.assertEqual(f.read(8), b'HBNBPKL5')
+
+        self.fstore.all().clear()
+        self.fstore.reload()
+        obj = self.fstore.all()['State.' + new.id]
+        self.assertEqual(obj.name, "Maine")
+        self.assertEqual(obj.created_at, new.created_at)
+
+    def test_iter_records_lazy_pickle(self):
+        """ Raw records of a binary snapshot come back as to_dict() """
+        FileStorage._FileStorage__format = 'pickle'  # type: ignore
+        new = State(name="Texas")
+        self.fstore.new(new)
+        self.fstore.save()
+        FileStorage._FileStorage__lazy = True  # type: ignore
+        self.fstore.all().clear()
+        self.fstore.reload()
+
+        records = list(self.fstore.iter_records(State))
+        self.assertEqual(records, [new.to_dict()])
+        self.assertEqual(json.loads(json.dumps(records)), records)
+        self.assertEqual(FileStorage._FileStorage__objects, {})  # type: ignore
+
+    def test_format_switch(self):
+        """ A JSON snapshot loaded lazily can be saved as pickle """
+        new = State(name="Idaho")
+        self.fstore.new(new)
+        self.fstore.save()
+        FileStorage._FileStorage__lazy = True  # type: ignore
+        FileStorage._FileStorage__format = 'pickle'  # type: ignore
+        self.fstore.all().clear()
+        self.fstore.reload()
+        self.fstore.save()
+
+        FileStorage._FileStorage__lazy = False  # type: ignore
+        self.fstore.all().clear()
+        self.fstore.reload()
+        obj = self.fstore.all()['State.' + new.id]
+        self.assertEqual(obj.updated_at, new.updated_at)
+
     def test_reload_empty(self):
         """ Load from an empty file (no error expected) """
         with open('test.json', 'w') as f:
@@ -132,6 +598,71 @@ class TestFileStorage(unittest.TestCase):
         key = "{}.{}".format(new.__class__.__name__, new.id)
         self.assertIn(key, self.fstore.all())
 
+    def test_close_unchanged_file(self):
+        """ close() keeps the loaded objects when nothing changed on disk """
+        new = State()
+        self.fstore.new(new)
+        self.fstore.save()
+        self.fstore.reload()
+        loaded = self.fstore.all()['State.' + new.id]
+
+        self.fstore.close()
+        self.assertIs(self.fstore.all()['State.' + new.id], loaded)
+
+    def test_close_changed_file(self):
+        """ close() reloads when another process rewrote the file """
+        new = State()
+        self.fstore.new(new)
+        self.fstore.save()
+        other = City()
+        with open('test.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['City.' + other.id] = other.to_dict()
+        with open('test.json', 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        self.fstore.close()
+        self.assertIn('City.' + other.id, self.fstore.all())
+
+    def test_close_applies_new_log_entries(self):
+        """ close() only replays log entries written by someone else """
+        FileStorage._FileStorage__journal = True  # type: ignore
+        new = State()
+        self.fstore.new(new)
+        self.fstore.save()
+        loaded = self.fstore.all()['State.' + new.id]
+
+        other = City()
+        with open('test.json.log', 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'key': 'City.' + other.id,
+                                'val': other.to_dict()}) + '\n')
+        self.fstore.close()
+        self.assertIn('City.' + other.id, self.fstore.all())
+        self.assertIs(self.fstore.all()['State.' + new.id], loaded)
+
+        with open('test.json.log', 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'key': 'City.' + other.id,
+                                'val': None}) + '\n')
+        self.fstore.close()
+        self.assertNotIn('City.' + other.id, self.fstore.all())
+
+    def test_close_replaced_log(self):
+        """ close() reloads everything when the log was replaced """
+        FileStorage._FileStorage__journal = True  # type: ignore
+        new = State()
+        self.fstore.new(new)
+        self.fstore.save()
+        loaded = self.fstore.all()['State.' + new.id]
+
+        with open('test.json.log', 'rb') as f:
+            data = f.read()
+        with open('test.json.log.new', 'wb') as f:
+            f.write(data)
+        os.replace('test.json.log.new', 'test.json.log')
+
+        self.fstore.close()
+        self.assertIsNot(self.fstore.all()['State.' + new.id], loaded)
+
     def test_type_path(self):
         """ Confirm __file_path is string """
         self.assertEqual(
@@ -149,3 +680,135 @@ class TestFileStorage(unittest.TestCase):
         self.fstore.new(new)
         expected_key = 'BaseModel' + '.' + new.id
         self.assertIn(expected_key, self.fstore.all())
+
+    def test_journal_save_appends_log(self):
+        """ Journaled saves append changes instead of rewriting the file """
+        FileStorage._FileStorage__journal = True  # type: ignore
+        first = State(name="California")
+        self.fstore.new(first)
+        self.fstore.save()
+        second = City(name="Fremont")
+        self.fstore.new(second)
+        self.fstore.save()
+
+        self.assertFalse(os.path.exists('test.json'))
+        with open('test.json.log', 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([e['key'] for e in entries],
+                         ['State.' + first.id, 'City.' + second.id])
+        self.assertEqual(entries[1]['val']['name'], "Fremont")
+
+    def test_journal_reload_replays_log(self):
+        """ reload() applies logged updates and deletions """
+        new = State(name="Nevada")
+        gone = City()
+        self.fstore.new(new)
+        self.fstore.new(gone)
+        self.fstore.save()
+
+        FileStorage._FileStorage__journal = True  # type: ignore
+        new.name = "Arizona"
+        self.fstore.new(new)
+        self.fstore.save()
+        self.fstore.delete(gone)
+
+        self.fstore.all().clear()
+        self.fstore.reload()
+        self.assertEqual(self.fstore.all()['State.' + new.id].name,
+                         "Arizona")
+        self.assertNotIn('City.' + gone.id, self.fstore.all())
+
+    def test_journal_ignores_torn_entry(self):
+        """ A partially written final log entry is skipped """
+        FileStorage._FileStorage__journal = True  # type: ignore
+        new = State(name="Texas")
+        self.fstore.new(new)
+        self.fstore.save()
+        with open('test.json.log', 'a', encoding='utf-8') as f:
+            f.write('{"key": "State.1", "val": {"id"')
+
+        self.fstore.all().clear()
+        self.fstore.reload()
+        self.assertIn('State.' + new.id, self.fstore.all())
+        self.assertNotIn('State.1', self.fstore.all())
+
+    def test_journal_compaction(self):
+        """ The log is folded into the snapshot past the limit """
+        FileStorage._FileStorage__journal = True  # type: ignore
+        FileStorage._FileStorage__journal_limit = 2  # type: ignore
+        try:
+            objs = [State(name=str(i)) for i in range(3)]
+            for obj in objs:
+                self.fstore.new(obj)
+                self.fstore.save()
+            FileStorage._FileStorage__compactor.join()  # type: ignore
+        finally:
+            FileStorage._FileStorage__journal_limit = 10000  # type: ignore
+
+        with open('test.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertIn('State.' + objs[0].id, data)
+        self.assertIn('State.' + objs[1].id, data)
+        self.assertFalse(os.path.exists('test.json.log.old'))
+
+        self.fstore.all().clear()
+        self.fstore.reload()
+        for obj in objs:
+            self.assertIn('State.' + obj.id, self.fstore.all())
+
+    def test_journal_compaction_applies_other_entries(self):
+        """ Entries another process appended are part of the snapshot """
+        FileStorage._FileStorage__journal = True  # type: ignore
+        FileStorage._FileStorage__journal_limit = 2  # type: ignore
+        try:
+            first = State(name="0")
+            self.fstore.new(first)
+            self.fstore.save()
+            other = City()
+            with open('test.json.log', 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'key': 'City.' + other.id,
+                                    'val': other.to_dict()}) + '\n')
+            second = State(name="1")
+            self.fstore.new(second)
+            self.fstore.save()
+            FileStorage._FileStorage__compactor.join()  # type: ignore
+        finally:
+            FileStorage._FileStorage__journal_limit = 10000  # type: ignore
+
+        with open('test.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertIn('City.' + other.id, data)
+        self.assertIn('State.' + second.id, data)
+        self.assertFalse(os.path.exists('test.json.log.old'))
+
+    def test_reload_leaves_running_compaction(self):
+        """ A rotated log held by a running compaction is not folded """
+        new = State()
+        self.fstore.new(new)
+        self.fstore.save()
+        with open('test.json.log.old', 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'key': 'State.' + new.id,
+                                'val': None}) + '\n')
+        with open('test.json.log.old', 'rb') as held:
+            fcntl.flock(held, fcntl.LOCK_EX)
+            self.fstore.reload()
+            self.assertTrue(os.path.exists('test.json.log.old'))
+        with open('test.json', 'r', encoding='utf-8') as f:
+            self.assertIn('State.' + new.id, json.load(f))
+
+        self.fstore.reload()
+        self.assertFalse(os.path.exists('test.json.log.old'))
+        with open('test.json', 'r', encoding='utf-8') as f:
+            self.assertNotIn('State.' + new.id, json.load(f))
+
+    def test_full_save_drops_log(self):
+        """ A full save supersedes any existing log """
+        FileStorage._FileStorage__journal = True  # type: ignore
+        new = State()
+        self.fstore.new(new)
+        self.fstore.save()
+        FileStorage._FileStorage__journal = False  # type: ignore
+        self.fstore.save()
+        self.assertFalse(os.path.exists('test.json.log'))
+        with open('test.json', 'r', encoding='utf-8') as f:
+            self.assertIn('State.' + new.id, json.load(f))
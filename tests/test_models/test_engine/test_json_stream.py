@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""Module for testing the incremental JSON object parser
+"""
+import io
+import json
+import unittest
+
+import pycodestyle
+
+from models.engine.json_stream import iter_items
+
+
+class TestIterItems(unittest.TestCase):
+    """Test the iter_items function"""
+
+    def _items(self, text, chunk_size=4):
+        """Parses text with a small chunk size to cross chunk boundaries
+        """
+        return list(iter_items(io.StringIO(text), chunk_size=chunk_size))
+
+    def test_matches_json_load(self):
+        """Items come back as json.load would return them"""
+        data = {
+            "State.1": {"id": "1", "name": "Cal\"i\u00e9", "n": 12345},
+            "City.2": {"id": "2", "nested": [1, 2.5, None, True]},
+            "Place.3": {"id": "3", "price": 120},
+        }
+        text = json.dumps(data)
+        for size in (1, 3, 7, 1 << 16):
+            self.assertEqual(dict(self._items(text, size)), data)
+
+    def test_number_across_chunks(self):
+        """A number split by a chunk boundary is not truncated"""
+        self.assertEqual(self._items('{"a": 1234567}', 8),
+                         [("a", 1234567)])
+
+    def test_whitespace(self):
+        """Whitespace between tokens is skipped"""
+        text = '\n { "a" :\t{"x": 1} ,\n "b": {} }\n'
+        self.assertEqual(self._items(text), [("a", {"x": 1}), ("b", {})])
+
+    def test_empty_object(self):
+        """An empty object yields nothing"""
+        self.assertEqual(self._items('{}'), [])
+
+    def test_empty_file(self):
+        """An empty file raises ValueError like json.load"""
+        with self.assertRaises(ValueError):
+            self._items('')
+
+    def test_not_an_object(self):
+        """A top-level value other than an object raises ValueError"""
+        with self.assertRaises(ValueError):
+            self._items('[1, 2]')
+
+    def test_truncated(self):
+        """A truncated file yields the complete items then raises"""
+        items = iter_items(io.StringIO('{"a": {"x": 1}, "b": {"y"'), 4)
+        self.assertEqual(next(items), ("a", {"x": 1}))
+        with self.assertRaises(ValueError):
+            next(items)
+
+    def test_pycodestyle(self):
+        """Check PEP 8 style"""
+        style = pycodestyle.StyleGuide(quiet=True)
+        result = style.check_files(['models/engine/json_stream.py'])
+        self.assertEqual(result.total_errors, 0, "Found code style errors.")
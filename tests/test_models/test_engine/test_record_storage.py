@@ -0,0 +1,279 @@
+#!/usr/bin/python3
+""" Module for testing record storage"""
+import json
+import os
+import unittest
+
+import pycodestyle
+
+from models.city import City
+from models.engine.record_storage import RecordStorage
+from models.state import State
+
+PATHS = ("test.rec", "test.rec.idx", "test.rec.lock", "test.rec.tmp")
+
+
+class TestRecordStorage(unittest.TestCase):
+    """ Class to test the record storage engine """
+
+    @classmethod
+    def setUpClass(cls):
+        """Sets up the class
+        """
+        RecordStorage._RecordStorage__file_path = "test.rec"  # type: ignore
+
+    def setUp(self):
+        """ Set up for each test """
+        for path in PATHS:
+            if os.path.exists(path):
+                os.remove(path)
+        self.rstore = RecordStorage()
+        self.rstore._RecordStorage__pending.clear()  # type: ignore
+        self.rstore.reload()
+
+    def tearDown(self):
+        """ Remove the storage files """
+        RecordStorage._RecordStorage__compact_limit = 1000  # type: ignore
+        for path in PATHS:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_save_and_get(self):
+        """ A saved object is read back from the record file """
+        new = State(name="Ohio")
+        self.rstore.new(new)
+        self.assertIs(self.rstore.get(State, new.id), new)
+        self.rstore.save()
+
+        obj = self.rstore.get(State, new.id)
+        self.assertIsNot(obj, new)
+        self.assertEqual(obj.to_dict(), new.to_dict())
+        self.assertIsNone(self.rstore.get(State, "nope"))
+        self.assertIsNone(self.rstore.get(City, new.id))
+
+    def test_all_by_class(self):
+        """ all() returns the objects of one class, or of every class """
+        states = [State(name=str(i)) for i in range(3)]
+        city = City(name="Akron", state_id=states[0].id)
+        for obj in states + [city]:
+            self.rstore.new(obj)
+        self.rstore.save()
+        self.rstore.reload()
+
+        self.assertEqual(set(self.rstore.all(State)),
+                         {'State.' + s.id for s in states})
+        self.assertEqual(list(self.rstore.all(City)), ['City.' + city.id])
+        self.assertEqual(len(self.rstore.all()), 4)
+        self.assertEqual([c.id for c in
+                          self.rstore.related(City, 'state_id',
+                                              states[0].id)],
+                         [city.id])
+
+    def test_keys(self):
+        """ keys() lists stored, pending and not deleted keys """
+        saved = State(name="Saved")
+        gone = State(name="Gone")
+        for obj in (saved, gone):
+            self.rstore.new(obj)
+        self.rstore.save()
+        pending = State(name="Pending")
+        self.rstore.new(pending)
+        self.rstore.delete(gone)
+
+        self.assertEqual(sorted(self.rstore.keys(State)),
+                         sorted(['State.' + saved.id, 'State.' + pending.id]))
+        self.assertEqual(self.rstore.keys(City), [])
+
+    def test_count_and_pages(self):
+        """ Pages are cut in key or attribute order, pending included """
+        states = [State(name=name) for name in ("b", "c", "a")]
+        for obj in states[:2]:
+            self.rstore.new(obj)
+        self.rstore.save()
+        self.rstore.new(states[2])
+
+        self.assertEqual(self.rstore.count(State), 3)
+        self.assertEqual(self.rstore.count(City), 0)
+        page = self.rstore.all(State, order_by='name', limit=2)
+        self.assertEqual([obj.name for obj in page.values()], ["a", "b"])
+        self.assertEqual(list(self.rstore.all(State, offset=1)),
+                         sorted('State.' + obj.id for obj in states)[1:])
+        with self.assertRaises(ValueError):
+            self.rstore.all(order_by='name')
+
+    def test_generation(self):
+        """ Changes, here or appended by another process, move the
+        generation of their class """
+        before = (self.rstore.generation(State), self.rstore.generation(City))
+        new = State(name="Ohio")
+        self.rstore.new(new)
+        self.rstore.save()
+        self.rstore.get(State, new.id)
+        state = self.rstore.generation(State)
+        self.assertGreater(state, before[0])
+        self.assertEqual(self.rstore.generation(City), before[1])
+
+        city = City(name="Akron")
+        with open("test.rec", "ab") as f:
+            f.write(json.dumps({'key': 'City.' + city.id,
+                                'val': city.to_dict()}).encode() + b'\n')
+        self.rstore.close()
+        self.assertGreater(self.rstore.generation(City), before[1])
+        self.assertEqual(self.rstore.generation(State), state)
+
+    def test_ordered(self):
+        """ Attribute orders are kept until their class changes """
+        state = State(name="Ohio")
+        cities = [City(name=name, state_id=state.id) for name in "cab"]
+        for obj in [state] + cities:
+            self.rstore.new(obj)
+        self.rstore.save()
+        self.assertEqual([c.name for c in self.rstore.related(
+            City, 'state_id', state.id, order_by='name')], ["a", "b", "c"])
+        order = self.rstore._RecordStorage__orders  # type: ignore
+        keys = order[('City', 'name')][1]
+        self.rstore.all(City, order_by='name', limit=1)
+        self.assertIs(order[('City', 'name')][1], keys)
+
+        self.rstore.new(City(name="0", state_id=state.id))
+        page = self.rstore.all(City, order_by='name', limit=2)
+        self.assertEqual([c.name for c in page.values()], ["0", "a"])
+
+    def test_find(self):
+        """ find() reads records from the cursor until the page is full """
+        states = [State(name=name) for name in "dcba"]
+        for obj in states:
+            self.rstore.new(obj)
+        self.rstore.save()
+
+        def names(**kwargs):
+            return [obj.name for obj in
+                    self.rstore.find(State, order_by='name', **kwargs)
+                    .values()]
+        self.assertEqual(names(), list("abcd"))
+        self.assertEqual(names(after=("b", states[2].id), limit=1), ["c"])
+        self.assertEqual(names(where={'name': ["a", "d"]}), ["a", "d"])
+        ordered = sorted('State.' + obj.id for obj in states)
+        self.assertEqual(list(self.rstore.find(
+            State, after=(ordered[1][6:],))), ordered[2:])
+
+    def test_update_and_delete(self):
+        """ Later records replace earlier ones """
+        new = State(name="Utah")
+        self.rstore.new(new)
+        self.rstore.save()
+        new.name = "Nevada"
+        self.rstore.new(new)
+        self.rstore.save()
+        self.assertEqual(self.rstore.get(State, new.id).name, "Nevada")
+
+        self.rstore.delete(new)
+        self.assertIsNone(self.rstore.get(State, new.id))
+        self.assertEqual(self.rstore.all(State), {})
+
+    def test_index_lookup(self):
+        """ Records written before a reload are found through the index """
+        states = [State(name=str(i)) for i in range(20)]
+        for obj in states:
+            self.rstore.new(obj)
+        self.rstore.save()
+        os.remove("test.rec.idx")
+        self.rstore.reload()
+
+        self.assertEqual(self.rstore._RecordStorage__tail, {})  # type: ignore
+        self.assertTrue(os.path.exists("test.rec.idx"))
+        for obj in states:
+            self.assertEqual(self.rstore.get(State, obj.id).name, obj.name)
+
+    def test_compaction(self):
+        """ The tail is folded into a new file once past the limit """
+        RecordStorage._RecordStorage__compact_limit = 2  # type: ignore
+        keep = State(name="Kept")
+        gone = State(name="Gone")
+        for obj in (keep, gone):
+            self.rstore.new(obj)
+            self.rstore.save()
+        self.rstore.delete(gone)
+
+        self.assertEqual(self.rstore._RecordStorage__tail, {})  # type: ignore
+        with open("test.rec", "rb") as f:
+            self.assertNotIn(b"Gone", f.read())
+        self.assertEqual(list(self.rstore.all()), ['State.' + keep.id])
+
+    def test_batch(self):
+        """ A batch appends its changes once, or drops them on error """
+        first = State(name="First")
+        with self.rstore.batch():
+            self.rstore.new(first)
+            self.rstore.save()
+            self.assertIsNone(self.rstore._find('State.' + first.id))
+        self.assertIsNotNone(self.rstore._find('State.' + first.id))
+
+        second = State(name="Second")
+        with self.assertRaises(KeyError):
+            with self.rstore.batch():
+                self.rstore.new(second)
+                raise KeyError
+        self.assertIsNone(self.rstore.get(State, second.id))
+
+    def test_bulk_insert(self):
+        """ Records are appended a chunk at a time and read back raw """
+        records = ({'name': str(i)} for i in range(5))
+        self.assertEqual(self.rstore.bulk_insert(State, records, 2), 5)
+        self.assertEqual(len(self.rstore.all(State)), 5)
+        exported = list(self.rstore.iter_records(State))
+        self.assertEqual(sorted(r['name'] for r in exported),
+                         ['0', '1', '2', '3', '4'])
+        self.assertEqual(exported[0]['__class__'], 'State')
+
+    def test_close_reads_appended_records(self):
+        """ close() picks up records appended by another process """
+        new = State(name="Texas")
+        with open("test.rec", "ab") as f:
+            f.write(json.dumps({'key': 'State.' + new.id,
+                                'val': new.to_dict()}).encode() + b'\n')
+        self.assertIsNone(self.rstore.get(State, new.id))
+        self.rstore.close()
+        self.assertEqual(self.rstore.get(State, new.id).name, "Texas")
+
+    def test_close_after_replace(self):
+        """ close() remaps a record file replaced by another process """
+        new = State(name="Maine")
+        self.rstore.new(new)
+        self.rstore.save()
+        for path in PATHS:
+            if os.path.exists(path):
+                os.remove(path)
+        self.rstore.close()
+        self.assertIsNone(self.rstore.get(State, new.id))
+
+    def test_torn_record(self):
+        """ A record cut short by a crash is ignored, then overwritten """
+        with open("test.rec", "ab") as f:
+            f.write(b'{"key": "State.1", "val": {"na')
+        self.rstore.reload()
+        self.assertEqual(self.rstore.all(), {})
+
+        new = State(name="Iowa")
+        self.rstore.new(new)
+        self.rstore.save()
+        self.rstore.reload()
+        self.assertEqual(self.rstore.get(State, new.id).name, "Iowa")
+
+    def test_long_key(self):
+        """ Keys that do not fit in an index entry are rejected """
+        with self.assertRaises(ValueError):
+            self.rstore.new(State(id="x" * 64))
+
+    def test_not_a_record_file(self):
+        """ reload() refuses a file of another format """
+        with open("test.rec", "wb") as f:
+            f.write(b"{}")
+        with self.assertRaises(ValueError):
+            self.rstore.reload()
+
+    def test_pycodestyle(self):
+        """Check PEP 8 style"""
+        style = pycodestyle.StyleGuide(quiet=True)
+        result = style.check_files(['models/engine/record_storage.py'])
+        self.assertEqual(result.total_errors, 0, "Found code style errors.")
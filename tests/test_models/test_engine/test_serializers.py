@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""Module for testing the FileStorage snapshot formats
+"""
+import io
+import pickle
+import unittest
+from datetime import datetime
+
+import pycodestyle
+
+from models.engine.serializers import (JSONSerializer, PickleSerializer,
+                                       detect, get_serializer)
+from models.state import State
+
+
+class TestSerializers(unittest.TestCase):
+    """Test the JSON and pickle serializers"""
+
+    def _round_trip(self, serializer, records):
+        """Dumps records, then detects the format and loads them back
+        """
+        f = io.BytesIO()
+        serializer.dump(iter(records), f)
+        f.seek(0)
+        self.assertIs(detect(f), serializer)
+        return list(serializer.load(f))
+
+    def test_json_round_trip(self):
+        """JSON snapshots hold to_dict() records"""
+        state = State(name="Iowa")
+        record = JSONSerializer.record(state)
+        self.assertEqual(record, state.to_dict())
+        self.assertEqual(self._round_trip(JSONSerializer,
+                                          [("State." + state.id, record)]),
+                         [("State." + state.id, record)])
+
+    def test_pickle_round_trip(self):
+        """Pickle snapshots keep datetimes and span several batches"""
+        states = [State(name=str(i)) for i in range(5)]
+        records = [("State." + s.id, PickleSerializer.record(s))
+                   for s in states]
+        self.assertIsInstance(records[0][1]['created_at'], datetime)
+        self.assertEqual(records[0][1]['__class__'], "State")
+
+        batch_size = PickleSerializer.batch_size
+        PickleSerializer.batch_size = 2
+        try:
+            self.assertEqual(self._round_trip(PickleSerializer, records),
+                             records)
+        finally:
+            PickleSerializer.batch_size = batch_size
+
+    def test_json_encodes_datetimes(self):
+        """Raw records read from a binary snapshot can be written as JSON"""
+        state = State()
+        record = PickleSerializer.record(state)
+        loaded = self._round_trip(JSONSerializer, [("State.1", record)])
+        self.assertEqual(loaded[0][1]['created_at'],
+                         state.created_at.isoformat())
+
+    def test_pickle_prepare(self):
+        """ISO timestamps are parsed before being pickled"""
+        state = State()
+        record = PickleSerializer.prepare(state.to_dict())
+        self.assertEqual(record['created_at'], state.created_at)
+        self.assertEqual(record['updated_at'], state.updated_at)
+
+    def test_pickle_rejects_other_classes(self):
+        """Loading a snapshot cannot instantiate arbitrary classes"""
+        f = io.BytesIO()
+        f.write(PickleSerializer.magic)
+        pickle.dump([("State.1", {"value": io.BytesIO})], f, protocol=5)
+        f.seek(len(PickleSerializer.magic))
+        with self.assertRaises(ValueError):
+            list(PickleSerializer.load(f))
+
+    def test_get_serializer(self):
+        """Formats are looked up by name"""
+        self.assertIs(get_serializer('json'), JSONSerializer)
+        self.assertIs(get_serializer('pickle'), PickleSerializer)
+        with self.assertRaises(ValueError):
+            get_serializer('xml')
+
+    def test_pycodestyle(self):
+        """Check PEP 8 style"""
+        style = pycodestyle.StyleGuide(quiet=True)
+        result = style.check_files(['models/engine/serializers.py',
+                                    'convert_storage.py'])
+        self.assertEqual(result.total_errors, 0, "Found code style errors.")
@@ -118,6 +118,17 @@ class PlaceTest(unittest.TestCase):
         self.assertIsInstance(new_place.created_at, datetime.datetime)
         self.assertIsInstance(new_place.updated_at, datetime.datetime)
 
+    @unittest.skipIf(models.storage_type == 'db', "FileStorage only")
+    def test_user(self):
+        """Check the owner is looked up in storage """
+        from models.user import User
+
+        user = User()
+        models.storage.new(user)
+        new_place = Place(user_id=user.id)
+        self.assertIs(new_place.user, user)
+        self.assertIsNone(Place(user_id="0001").user)
+
     def test_doc(self):
         """Check documentation """
         self.assertIsNotNone(models.place.__doc__)  # type: ignore
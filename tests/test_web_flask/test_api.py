@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""Tests the JSON API of the web application
+"""
+import os
+import unittest
+
+import pycodestyle
+
+from models import storage, storage_type
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from web_flask import create_app
+
+
+@unittest.skipIf(
+    storage_type == 'db', "Only FileStorage tests are currently implemented"
+)
+class TestPlacesAPI(unittest.TestCase):
+    """Test the /api/v1/places route
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Sets up the class
+        """
+        storage._FileStorage__file_path = "test.json"  # type: ignore
+        cls.client = create_app().test_client()
+
+    def setUp(self):
+        """Stores two states of two cities with three places each
+        """
+        storage.all().clear()
+        self.wifi = Amenity(name="Wifi")
+        storage.new(self.wifi)
+        self.states = [State(name=name) for name in ("Ohio", "Utah")]
+        self.cities = []
+        for i, state in enumerate(self.states):
+            storage.new(state)
+            for j in range(2):
+                city = City(name="City {}{}".format(i, j), state_id=state.id)
+                self.cities.append(city)
+                storage.new(city)
+        for i in range(12):
+            place = Place(name="Place {:02}".format(i), max_guest=i % 4,
+                          city_id=self.cities[i % 4].id,
+                          price_by_night=10 * i)
+            if i % 2:
+                place.amenity_ids = [self.wifi.id]
+            storage.new(place)
+
+    def tearDown(self):
+        """Removes the storage file
+        """
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def names(self, url):
+        """Returns the names of the places of every page of a search
+        """
+        names = []
+        cursor = None
+        while True:
+            page = url if cursor is None else '{}{}cursor={}'.format(
+                url, '&' if '?' in url else '?', cursor)
+            response = self.client.get(page)
+            self.assertEqual(response.status_code, 200)
+            names.extend(place['name'] for place in response.json['places'])
+            cursor = response.json['next']
+            if cursor is None:
+                return names
+
+    def test_pages(self):
+        """Test that the cursors walk every place once, by name"""
+        response = self.client.get('/api/v1/places?limit=5')
+        self.assertEqual(len(response.json['places']), 5)
+        self.assertEqual(response.json['places'][0]['name'], "Place 00")
+        self.assertEqual(self.names('/api/v1/places?limit=5'),
+                         ["Place {:02}".format(i) for i in range(12)])
+        self.assertEqual(len(self.names('/api/v1/places?limit=0')), 12)
+
+    def test_filters(self):
+        """Test the location, amenity, price and guest filters"""
+        self.assertEqual(self.names('/api/v1/places?states={}&limit=2'
+                                    .format(self.states[0].id)),
+                         ["Place 00", "Place 01", "Place 04", "Place 05",
+                          "Place 08", "Place 09"])
+        self.assertEqual(self.names('/api/v1/places?states={}&cities={}'
+                                    .format(self.states[0].id,
+                                            self.cities[3].id)),
+                         ["Place 00", "Place 01", "Place 03", "Place 04",
+                          "Place 05", "Place 07", "Place 08", "Place 09",
+                          "Place 11"])
+        self.assertEqual(self.names('/api/v1/places?cities=nope'), [])
+        self.assertEqual(self.names('/api/v1/places?amenities={}&guests=3'
+                                    .format(self.wifi.id)),
+                         ["Place 03", "Place 07", "Place 11"])
+        self.assertEqual(self.names('/api/v1/places?price_min=35'
+                                    '&price_max=60&limit=1'),
+                         ["Place 04", "Place 05", "Place 06"])
+
+    def test_bad_cursor(self):
+        """Test that a cursor that is not one is a 400"""
+        response = self.client.get('/api/v1/places?cursor=nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json)
+
+    def test_pycodestyle(self):
+        """Check PEP 8 style"""
+        style = pycodestyle.StyleGuide(quiet=True)
+        result = style.check_files(['web_flask/views/api.py'])
+        self.assertEqual(result.total_errors, 0, "Found code style errors.")
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""Tests the web application factory
+"""
+import gc
+import os
+import unittest
+from unittest import mock
+
+import pycodestyle
+
+from models import storage, storage_type
+from models.place import Place
+from models.state import State
+from web_flask import create_app, preload
+from web_flask.views import hbnb
+
+
+@unittest.skipIf(
+    storage_type == 'db', "Only FileStorage tests are currently implemented"
+)
+class TestCreateApp(unittest.TestCase):
+    """Test the routes of create_app()
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Sets up the class
+        """
+        storage._FileStorage__file_path = "test.json"  # type: ignore
+        cls.app = create_app()
+
+    def setUp(self):
+        """Sets up each test
+        """
+        storage.all().clear()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Removes the storage file
+        """
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def get(self, url):
+        """Returns the status and text of the response to a GET request
+        """
+        response = self.client.get(url)
+        return response.status_code, response.get_data(as_text=True)
+
+    def test_blueprints(self):
+        """Test that every task's routes are registered"""
+        self.assertEqual(sorted(self.app.blueprints),
+                         ['api', 'basic', 'hbnb', 'states'])
+        self.assertEqual(self.get('/'), (200, 'Hello HBNB!'))
+        self.assertEqual(self.get('/c/is_fun/'), (200, 'C is fun'))
+        self.assertEqual(self.get('/python'), (200, 'Python is cool'))
+        self.assertEqual(self.get('/number/7'), (200, '7 is a number'))
+        self.assertEqual(self.get('/number/x')[0], 404)
+        self.assertIn('is even', self.get('/number_odd_or_even/4')[1])
+
+    def test_storage_routes(self):
+        """Test that the pages show the stored objects"""
+        state = State(name="Oregon")
+        storage.new(state)
+        storage.save()
+        for url in ('/states_list', '/cities_by_states', '/states',
+                    '/states/' + state.id, '/hbnb_filters', '/hbnb'):
+            status, text = self.get(url)
+            self.assertEqual(status, 200, url)
+            self.assertIn('Oregon', text, url)
+
+    def test_name_order(self):
+        """Test that the pages list states and cities by name, as storage
+        returns them"""
+        for name in ("Wyoming", "Alabama"):
+            storage.new(State(name=name))
+        for url in ('/states_list', '/states', '/hbnb'):
+            text = self.get(url)[1]
+            self.assertLess(text.index('Alabama'), text.index('Wyoming'), url)
+
+    def test_iter_places(self):
+        """Test that places are loaded a chunk at a time, by name, and
+        that /hbnb streams them"""
+        for name in "ecadb":
+            storage.new(Place(name=name))
+        with mock.patch.object(hbnb, 'PLACES_PER_CHUNK', 2), \
+                mock.patch.object(storage, 'all', wraps=storage.all) as all:
+            places = hbnb.iter_places(1, 3)
+            self.assertEqual(all.call_count, 0)
+            self.assertEqual(next(places).name, "b")
+            self.assertEqual(all.call_count, 1)
+            self.assertEqual([place.name for place in places], ["c", "d"])
+            self.assertEqual(all.call_count, 2)
+            self.assertEqual([place.name for place in
+                              hbnb.iter_places(3, 25)], ["d", "e"])
+        with self.app.test_request_context('/hbnb'):
+            response = self.app.make_response(hbnb.hbnb.__wrapped__())
+            self.assertTrue(response.is_streamed)
+            self.assertIn('<h2>e</h2>', response.get_data(as_text=True))
+
+    def test_preload(self):
+        """Test that preload() compiles the templates and freezes them"""
+        try:
+            preload(self.app)
+            self.assertGreater(gc.get_freeze_count(), 0)
+            self.assertEqual(self.get('/number_template/3')[0], 200)
+        finally:
+            gc.unfreeze()
+
+    def test_pycodestyle(self):
+        """Check PEP 8 style"""
+        style = pycodestyle.StyleGuide(quiet=True)
+        result = style.check_files(['web_flask/__init__.py',
+                                    'web_flask/views', 'wsgi.py'])
+        self.assertEqual(result.total_errors, 0, "Found code style errors.")
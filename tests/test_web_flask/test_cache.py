@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+"""Tests the page cache of the web views
+"""
+import os
+import time
+import unittest
+
+import pycodestyle
+
+from models import storage, storage_type
+from models.amenity import Amenity
+from models.state import State
+from web_flask import create_app
+from web_flask.cache import PageCache, page_cache
+
+
+class TestPageCache(unittest.TestCase):
+    """Test the PageCache class
+    """
+
+    def test_lru(self):
+        """Test that the least recently used page goes first"""
+        cache = PageCache(2)
+        cache.put('a', (1,), 'A')
+        cache.put('b', (1,), 'B')
+        self.assertEqual(cache.get('a', (1,)), 'A')
+        cache.put('c', (1,), 'C')
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b', (1,)))
+        self.assertEqual(cache.get('c', (1,)), 'C')
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_generations(self):
+        """Test that a page rendered with older generations is a miss"""
+        cache = PageCache()
+        cache.put('a', (1, 2), 'A')
+        self.assertIsNone(cache.get('a', (1, 3)))
+        self.assertEqual(cache.get('a', (1, 2)), 'A')
+
+    def test_ttl_and_size(self):
+        """Test that pages expire, and that size 0 keeps none"""
+        cache = PageCache(ttl=0.01)
+        cache.put('a', (), 'A')
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a', ()))
+        cache = PageCache(0)
+        cache.put('a', (), 'A')
+        self.assertEqual(len(cache), 0)
+
+
+@unittest.skipIf(
+    storage_type == 'db', "Only FileStorage tests are currently implemented"
+)
+class TestCached(unittest.TestCase):
+    """Test the cached views of create_app()
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Sets up the class
+        """
+        storage._FileStorage__file_path = "test.json"  # type: ignore
+        cls.client = create_app().test_client()
+
+    def setUp(self):
+        """Sets up each test
+        """
+        storage.all().clear()
+        page_cache.clear()
+
+    def tearDown(self):
+        """Removes the storage file
+        """
+        for path in ("test.json", "test.json.log", "test.json.log.old",
+                     "test.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_invalidation(self):
+        """Test that a page is served from the cache until its classes
+        change"""
+        storage.new(State(name="Ohio"))
+        hits = page_cache.hits
+        self.assertIn("Ohio", self.client.get('/states').get_data(True))
+        self.assertIn("Ohio", self.client.get('/states/').get_data(True))
+        self.assertEqual(page_cache.hits, hits + 1)
+
+        storage.new(Amenity(name="Wifi"))
+        self.client.get('/states')
+        self.assertEqual(page_cache.hits, hits + 2)
+
+        storage.new(State(name="Utah"))
+        self.assertIn("Utah", self.client.get('/states').get_data(True))
+        self.assertEqual(page_cache.hits, hits + 2)
+
+    def test_arguments(self):
+        """Test that the route arguments and query are part of the key"""
+        state = State(name="Iowa")
+        storage.new(state)
+        self.assertIn("Iowa", self.client.get(
+            '/states/' + state.id).get_data(True))
+        self.assertNotIn("Iowa", self.client.get(
+            '/states/nope').get_data(True))
+        self.assertEqual(len(page_cache), 2)
+        self.client.get('/hbnb?page=1').get_data()
+        self.client.get('/hbnb').get_data()
+        self.assertEqual(len(page_cache), 4)
+
+    def test_streamed(self):
+        """Test that a streamed page is stored once sent in full, then
+        served whole with its ETag"""
+        storage.new(State(name="Maine"))
+        storage.save()
+        response = self.client.get('/hbnb')
+        self.assertNotIn('ETag', response.headers)
+        self.assertEqual(len(page_cache), 0)
+        body = response.get_data()
+        self.assertIn(b"Maine", body)
+        self.assertEqual(len(page_cache), 1)
+
+        response = self.client.get('/hbnb')
+        self.assertIn('ETag', response.headers)
+        self.assertEqual(response.get_data(), body)
+        response = self.client.get('/hbnb', headers={
+            'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_not_modified(self):
+        """Test that a matching ETag or date gets 304 Not Modified"""
+        response = self.client.get('/states_list')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.cache_control.no_cache)
+        etag = response.headers['ETag']
+        date = response.headers['Last-Modified']
+
+        response = self.client.get('/states_list',
+                                   headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        response = self.client.get('/states_list',
+                                   headers={'If-Modified-Since': date})
+        self.assertEqual(response.status_code, 304)
+
+        storage.new(State(name="Idaho"))
+        response = self.client.get('/states_list',
+                                   headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_pycodestyle(self):
+        """Check PEP 8 style"""
+        style = pycodestyle.StyleGuide(quiet=True)
+        result = style.check_files(['web_flask/cache.py'])
+        self.assertEqual(result.total_errors, 0, "Found code style errors.")
@@ -20,8 +20,10 @@ def hbnb_filters():
     from models.state import State
     from models.amenity import Amenity
 
-    states = storage.all(State).values()
-    amenities = storage.all(Amenity).values()
+    states = storage.all(State, load=('cities',), columns=('name',),
+                         order_by='name').values()
+    amenities = storage.all(Amenity, columns=('name',),
+                            order_by='name').values()
     return render_template('10-hbnb_filters.html', states=states,
                            amenities=amenities)
 
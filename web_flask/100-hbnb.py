@@ -1,9 +1,10 @@
 #!/usr/bin/python3
 """Make the filters dynamic
 """
-from flask import Flask, render_template
+from flask import Flask, render_template, request
 from models import storage
 app = Flask(__name__)
+PLACES_PER_PAGE = 25
 
 
 @app.teardown_appcontext
@@ -15,17 +16,25 @@ def close_session(ctx):
 
 @app.route('/hbnb', strict_slashes=False)
 def hbnb():
-    """Displays the HBNB main page
+    """Displays the HBNB main page, with one page of places by name,
+    selected with ?page=<n>
     """
     from models.amenity import Amenity
     from models.place import Place
     from models.state import State
 
-    states = storage.all(State).values()
-    amenities = storage.all(Amenity).values()
-    places = storage.all(Place).values()
+    states = storage.all(State, load=('cities',), columns=('name',),
+                         order_by='name').values()
+    amenities = storage.all(Amenity, columns=('name',),
+                            order_by='name').values()
+    pages = max(1, -(-storage.count(Place) // PLACES_PER_PAGE))
+    page = min(max(1, request.args.get('page', 1, type=int)), pages)
+    places = storage.all(Place, load=('user',), order_by='name',
+                         offset=(page - 1) * PLACES_PER_PAGE,
+                         limit=PLACES_PER_PAGE).values()
     return render_template('100-hbnb.html', states=states,
-                            amenities=amenities, places=places)
+                           amenities=amenities, places=places, page=page,
+                           pages=pages)
 
 
 if __name__ == '__main__':
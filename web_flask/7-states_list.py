@@ -19,7 +19,7 @@ def states_list():
     """
     from models.state import State
 
-    states = storage.all(State).values()
+    states = storage.all(State, columns=('name',), order_by='name').values()
     return render_template('7-states_list.html', states=states)
 
 
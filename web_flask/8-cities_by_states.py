@@ -19,7 +19,8 @@ def cities_by_states():
     """
     from models.state import State
 
-    states = storage.all(State).values()
+    states = storage.all(State, load=('cities',),
+                         order_by='name').values()
     return render_template('8-cities_by_states.html', states=states)
 
 
@@ -20,7 +20,7 @@ def states(id=None):
     """
     from models.state import State
 
-    states = storage.all(State)
+    states = storage.all(State, columns=('name',), order_by='name')
     if id is not None:
         id = 'State.' + id
     return render_template('9-states.html', states=states, id=id)
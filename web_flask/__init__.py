@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""The web application: every route of the numbered scripts in one Flask
+app, for a WSGI server to run in several worker processes
+
+The numbered scripts each serve the routes of one task; create_app()
+registers all of them as blueprints, with /hbnb serving the main page.
+"""
+import gc
+
+from flask import Flask
+
+
+def create_app():
+    """Creates the web application
+
+    Returns:
+        flask.Flask: The application
+    """
+    from models import storage
+    from .views import blueprints
+
+    app = Flask(__name__)
+    for blueprint in blueprints:
+        app.register_blueprint(blueprint)
+
+    @app.teardown_appcontext
+    def close_session(ctx):
+        """Closes the current session
+        """
+        storage.close()
+
+    return app
+
+
+def preload(app):
+    """Does the work every worker would otherwise repeat, in the server's
+    process before it forks them: the stored objects are loaded and the
+    templates compiled once, then frozen out of the garbage collector so
+    its passes do not write to the pages the workers share copy-on-write
+
+    Args:
+        app (flask.Flask): The application
+    """
+    from models import storage, storage_type
+
+    if storage_type not in ('db', 'record'):
+        # Instantiates the records FileStorage loads lazily; the other
+        # engines read per request, from the database or the mapped file
+        storage.all()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+"""The page cache of the web views
+
+A view decorated with cached() renders a page once per route and
+arguments, then serves it from memory until the storage reports a change
+to one of the classes the page shows. Pages carry an ETag and a
+Last-Modified date, so a browser revalidating its copy gets a 304 Not
+Modified without the body. A view may also stream its page, returning
+the chunks of stream_template(): the chunks are sent as they come and
+the page is stored once the last one is sent, to be served whole, with
+its ETag, from then on.
+
+HBNB_PAGE_CACHE_SIZE sets the number of pages kept per process (default
+128, 0 disables the cache), the least recently used going first.
+HBNB_PAGE_CACHE_TTL sets the seconds a page is kept at most (default 0,
+no limit). DBStorage also sees the changes other processes commit, but
+as the latest updated_at of a table, with the precision of its column:
+a change saved within the same second as the last one, by another
+process, shows once the TTL expires.
+"""
+import collections
+import functools
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import make_response, request
+
+
+class PageCache:
+    """A size-bounded LRU of rendered pages
+
+    Attributes:
+        size (int): The number of pages kept at most
+        ttl (float): The seconds a page is kept at most, 0 for no limit
+        hits (int): The number of pages served from the cache
+        misses (int): The number of pages rendered
+        __pages (collections.OrderedDict): Key -> (generations, stored at,
+                                           page), the least recently used
+                                           first
+        __lock (threading.Lock): Serializes the threads of this process
+    """
+
+    def __init__(self, size=128, ttl=0):
+        """Creates an empty cache
+
+        Args:
+            size (int): The number of pages kept at most
+            ttl (float): The seconds a page is kept at most, 0 for no limit
+        """
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__pages = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, generations):
+        """Returns a page rendered with the given storage generations
+
+        Args:
+            key (tuple): The route and arguments of the page
+            generations (tuple): The current generations of its classes
+
+        Returns:
+            tuple: The (body, ETag, Last-Modified) of the page, or None if
+                   it must be rendered
+        """
+        with self.__lock:
+            entry = self.__pages.get(key)
+            if entry is None or entry[0] != generations or (
+                    self.ttl and time.monotonic() - entry[1] > self.ttl):
+                self.misses += 1
+                return None
+            self.__pages.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, generations, page):
+        """Stores a page, evicting the least recently used past the size
+
+        Args:
+            key (tuple): The route and arguments of the page
+            generations (tuple): The generations it was rendered with
+            page (tuple): Its (body, ETag, Last-Modified)
+        """
+        if self.size <= 0:
+            return
+        with self.__lock:
+            self.__pages[key] = (generations, time.monotonic(), page)
+            self.__pages.move_to_end(key)
+            while len(self.__pages) > self.size:
+                self.__pages.popitem(last=False)
+
+    def clear(self):
+        """Drops every page
+        """
+        with self.__lock:
+            self.__pages.clear()
+
+    def __len__(self):
+        """Returns the number of pages kept
+        """
+        return len(self.__pages)
+
+
+page_cache = PageCache(int(os.getenv('HBNB_PAGE_CACHE_SIZE', '128')),
+                       float(os.getenv('HBNB_PAGE_CACHE_TTL', '0')))
+
+
+def cached(*classes):
+    """Caches the pages of a view until objects of the given classes are
+    added, replaced or deleted in storage
+
+    Args:
+        classes (class): The model classes the page shows
+
+    Returns:
+        callable: The decorator
+    """
+    def decorator(view):
+        """Wraps a view returning the text of a page, or its chunks
+        """
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            """Serves the page from the cache, or renders and stores it,
+            then answers a conditional request with 304 if it matches
+            """
+            from models import storage
+
+            key = (request.endpoint, tuple(sorted(kwargs.items())),
+                   tuple(sorted(request.args.items(multi=True))))
+            generations = tuple(storage.generation(cls) for cls in classes)
+            page = page_cache.get(key, generations)
+            if page is None:
+                body = view(**kwargs)
+                if not isinstance(body, str):
+                    response = make_response(
+                        _store(key, generations, body))
+                    response.cache_control.no_cache = True
+                    return response
+                page = _page(body)
+                page_cache.put(key, generations, page)
+            response = make_response(page[0])
+            response.set_etag(page[1])
+            response.last_modified = page[2]
+            # Browsers keep the page but revalidate it on every visit
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def _page(body):
+    """Returns the cache entry of a rendered page
+
+    Args:
+        body (str): The text of the page
+
+    Returns:
+        tuple: Its (body, ETag, Last-Modified)
+    """
+    body = body.encode('utf-8')
+    return (body, hashlib.sha1(body).hexdigest(),
+            datetime.now(timezone.utc).replace(microsecond=0))
+
+
+def _store(key, generations, chunks):
+    """Yields the chunks of a streamed page, then stores the whole page
+
+    Args:
+        key (tuple): The route and arguments of the page
+        generations (tuple): The generations it is rendered with
+        chunks (iterable): The text of the page, a chunk at a time
+    """
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    page_cache.put(key, generations, _page(''.join(body)))
@@ -0,0 +1,9 @@
+#!/usr/bin/python3
+"""The blueprints of the web application, registered by create_app()
+"""
+from .api import api_views
+from .basic import basic_views
+from .hbnb import hbnb_views
+from .states import state_views
+
+blueprints = (basic_views, state_views, hbnb_views, api_views)
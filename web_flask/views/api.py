@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""The JSON API of the web application
+"""
+import base64
+import binascii
+import json
+
+from flask import Blueprint, jsonify, request
+from models import storage
+from models.base_model import BaseModel
+from models.place import Place
+from models.state import State
+
+api_views = Blueprint('api', __name__, url_prefix='/api/v1')
+PLACES_PER_PAGE = 25
+MAX_PLACES_PER_PAGE = 100
+
+
+def encode_cursor(place):
+    """Returns the cursor of the page following a place
+
+    Args:
+        place (Place): The last place of a page
+
+    Returns:
+        str: The URL-safe cursor
+    """
+    data = json.dumps([place.name, place.id]).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Returns the (name, id) of the place a cursor follows
+
+    Args:
+        cursor (str): A cursor made by encode_cursor()
+
+    Raises:
+        ValueError: If the cursor is not one
+    """
+    try:
+        name, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, TypeError, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor: {}".format(cursor))
+    if not isinstance(name, str) or not isinstance(id, str):
+        raise ValueError("Invalid cursor: {}".format(cursor))
+    return name, id
+
+
+def ids(name):
+    """Returns the ids a query argument lists, repeated or separated by
+    commas, e.g. ?cities=1,2&cities=3
+
+    Args:
+        name (str): The argument name
+    """
+    return [id for value in request.args.getlist(name)
+            for id in value.split(',') if id]
+
+
+@api_views.route('/places', strict_slashes=False)
+def places():
+    """Returns one page of places, by name, as JSON
+
+    The places are those of the ?states= and ?cities= listed, with all the
+    ?amenities= listed, a price_by_night between ?price_min= and
+    ?price_max= and room for ?guests= guests. ?limit= sets the page size
+    (25, at most 100), and ?cursor= the page, as the next cursor of the
+    previous one; next is null on the last page.
+    """
+    where = {}
+    if ids('states') or ids('cities'):
+        city_ids = set(ids('cities'))
+        for state_id in ids('states'):
+            state = storage.get(State, state_id)
+            if state is not None:
+                city_ids.update(city.id for city in state.cities)
+        where['city_id'] = city_ids
+    ranges = {'price_by_night': (request.args.get('price_min', type=int),
+                                 request.args.get('price_max', type=int)),
+              'max_guest': (request.args.get('guests', type=int), None)}
+    ranges = {attr: bounds for attr, bounds in ranges.items()
+              if bounds != (None, None)}
+    having = {'amenities': ids('amenities')} if ids('amenities') else {}
+    limit = min(max(1, request.args.get('limit', PLACES_PER_PAGE, type=int)),
+                MAX_PLACES_PER_PAGE)
+    after = request.args.get('cursor')
+    if after is not None:
+        try:
+            after = decode_cursor(after)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+
+    found = list(storage.find(Place, where=where, ranges=ranges,
+                              having=having, order_by='name', after=after,
+                              limit=limit + 1).values())
+    return jsonify(
+        places=[{key: value for key, value in place.to_dict().items()
+                 if not isinstance(value, (list, BaseModel))}
+                for place in found[:limit]],
+        next=encode_cursor(found[limit - 1]) if len(found) > limit else None)
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""The routes of the first tasks, which do not use storage
+"""
+from flask import Blueprint, render_template
+from markupsafe import escape
+
+basic_views = Blueprint('basic', __name__)
+
+
+@basic_views.route('/', strict_slashes=False)
+def hello_hbnb():
+    """Displays 'Hello HBNB!'
+    """
+    return 'Hello HBNB!'
+
+
+@basic_views.route('/c/<text>', strict_slashes=False)
+def c(text):
+    """Displays 'C' followed by the value of the text variable.
+    Replaces underscores with spaces.
+    """
+    return 'C {}'.format(escape(text).replace('_', ' '))
+
+
+@basic_views.route('/python/<text>', strict_slashes=False)
+@basic_views.route('/python', strict_slashes=False)
+def python(text='is cool'):
+    """Displays 'Python' followed by the value of the text variable.
+    Replaces underscores with spaces.
+    """
+    return 'Python {}'.format(escape(text).replace('_', ' '))
+
+
+@basic_views.route('/number/<int:n>', strict_slashes=False)
+def number(n):
+    """Displays 'n is a number'
+    """
+    return '{} is a number'.format(n)
+
+
+@basic_views.route('/number_template/<int:n>', strict_slashes=False)
+def number_template(n):
+    """Displays an HTML page only if n is an integer
+    """
+    return render_template('5-number.html', n=n)
+
+
+@basic_views.route('/number_odd_or_even/<int:n>', strict_slashes=False)
+def number_odd_or_even(n):
+    """Displays an HTML page only if n is an integer after
+    checking if it is odd or even
+    """
+    return render_template('6-number_odd_or_even.html', n=n)
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""The routes of the HBNB pages
+
+/hbnb streams its page: the header and the filters are sent as soon as
+they are rendered, then the places as they are loaded, PLACES_PER_CHUNK
+at a time. The many small strings the template yields are joined
+STREAM_BUFFER at a time, into fewer and larger writes.
+HBNB_PLACES_PER_PAGE sets the number of places on a page (default 25).
+"""
+import itertools
+import os
+
+from flask import Blueprint, render_template, request, stream_template
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+
+from ..cache import cached
+
+hbnb_views = Blueprint('hbnb', __name__)
+PLACES_PER_PAGE = int(os.getenv('HBNB_PLACES_PER_PAGE', '25'))
+PLACES_PER_CHUNK = 25
+STREAM_BUFFER = 1024
+
+
+def buffered(chunks, size=STREAM_BUFFER):
+    """Joins the chunks of a stream a given number at a time
+
+    Args:
+        chunks (iterable): The strings to join
+        size (int): The number of strings joined into a piece, fewer in
+                    the last one
+    """
+    chunks = iter(chunks)
+    while True:
+        batch = list(itertools.islice(chunks, size))
+        if not batch:
+            return
+        yield ''.join(batch)
+
+
+def iter_places(offset, limit):
+    """Yields places by name, loading them from storage a chunk at a time
+
+    Args:
+        offset (int): The number of places to skip
+        limit (int): The number of places to yield at most
+    """
+    end = offset + limit
+    while offset < end:
+        chunk = storage.all(Place, load=('user',), order_by='name',
+                            offset=offset,
+                            limit=min(PLACES_PER_CHUNK, end - offset))
+        yield from chunk.values()
+        if len(chunk) < PLACES_PER_CHUNK:
+            return
+        offset += len(chunk)
+
+
+@hbnb_views.route('/hbnb_filters', strict_slashes=False)
+@cached(State, City, Amenity)
+def hbnb_filters():
+    """Applies dynamic filters to the page
+    """
+    states = storage.all(State, load=('cities',), columns=('name',),
+                         order_by='name').values()
+    amenities = storage.all(Amenity, columns=('name',),
+                            order_by='name').values()
+    return render_template('10-hbnb_filters.html', states=states,
+                           amenities=amenities)
+
+
+@hbnb_views.route('/hbnb', strict_slashes=False)
+@cached(State, City, Amenity, Place, User)
+def hbnb():
+    """Displays the HBNB main page, with one page of places by name,
+    selected with ?page=<n>
+    """
+    states = storage.all(State, load=('cities',), columns=('name',),
+                         order_by='name').values()
+    amenities = storage.all(Amenity, columns=('name',),
+                            order_by='name').values()
+    pages = max(1, -(-storage.count(Place) // PLACES_PER_PAGE))
+    page = min(max(1, request.args.get('page', 1, type=int)), pages)
+    places = iter_places((page - 1) * PLACES_PER_PAGE, PLACES_PER_PAGE)
+    return buffered(stream_template('100-hbnb.html', states=states,
+                                    amenities=amenities, places=places,
+                                    page=page, pages=pages))
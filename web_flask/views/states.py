@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""The routes listing the states and their cities
+"""
+from flask import Blueprint, render_template
+from models import storage
+from models.city import City
+from models.state import State
+
+from ..cache import cached
+
+state_views = Blueprint('states', __name__)
+
+
+@state_views.route('/states_list', strict_slashes=False)
+@cached(State)
+def states_list():
+    """Displays a list of all State objects in the database, sorted by name
+    """
+    states = storage.all(State, columns=('name',), order_by='name').values()
+    return render_template('7-states_list.html', states=states)
+
+
+@state_views.route('/cities_by_states', strict_slashes=False)
+@cached(State, City)
+def cities_by_states():
+    """Displays a list of cities by state
+    """
+    states = storage.all(State, load=('cities',),
+                         order_by='name').values()
+    return render_template('8-cities_by_states.html', states=states)
+
+
+@state_views.route('/states', strict_slashes=False)
+@state_views.route('/states/<id>', strict_slashes=False)
+@cached(State, City)
+def states(id=None):
+    """Displays a list of cities in a specific state or all states
+    """
+    states = storage.all(State, columns=('name',), order_by='name')
+    if id is not None:
+        id = 'State.' + id
+    return render_template('9-states.html', states=states, id=id)
@@ -0,0 +1,12 @@
+#!/usr/bin/python3
+"""The WSGI entry point of the web application
+
+Usage: gunicorn wsgi:app
+
+gunicorn.conf.py loads this module once in the server's process, before
+it forks the workers, which then share the preloaded storage.
+"""
+from web_flask import create_app, preload
+
+app = create_app()
+preload(app)